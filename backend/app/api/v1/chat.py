@@ -17,8 +17,7 @@ from app.schemas.chat_schema import (
     QuickQuestionsResponse,
     ChatMessage
 )
-from app.services.gemini_service import gemini_service
-from app.services.langchain_service import langchain_service
+from app.services.registry import gemini_service, langchain_service
 from app.utils.error_handlers import ExternalAPIError
 
 router = APIRouter(prefix="/chat", tags=["AI Chat Assistant"])
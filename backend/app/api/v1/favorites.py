@@ -13,6 +13,7 @@ from app.schemas.recipe_schema import (
     RatingResponse
 )
 from app.database import db
+from app.services.registry import services
 
 router = APIRouter(prefix="/favorites", tags=["Favorites & Ratings"])
 
@@ -66,6 +67,9 @@ async def get_user_favorites(user_id: str):
     Get all favorites for a user
     
     - **user_id**: User ID or session ID
+    
+    ``recipes`` holds the favorited catalog recipes (IDs not in the catalog
+    are listed in ``favorites`` only)
     """
     try:
         favorites = FAVORITES_STORE.get(user_id, [])
@@ -74,6 +78,7 @@ async def get_user_favorites(user_id: str):
             "success": True,
             "user_id": user_id,
             "favorites": favorites,
+            "recipes": services.get("recipe_catalog").get_many(favorites),
             "total": len(favorites)
         }
         
@@ -177,7 +182,7 @@ async def get_recipe_ratings(recipe_id: str):
     """
     Get all ratings for a recipe
     
-    - **recipe_id**: Recipe ID
+    - **recipe_id**: Recipe ID (``recipe`` is the catalog recipe, or null)
     """
     try:
         ratings = RATINGS_STORE.get(recipe_id, [])
@@ -191,6 +196,7 @@ async def get_recipe_ratings(recipe_id: str):
         return {
             "success": True,
             "recipe_id": recipe_id,
+            "recipe": services.get("recipe_catalog").get(recipe_id),
             "average_rating": round(average, 2),
             "total_ratings": len(ratings),
             "ratings": ratings
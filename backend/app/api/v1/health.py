@@ -10,8 +10,11 @@ from loguru import logger
 from app.schemas.response_schema import HealthCheckResponse
 from app.config import settings
 from app.database import check_database_connection
-from app.services.gemini_service import gemini_service
-from app.services.spoonacular_service import spoonacular_service
+from app.services.executor import cpu_executor
+from app.services.registry import services, gemini_service
+from app.services import recipe_json
+from app.services.recipe_matcher import RecipeMatcher
+from app.services.result_cache import nutrition_cache
 
 router = APIRouter(tags=["Health"])
 
@@ -25,30 +28,40 @@ async def health_check():
     # Check database connection
     db_connected = await check_database_connection()
     
-    # Check services
-    gemini_available = gemini_service.model is not None
-    spoonacular_available = (
-        spoonacular_service.api_key and
-        spoonacular_service.api_key != "your-spoonacular-api-key"
+    # Check services without forcing a cold build; Gemini reports
+    # unavailable until the warm-up has constructed it
+    gemini_available = (
+        services.is_ready("gemini_service") and gemini_service.model is not None
+    )
+    spoonacular_available = bool(
+        settings.SPOONACULAR_API_KEY and
+        settings.SPOONACULAR_API_KEY != "your-spoonacular-api-key"
     )
     
-    services = {
+    service_status = {
         "database": db_connected,
         "gemini_ai": gemini_available,
         "spoonacular": spoonacular_available
     }
     
     # Overall status
-    all_services_healthy = all(services.values())
+    all_services_healthy = all(service_status.values())
     status = "healthy" if all_services_healthy else "degraded"
     
-    logger.info(f"Health check: {status} - Services: {services}")
+    logger.info(f"Health check: {status} - Services: {service_status}")
     
     return HealthCheckResponse(
         status=status,
         version=settings.APP_VERSION,
         timestamp=datetime.utcnow().isoformat(),
         database_connected=db_connected,
-        services=services
+        services=service_status,
+        readiness=services.status(),
+        caches={
+            "nutrition": nutrition_cache.stats(),
+            "ingredient_similarity": RecipeMatcher.cache_stats(),
+            "recipe_json": recipe_json.cache_stats(),
+        },
+        executors={"cpu": cpu_executor.stats()}
     )
 
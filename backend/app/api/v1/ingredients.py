@@ -13,11 +13,12 @@ from app.schemas.ingredient_schema import (
     SubstitutionRequest,
     SubstitutionResponse
 )
-from app.services.gemini_service import gemini_service
-from app.services.image_processor import image_processor
+from app.services.registry import gemini_service
+from app.services.executor import cpu_executor
+from app.services.image_processor import ImageProcessor
 from app.services.substitution_service import substitution_service
 from app.utils.validators import validate_image_file
-from app.utils.error_handlers import ImageProcessingError, IngredientRecognitionError
+from app.utils.error_handlers import ImageProcessingError, IngredientRecognitionError, TaskTimeoutError
 
 router = APIRouter(prefix="/ingredients", tags=["Ingredients"])
 
@@ -41,8 +42,10 @@ async def recognize_ingredients_from_image(
         # Read file contents
         image_bytes = await file.read()
         
-        # Process image
-        processed_bytes, metadata = image_processor.validate_and_process_image(image_bytes)
+        # Process image (decode, resize, re-encode) off the event loop
+        processed_bytes, metadata = await cpu_executor.run(
+            ImageProcessor.validate_and_process_image, image_bytes
+        )
         
         logger.info(f"Processing image: {metadata}")
         
@@ -59,7 +62,7 @@ async def recognize_ingredients_from_image(
             message=f"Successfully recognized {len(ingredients)} ingredients"
         )
         
-    except (ImageProcessingError, IngredientRecognitionError) as e:
+    except (ImageProcessingError, IngredientRecognitionError, TaskTimeoutError) as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         logger.error(f"Unexpected error in ingredient recognition: {e}")
@@ -1,18 +1,42 @@
 """
 Nutrition endpoints: bioavailability and RDA coverage
+Bioavailability and RDA computes run on the CPU executor, off the event loop.
 """
 
-from fastapi import APIRouter, HTTPException
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
 
 from app.schemas.nutrition_schema import (
+    BioavailabilityBatchItem,
+    BioavailabilityBatchRequest,
+    BioavailabilityBatchResponse,
+    BioavailabilityCompareRequest,
+    BioavailabilityCompareResponse,
     BioavailabilityRequest,
     BioavailabilityResponse,
+    MealAnalysisRequest,
+    MealAnalysisResponse,
     RDACoverageRequest,
     RDACoverageResponse,
+    RDAGapRequest,
+    RDAGapResponse,
 )
-from app.services.bioavailability_service import bioavailability_engine
-from app.services.rda_service import rda_calculator
+from app.services.cohort_coverage import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, stream_coverage
+from app.services.executor import cpu_executor
+from app.services.gap_optimizer import close_gaps
+from app.services.meal_analysis import analyze_meal
+from app.services.rda_service import format_coverage
+from app.services.registry import call_service, rda_calculator
+from app.services.result_cache import canonical_ingredients, canonical_key, nutrition_cache
 from app.services.recommendation_service import generate_recommendations
+from app.utils.error_handlers import TaskTimeoutError
 
 
 router = APIRouter(prefix="/nutrition", tags=["Nutrition"])
@@ -21,34 +45,164 @@ router = APIRouter(prefix="/nutrition", tags=["Nutrition"])
 @router.post("/bioavailability", response_model=BioavailabilityResponse)
 async def compute_bioavailability(req: BioavailabilityRequest):
     try:
-        result = bioavailability_engine.compute(
+        key = canonical_key(
+            "bioavailability",
+            ingredients=canonical_ingredients(req.ingredients),
+            cooking_method=req.cooking_method.value,
+            stress_level=req.stress_level.value,
+            age=req.age,
+            post_workout=req.post_workout,
+        )
+        result = await nutrition_cache.get_or_run(key, lambda: cpu_executor.run(
+            call_service, "bioavailability_engine", "compute",
             ingredients=req.ingredients,
             cooking_method=req.cooking_method,
             stress_level=req.stress_level,
             age=req.age,
             post_workout=req.post_workout,
-        )
+        ))
         return BioavailabilityResponse(
             base_nutrients=result["base_nutrients"],
             adjusted_nutrients=result["adjusted_nutrients"],
             adjustment_factors=result["adjustment_factors"],
         )
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze", response_model=MealAnalysisResponse)
+async def analyze(req: MealAnalysisRequest):
+    """
+    Bioavailability, RDA coverage and recommendations for a meal in one call
+    
+    - **timings_ms**: per-stage pipeline timings, plus the executor queue
+      wait and the end-to-end total
+    """
+    start = time.perf_counter()
+    try:
+        result = await cpu_executor.run(
+            analyze_meal,
+            ingredients=req.ingredients,
+            cooking_method=req.cooking_method,
+            stress_level=req.stress_level,
+            age=req.age,
+            post_workout=req.post_workout,
+            weight_kg=req.weight_kg,
+            height_cm=req.height_cm,
+            dietary_tag=req.dietary_tag.value if req.dietary_tag else None,
+            food_classification=req.food_classification,
+        )
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    timings = result["timings_ms"]
+    total_ms = (time.perf_counter() - start) * 1000
+    timings["queue_and_transfer"] = round(max(0.0, total_ms - sum(timings.values())), 3)
+    timings["total"] = round(total_ms, 3)
+    return MealAnalysisResponse(
+        **result,
+        user_profile={
+            "age": req.age,
+            "weight_kg": req.weight_kg,
+            "height_cm": req.height_cm,
+        },
+    )
+
+
+@router.post("/bioavailability/compare", response_model=BioavailabilityCompareResponse)
+async def compare_cooking_methods(req: BioavailabilityCompareRequest):
+    """Adjusted nutrients for every cooking method in one response"""
+    try:
+        result = await cpu_executor.run(
+            call_service, "bioavailability_engine", "compare_methods",
+            ingredients=req.ingredients,
+            stress_level=req.stress_level,
+            age=req.age,
+            post_workout=req.post_workout,
+        )
+        return BioavailabilityCompareResponse(**result)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+@router.post("/bioavailability/batch", response_model=BioavailabilityBatchResponse)
+async def compute_bioavailability_batch(req: BioavailabilityBatchRequest):
+    """Compute many meals in one request; results come back in input order"""
+    items: List[BioavailabilityBatchItem] = []
+    valid: Dict[int, BioavailabilityRequest] = {}
+    for i, meal in enumerate(req.meals):
+        try:
+            valid[i] = BioavailabilityRequest.model_validate(meal)
+        except ValidationError as e:
+            items.append(BioavailabilityBatchItem(index=i, success=False, error=_validation_message(e)))
+
+    try:
+        results = await cpu_executor.run(call_service, "bioavailability_engine", "compute_batch", [
+            {
+                "ingredients": meal.ingredients,
+                "cooking_method": meal.cooking_method,
+                "stress_level": meal.stress_level,
+                "age": meal.age,
+                "post_workout": meal.post_workout,
+            }
+            for meal in valid.values()
+        ])
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    items.extend(
+        BioavailabilityBatchItem(index=i, **result)
+        for i, result in zip(valid, results)
+    )
+    items.sort(key=lambda item: item.index)
+    return BioavailabilityBatchResponse(
+        results=items,
+        count=len(items),
+        failed=sum(not item.success for item in items),
+    )
+
+
 @router.post("/rda-coverage", response_model=RDACoverageResponse)
 async def rda_coverage(req: RDACoverageRequest):
     try:
-        coverage = rda_calculator.coverage(
-            nutrients=req.adjusted_nutrients,
+        # Coverage depends on the profile only through its RDA bracket; it is
+        # computed from the same rounded amounts that make up the key
+        nutrients = {k: round(v, 2) for k, v in req.adjusted_nutrients.items()}
+        key = canonical_key(
+            "rda_coverage",
+            nutrients=nutrients,
+            profile=rda_calculator.profile_key(req.age, req.weight_kg, req.height_cm),
+        )
+        coverage = await nutrition_cache.get_or_run(key, lambda: cpu_executor.run(
+            call_service, "rda_calculator", "coverage_values",
+            nutrients=nutrients,
             age=req.age,
             weight=req.weight_kg,
             height=req.height_cm,
+        ))
+        recs = await cpu_executor.run(
+            generate_recommendations,
+            coverage,
+            dietary_tag=req.dietary_tag.value if req.dietary_tag else None,
+            classification=req.food_classification,
         )
-        recs = generate_recommendations(coverage)
         return RDACoverageResponse(
-            rda_coverage=coverage,
+            rda_coverage=format_coverage(coverage),
+            rda_coverage_pct=coverage,
             user_profile={
                 "age": req.age,
                 "weight_kg": req.weight_kg,
@@ -57,7 +211,88 @@ async def rda_coverage(req: RDACoverageRequest):
             recommendations=recs,
             recommendation_count=len(recs),
         )
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rda-coverage/optimize", response_model=RDAGapResponse)
+async def optimize_rda_gaps(req: RDAGapRequest):
+    """
+    Foods and amounts to add so every nutrient reaches target_pct of its RDA
+    
+    - Greedy over the Anuvaad foods (half to two servings each), bounded by
+      GAP_OPTIMIZER_BUDGET_MS; **budget_exhausted** marks a cut-short solve
+    - Additions never take sodium or energy past 100% of RDA
+    - **projected_coverage** is the coverage after the additions
+    """
+    try:
+        result = await cpu_executor.run(
+            close_gaps,
+            nutrients=req.adjusted_nutrients,
+            age=req.age,
+            weight_kg=req.weight_kg,
+            height_cm=req.height_cm,
+            target_pct=req.target_pct,
+            max_foods=req.max_foods,
+            max_portion_g=req.max_portion_g,
+            dietary_tag=req.dietary_tag.value if req.dietary_tag else None,
+            food_classification=req.food_classification,
+        )
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return RDAGapResponse(
+        **result,
+        user_profile={
+            "age": req.age,
+            "weight_kg": req.weight_kg,
+            "height_cm": req.height_cm,
+        },
+    )
+
+
+@router.post("/rda-coverage/cohort")
+async def rda_coverage_cohort(
+    file: UploadFile = File(..., description="CSV or JSONL of (profile, meal) rows"),
+    format: Optional[str] = Query(None, description="csv or jsonl (default: from the file name)"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=50000),
+):
+    """
+    Stream RDA coverage for a cohort file
+    
+    - Rows need **age**, **weight_kg**, **height_cm** and nutrient columns
+      (e.g. protein_g, iron_mg); other columns are passed through
+    - Returns one `<nutrient>_pct` column per nutrient, in the input format
+    """
+    fmt = format or detect_format(file.filename)
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    # FastAPI closes the upload before the body streams, so hand the
+    # generator its own copy (spills to disk past a few MB)
+    source = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    await run_in_threadpool(shutil.copyfileobj, file.file, source)
+    source.seek(0)
+
+    chunks = stream_coverage(source, fmt, chunk_size)
+    try:
+        # Pull the first chunk here so a malformed file is a 400, not a cut-off stream
+        first = await run_in_threadpool(next, chunks, "")
+    except (ValueError, KeyError) as e:
+        source.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def body():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            source.close()
 
+    # StreamingResponse iterates this sync generator on a worker thread
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
@@ -3,33 +3,57 @@ Recipe Endpoints
 Search, filter, and retrieve recipes
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from typing import List, Optional
-from uuid import UUID
 from loguru import logger
+from pydantic_core import to_json
 
 from app.schemas.recipe_schema import (
     RecipeSearchRequest,
     RecipeSearchResponse,
     RecipeDetailResponse,
-    RecipeListResponse
+    RecipeListResponse,
+    RecipeView
 )
 from app.models.recipe import Recipe
+from app.services.recipe_catalog import NUTRITION_FIELDS
+from app.services.recipe_json import etag_matches, json_cache, projection, strong_etag
 from app.services.recipe_matcher import recipe_matcher
+from app.services.registry import services
 from app.utils.validators import validate_ingredients, validate_dietary_restrictions
 from app.utils.error_handlers import ValidationError, RecipeNotFoundError
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
 
-# Import seed recipes
+# Seed recipes (the default catalog) are imported from backend/data
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from data.seed_recipes import SEED_RECIPES
+
+
+def get_catalog():
+    """The compact recipe catalog (built on first use)"""
+    return services.get("recipe_catalog")
+
+
+def json_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """Pre-serialized JSON with its ETag, or 304 Not Modified when the client's copy matches"""
+    headers = {"ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+FIELDS_DESCRIPTION = "🧩 Comma-separated recipe fields to return (e.g. id,title,image_url); overrides view"
 
 
 @router.post("/search", response_model=RecipeSearchResponse)
-async def search_recipes(request: RecipeSearchRequest):
+async def search_recipes(
+    request: RecipeSearchRequest,
+    view: RecipeView = Query(RecipeView.FULL, description="🗂️ full recipes, or summary cards"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """
     🍳 Search Recipes - Interactive Form Interface
     
@@ -53,8 +77,14 @@ async def search_recipes(request: RecipeSearchRequest):
     - **Dietary Restrictions**: vegetarian, vegan, gluten-free, dairy-free, nut-free, egg-free, soy-free, low-carb, keto, paleo, pescatarian, halal, kosher
     - **Cuisine Types**: Italian, Indian, Mexican, Japanese, Thai, Chinese, Greek, French, American, Mediterranean, Middle Eastern, Hawaiian
     - **Difficulty Levels**: Easy, Medium, Hard
+    
+    **🧩 Smaller Responses:**
+    `?view=summary` or `?fields=id,title,image_url` trims each matched recipe
+    to those fields; match scores and ingredient lists are always included.
     """
     try:
+        recipe_fields = projection(view.value, fields)
+        
         # Validate ingredients
         cleaned_ingredients = validate_ingredients(request.ingredients)
         
@@ -66,15 +96,10 @@ async def search_recipes(request: RecipeSearchRequest):
         
         logger.info(f"Searching recipes with {len(cleaned_ingredients)} ingredients")
         
-        # Get all recipes (from seed data or database)
-        all_recipes = SEED_RECIPES
-        
-        # Filter by cuisine if specified
-        if request.cuisine_type:
-            all_recipes = [
-                r for r in all_recipes
-                if r.cuisine_type and r.cuisine_type.lower() == request.cuisine_type.value.lower()
-            ]
+        # The matcher keeps its indexes per catalog, so pass the whole
+        # catalog and let it apply the filters; only returned recipes are
+        # materialized as Recipe models
+        all_recipes = get_catalog()
         
         # Match recipes
         matched_recipes = recipe_matcher.match_recipes(
@@ -82,27 +107,37 @@ async def search_recipes(request: RecipeSearchRequest):
             user_ingredients=cleaned_ingredients,
             dietary_restrictions=dietary_restrictions_str,
             max_cook_time=request.max_cook_time,
-            difficulty=request.difficulty.value if request.difficulty else None
+            difficulty=request.difficulty.value if request.difficulty else None,
+            cuisine_type=request.cuisine_type.value if request.cuisine_type else None,
+            limit=request.limit,
+            recipe_fields=recipe_fields
         )
         
-        # Limit results
-        matched_recipes = matched_recipes[:request.limit]
-        
-        return RecipeSearchResponse(
-            success=True,
-            recipes=matched_recipes,
-            total_found=len(matched_recipes),
-            query_info={
-                "ingredients_count": len(cleaned_ingredients),
-                "dietary_restrictions": dietary_restrictions_str or [],
-                "cuisine_type": request.cuisine_type.value if request.cuisine_type else None,
-                "filters_applied": {
-                    "max_prep_time": request.max_prep_time,
-                    "max_cook_time": request.max_cook_time,
-                    "difficulty": request.difficulty.value if request.difficulty else None
-                }
+        query_info = {
+            "ingredients_count": len(cleaned_ingredients),
+            "dietary_restrictions": dietary_restrictions_str or [],
+            "cuisine_type": request.cuisine_type.value if request.cuisine_type else None,
+            "filters_applied": {
+                "max_prep_time": request.max_prep_time,
+                "max_cook_time": request.max_cook_time,
+                "difficulty": request.difficulty.value if request.difficulty else None
             }
+        }
+        
+        if recipe_fields is None:
+            return RecipeSearchResponse(
+                success=True,
+                recipes=matched_recipes,
+                total_found=len(matched_recipes),
+                query_info=query_info
+            )
+        
+        # Projected recipes are spliced in from the JSON cache
+        body = (
+            b'{"success":true,"recipes":' + json_cache().match_array(matched_recipes, recipe_fields)
+            + f',"total_found":{len(matched_recipes)},"query_info":'.encode() + to_json(query_info) + b"}"
         )
+        return Response(content=body, media_type="application/json")
         
     except ValidationError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
@@ -112,44 +147,52 @@ async def search_recipes(request: RecipeSearchRequest):
 
 
 @router.get("/{recipe_id}", response_model=RecipeDetailResponse)
-async def get_recipe_detail(recipe_id: str):
+async def get_recipe_detail(
+    recipe_id: str,
+    view: RecipeView = Query(RecipeView.FULL, description="full recipe or the list-card summary"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get detailed information for a specific recipe
     
     - **recipe_id**: Recipe ID or index
+    - **view**: full (default) or summary
+    - **fields**: comma-separated recipe fields to return instead of a view
+    
+    Served from pre-serialized JSON with a strong ETag; send it back in
+    If-None-Match to get 304 Not Modified.
     """
     try:
+        recipe_fields = projection(view.value, fields)
+        
         # Try to find recipe by ID or index
-        all_recipes = SEED_RECIPES
+        catalog = get_catalog()
+        position = None
         
         # Try as index first
         try:
             index = int(recipe_id)
-            if 0 <= index < len(all_recipes):
-                return RecipeDetailResponse(
-                    success=True,
-                    recipe=all_recipes[index]
-                )
+            if 0 <= index < len(catalog):
+                position = index
         except ValueError:
             pass
         
-        # Try as UUID
-        try:
-            uuid_id = UUID(recipe_id)
-            for recipe in all_recipes:
-                if recipe.id == uuid_id:
-                    return RecipeDetailResponse(
-                        success=True,
-                        recipe=recipe
-                    )
-        except ValueError:
-            pass
+        # Try as recipe ID (hash index lookup)
+        if position is None:
+            position = catalog.position_of(recipe_id)
+        
+        if position is not None:
+            body, etag = json_cache().record(position, recipe_fields)
+            return json_response(b'{"success":true,"recipe":' + body + b"}", etag, if_none_match)
         
         # Not found
         raise RecipeNotFoundError(recipe_id)
         
     except RecipeNotFoundError as e:
         raise HTTPException(status_code=404, detail=e.message)
+    except ValidationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to get recipe detail: {e}")
         raise HTTPException(status_code=500, detail="Failed to get recipe")
@@ -184,7 +227,13 @@ async def list_recipes(
         None, 
         description="🥗 Filter by dietary tags (comma-separated). Available options: vegetarian, vegan, gluten-free, dairy-free, nut-free, egg-free, soy-free, low-carb, keto, paleo, pescatarian, halal, kosher",
         example="vegetarian,gluten-free"
-    )
+    ),
+    view: RecipeView = Query(
+        RecipeView.FULL,
+        description="🗂️ full recipes, or summary cards (title, image, times, tags)"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION, example="id,title,image_url"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     📚 List All Recipes - Browse Recipe Collection
@@ -213,43 +262,43 @@ async def list_recipes(
     - Italian recipes only: `/recipes/?cuisine=Italian`
     - Easy vegetarian recipes: `/recipes/?difficulty=easy&dietary_tags=vegetarian`
     - Gluten-free with pagination: `/recipes/?dietary_tags=gluten-free&page=2&page_size=5`
+    - Summary cards only: `/recipes/?view=summary`
+    - Just titles and images: `/recipes/?fields=id,title,image_url`
+    
+    **⚡ Caching:**
+    Recipes are served from pre-serialized JSON; responses carry a strong
+    ETag, and a matching If-None-Match gets 304 Not Modified.
     """
     try:
-        recipes = SEED_RECIPES
-        
-        # Apply filters
-        if cuisine:
-            recipes = [r for r in recipes if r.cuisine_type and r.cuisine_type.lower() == cuisine.lower()]
+        recipe_fields = projection(view.value, fields)
+        catalog = get_catalog()
         
-        if difficulty:
-            recipes = [r for r in recipes if r.difficulty == difficulty.lower()]
-        
-        if dietary_tags:
-            tags = [tag.strip().lower() for tag in dietary_tags.split(',')]
-            recipes = [
-                r for r in recipes
-                if any(tag in [t.lower() for t in r.dietary_tags] for tag in tags)
-            ]
+        # Apply filters (recipes with any of the dietary tags) as bitmaps
+        tags = [tag.strip().lower() for tag in dietary_tags.split(',')] if dietary_tags else []
+        positions = recipe_matcher.filters_for(catalog).positions(
+            cuisine=cuisine,
+            difficulty=difficulty,
+            any_tags=tags
+        )
         
         # Show newest seeds first so recently added recipes appear on page 1
-        recipes = list(reversed(recipes))
+        positions = positions[::-1]
 
-        # Pagination
-        total = len(recipes)
+        # Pagination; the page's recipes come from the JSON cache
+        total = len(positions)
         total_pages = (total + page_size - 1) // page_size  # Ceiling division
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        paginated_recipes = recipes[start_idx:end_idx]
+        recipes_json = json_cache().array(positions[start_idx:end_idx], recipe_fields)
         
-        return RecipeListResponse(
-            success=True,
-            recipes=paginated_recipes,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        body = (
+            b'{"success":true,"recipes":' + recipes_json
+            + f',"total":{total},"page":{page},"page_size":{page_size},"total_pages":{total_pages}}}'.encode()
         )
+        return json_response(body, strong_etag(body), if_none_match)
         
+    except ValidationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to list recipes: {e}")
         raise HTTPException(status_code=500, detail="Failed to list recipes")
@@ -277,7 +326,7 @@ async def get_recipe_options():
             "cuisine_types": [cuisine.value for cuisine in CuisineType],
             "difficulty_levels": [difficulty.value for difficulty in DifficultyLevel],
             "dietary_restrictions": [restriction.value for restriction in DietaryRestriction],
-            "total_recipes": len(SEED_RECIPES)
+            "total_recipes": len(get_catalog())
         },
         "usage": {
             "cuisine_examples": ["Italian", "Indian", "Mexican"],
@@ -292,7 +341,10 @@ async def filter_by_nutrition(
     max_calories: Optional[int] = Query(None, description="Maximum calories"),
     min_protein: Optional[float] = Query(None, description="Minimum protein (g)"),
     max_carbs: Optional[float] = Query(None, description="Maximum carbs (g)"),
-    max_fat: Optional[float] = Query(None, description="Maximum fat (g)")
+    max_fat: Optional[float] = Query(None, description="Maximum fat (g)"),
+    view: RecipeView = Query(RecipeView.FULL, description="full recipes, or summary cards"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Filter recipes by nutritional requirements
@@ -301,33 +353,33 @@ async def filter_by_nutrition(
     - **min_protein**: Minimum protein in grams
     - **max_carbs**: Maximum carbs in grams
     - **max_fat**: Maximum fat in grams
+    - **view** / **fields**: summary cards or chosen recipe fields only
     """
     try:
-        recipes = SEED_RECIPES
-        filtered = []
+        recipe_fields = projection(view.value, fields)
+        catalog = get_catalog()
+        keep = catalog.has_nutrition.copy()
         
-        for recipe in recipes:
-            if not recipe.nutrition:
-                continue
-            
-            # Apply filters
-            if max_calories and recipe.nutrition.calories and recipe.nutrition.calories > max_calories:
-                continue
-            if min_protein and recipe.nutrition.protein and recipe.nutrition.protein < min_protein:
-                continue
-            if max_carbs and recipe.nutrition.carbs and recipe.nutrition.carbs > max_carbs:
-                continue
-            if max_fat and recipe.nutrition.fat and recipe.nutrition.fat > max_fat:
-                continue
-            
-            filtered.append(recipe)
+        # Apply filters; missing (NaN) or zero values never exclude a recipe
+        for field, limit, exceeds in (
+            ("calories", max_calories, np.greater),
+            ("protein", min_protein, np.less),
+            ("carbs", max_carbs, np.greater),
+            ("fat", max_fat, np.greater),
+        ):
+            if limit:
+                values = catalog.nutrition[:, NUTRITION_FIELDS.index(field)]
+                keep &= ~((values != 0) & exceeds(values, limit))
         
-        return {
-            "success": True,
-            "recipes": filtered,
-            "total_found": len(filtered)
-        }
+        positions = np.flatnonzero(keep)
+        body = (
+            b'{"success":true,"recipes":' + json_cache().array(positions, recipe_fields)
+            + f',"total_found":{len(positions)}}}'.encode()
+        )
+        return json_response(body, strong_etag(body), if_none_match)
         
+    except ValidationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         logger.error(f"Nutrition filter failed: {e}")
         raise HTTPException(status_code=500, detail="Filter failed")
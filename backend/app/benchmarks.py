@@ -0,0 +1,384 @@
+"""
+Micro-benchmarks for the hot service paths
+
+Run from the backend directory, e.g.:
+
+    python -m app.benchmarks bioavailability --size 500
+    python -m app.benchmarks recipe_matching --size 5000
+    python -m app.benchmarks catalog_memory --size 100000
+    python -m app.benchmarks response_bytes --size 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from app.schemas.nutrition_schema import CookingMethod, IngredientInfo, StressLevel
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+SAMPLE_FOODS = [
+    ("rice", "Grains"), ("dal", "Legumes"), ("spinach", "Vegetables"),
+    ("paneer", "Dairy"), ("chicken", "Meat"), ("milk", "Dairy"),
+    ("potato", "Vegetables"), ("wheat", "Grains"), ("oil", "Fats"),
+]
+# Meals timed with the (slow) DataFrame-lookup compute
+LEGACY_MEALS = 50
+
+
+def random_meals(count: int, seed: int = 7) -> List[dict]:
+    """Reproducible meals shaped like BioavailabilityRequest payloads"""
+    rng = random.Random(seed)
+    meals = []
+    for _ in range(count):
+        foods = rng.sample(SAMPLE_FOODS, rng.randint(1, 5))
+        meals.append({
+            "ingredients": [
+                IngredientInfo(name=name, quantity_g=round(rng.uniform(20, 250), 1), category=cat)
+                for name, cat in foods
+            ],
+            "cooking_method": rng.choice(list(CookingMethod)),
+            "stress_level": rng.choice(list(StressLevel)),
+            "age": rng.randint(10, 80),
+            "post_workout": rng.random() < 0.3,
+        })
+    return meals
+
+
+# Prefixes that turn the seed ingredients into a larger, realistic vocabulary
+INGREDIENT_MODIFIERS = [
+    "fresh", "dried", "smoked", "roasted", "chopped", "ground", "frozen", "organic",
+    "baby", "red", "green", "wild", "toasted", "sliced", "low-fat", "spicy",
+]
+
+
+def synthetic_catalog(count: int, seed: int = 7) -> list:
+    """Reproducible catalog of ``count`` recipes remixing the seed recipes' ingredients"""
+    from app.models.recipe import Ingredient
+    from app.services.recipe_catalog import recipe_content_id
+    from data.seed_recipes import SEED_RECIPES
+
+    rng = random.Random(seed)
+    base = sorted({ing.name.lower() for recipe in SEED_RECIPES for ing in recipe.ingredients})
+    vocabulary = base + [f"{m} {b}" for m in INGREDIENT_MODIFIERS for b in base]
+    catalog = []
+    for i in range(count):
+        template = SEED_RECIPES[i % len(SEED_RECIPES)]
+        recipe = template.model_copy(update={
+            "title": f"{template.title} #{i}",
+            "ingredients": [Ingredient(name=name) for name in rng.sample(vocabulary, rng.randint(4, 12))],
+        })
+        recipe.id = recipe_content_id(recipe.model_dump())
+        catalog.append(recipe)
+    return catalog
+
+
+def random_pantries(count: int, seed: int = 11) -> List[List[str]]:
+    """User ingredient lists drawn from the seed recipes' ingredients"""
+    from data.seed_recipes import SEED_RECIPES
+
+    rng = random.Random(seed)
+    base = sorted({ing.name.lower() for recipe in SEED_RECIPES for ing in recipe.ingredients})
+    return [rng.sample(base, rng.randint(3, 6)) for _ in range(count)]
+
+
+def _time_per_call(fn: Callable[[dict], object], meals: List[dict], repeat: int) -> float:
+    """Best-of-``repeat`` milliseconds per meal"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for meal in meals:
+            fn(meal)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / len(meals)
+
+
+def _legacy_compute(retention: "pd.DataFrame", digestibility: "pd.DataFrame") -> Callable[[dict], Dict[str, float]]:
+    """
+    The compute loop as it was before the lookup tables and vectorization:
+    per nutrient, a DataFrame filter for the retention factor and, per
+    ingredient, one for the digestibility factor
+    """
+    from app.services.nutrient_calculator import nutrient_calculator
+
+    def nutrient_type(n: str) -> str:
+        n = n.lower()
+        if any(x in n for x in ["protein", "amino"]):
+            return "Protein"
+        if any(x in n for x in ["carb", "sugar", "starch", "fiber"]):
+            return "Carbohydrates"
+        if any(x in n for x in ["fat", "lipid", "oil"]):
+            return "Fat"
+        if any(x in n for x in ["vitamin", "folate", "thiamine", "riboflavin", "niacin"]):
+            return "Vitamins"
+        if any(x in n for x in ["calcium", "iron", "magnesium", "phosphorus", "potassium", "sodium", "zinc"]):
+            return "Minerals"
+        return "Minerals"
+
+    def retention_factor(method: CookingMethod, nutrient: str) -> float:
+        df = retention
+        row = df[(df["cooking_method"] == method.value) & (df["nutrient_type"] == nutrient_type(nutrient))]
+        return float(row.iloc[0]["retention_factor"]) if not row.empty else 0.85
+
+    def digestibility_factor(ings: List[IngredientInfo]) -> float:
+        total = sum(i.quantity_g for i in ings) or 1.0
+        wsum = 0.0
+        for i in ings:
+            cat_key = (i.category or "Unknown").strip().lower()
+            row = digestibility[digestibility["food_category"].str.lower() == cat_key]
+            if row.empty:
+                row = digestibility[digestibility["food_category"].str.lower() == "unknown"]
+            factor = float(row.iloc[0]["digestibility_factor"]) if not row.empty else 0.8
+            wsum += (i.quantity_g / total) * factor
+        return wsum
+
+    def physio(stress: StressLevel, age: int, post: bool, nutrient: str) -> float:
+        f = 1.0
+        f *= 0.85 if stress == StressLevel.high else (0.92 if stress == StressLevel.medium else 1.0)
+        f *= 1.1 if age < 18 else (0.9 if age > 65 else 1.0)
+        nl = nutrient.lower()
+        if post:
+            if "protein" in nl:
+                f *= 1.15
+            elif "carb" in nl:
+                f *= 1.1
+            elif any(x in nl for x in ["mineral", "calcium", "iron", "zinc"]):
+                f *= 1.05
+        return f
+
+    def compute(meal: dict) -> Dict[str, float]:
+        ingredients = meal["ingredients"]
+        base = nutrient_calculator.calculate_nutrients(ingredients)
+        adjusted: Dict[str, float] = {}
+        for nutrient, value in base.items():
+            r = retention_factor(meal["cooking_method"], nutrient)
+            d = digestibility_factor(ingredients)
+            p = physio(meal["stress_level"], meal["age"], meal["post_workout"], nutrient)
+            adjusted[nutrient] = round(value * r * d * p, 2)
+        return adjusted
+
+    return compute
+
+
+def bench_bioavailability(meals: int, repeat: int) -> Dict[str, object]:
+    """
+    The previous compute (per-nutrient loop with DataFrame factor lookups)
+    vs the same loop over the precomputed lookups vs the vectorized compute.
+    The DataFrame loop is timed on at most LEGACY_MEALS meals.
+    """
+    import pandas as pd
+
+    from app.services.bioavailability_service import bioavailability_engine as engine
+    from app.services.nutrient_calculator import nutrient_calculator
+
+    legacy = _legacy_compute(pd.read_csv("data/retention_factors.csv"),
+                             pd.read_csv("data/digestibility_scores.csv"))
+
+    def lookups(meal: dict) -> Dict[str, float]:
+        base = nutrient_calculator.calculate_nutrients(meal["ingredients"])
+        return {
+            n: round(v
+                     * engine._retention(meal["cooking_method"], n)
+                     * engine._digestibility(meal["ingredients"])
+                     * engine._physio(meal["stress_level"], meal["age"], meal["post_workout"], n), 2)
+            for n, v in base.items()
+        }
+
+    def vectorized(meal: dict) -> Dict[str, float]:
+        return engine.compute(**meal)["adjusted_nutrients"]
+
+    sample = random_meals(meals)
+    legacy_sample = sample[:LEGACY_MEALS]
+    max_diff = max(
+        (abs(expected[n] - actual.get(n, 0.0))
+         for meal in legacy_sample
+         for expected, actual in [(legacy(meal), vectorized(meal))]
+         for n in expected),
+        default=0.0,
+    )
+    legacy_ms = _time_per_call(legacy, legacy_sample, repeat)
+    lookup_ms = _time_per_call(lookups, sample, repeat)
+    vector_ms = _time_per_call(vectorized, sample, repeat)
+    return {
+        "meals": meals,
+        "legacy_meals_timed": len(legacy_sample),
+        "dataframe_loop_ms_per_meal": round(legacy_ms, 4),
+        "lookup_loop_ms_per_meal": round(lookup_ms, 4),
+        "vectorized_ms_per_meal": round(vector_ms, 4),
+        "speedup": round(legacy_ms / vector_ms, 1),
+        "speedup_over_lookup_loop": round(lookup_ms / vector_ms, 1),
+        "max_abs_difference": round(max_diff, 4),
+    }
+
+
+def bench_recipe_matching(recipes: int, repeat: int) -> Dict[str, object]:
+    """
+    Full catalog scan (per-pair fuzzy matching) vs index candidates with
+    cached fuzzy scores vs the sparse recipe x ingredient matrix backend
+    """
+    from app.services.recipe_matcher import RecipeMatcher
+    from app.services.recipe_matrix import SparseRecipeMatcher
+
+    catalog = synthetic_catalog(recipes)
+    pantries = random_pantries(5)
+
+    def run(pantry: List[str], use_index: bool) -> list:
+        return RecipeMatcher.match_recipes(catalog, pantry, use_index=use_index)
+
+    def run_sparse(pantry: List[str]) -> list:
+        return SparseRecipeMatcher.match_recipes(catalog, pantry)
+
+    def signature(matches: list) -> list:
+        return [(m.recipe.title, m.match_percentage, m.matched_ingredients,
+                 m.can_make_with_substitutions) for m in matches]
+
+    start = time.perf_counter()
+    index = RecipeMatcher.index_for(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    SparseRecipeMatcher.matrix_for(catalog)
+    matrix_ms = (time.perf_counter() - start) * 1000
+    identical = all(
+        signature(run(p, False)) == signature(run(p, True)) == signature(run_sparse(p))
+        for p in pantries
+    )
+    candidates = sum(len(index.candidates(index.matching_terms(p))) for p in pantries)
+    scan_ms = _time_per_call(lambda p: run(p, False), pantries, repeat)
+    index_ms = _time_per_call(lambda p: run(p, True), pantries, repeat)
+    sparse_ms = _time_per_call(run_sparse, pantries, repeat)
+    return {
+        "recipes": recipes,
+        "indexed_ingredients": len(index),
+        "index_build_ms": round(build_ms, 1),
+        "matrix_build_ms": round(matrix_ms, 1),
+        "avg_candidates": round(candidates / len(pantries), 1),
+        "full_scan_ms_per_query": round(scan_ms, 2),
+        "indexed_ms_per_query": round(index_ms, 2),
+        "sparse_ms_per_query": round(sparse_ms, 2),
+        "speedup": round(scan_ms / index_ms, 1),
+        "sparse_speedup": round(scan_ms / sparse_ms, 1),
+        "identical_results": identical,
+    }
+
+
+def _allocated(build: Callable[[], object]) -> tuple:
+    """(result, bytes still allocated by building it, seconds for an untraced build)"""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def bench_catalog_memory(recipes: int, repeat: int) -> Dict[str, object]:
+    """Memory per recipe and load time: validated Recipe list vs compact RecipeCatalog (same JSONL)"""
+    from app.models.recipe import Recipe
+    from app.services.recipe_catalog import RecipeCatalog, write_jsonl
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.jsonl")
+        write_jsonl(synthetic_catalog(recipes), path)
+
+        def load_models() -> list:
+            with open(path, "rb") as f:
+                return [Recipe.model_validate_json(line) for line in f]
+
+        models, models_bytes, models_s = _allocated(load_models)
+        catalog, catalog_bytes, catalog_s = _allocated(lambda: RecipeCatalog.from_jsonl(path))
+        positions = list(range(0, recipes, max(1, recipes // 100)))
+        identical = all(catalog.recipe(i) == models[i] for i in positions)
+        materialize_ms = _time_per_call(catalog.recipe, positions, repeat)
+
+    return {
+        "recipes": recipes,
+        "model_bytes_per_recipe": round(models_bytes / recipes),
+        "catalog_bytes_per_recipe": round(catalog_bytes / recipes),
+        "memory_reduction": round(models_bytes / catalog_bytes, 1),
+        "model_load_s": round(models_s, 2),
+        "catalog_load_s": round(catalog_s, 2),
+        "materialize_ms_per_recipe": round(materialize_ms, 3),
+        "identical_recipes": identical,
+    }
+
+
+def bench_response_bytes(recipes: int, repeat: int) -> Dict[str, object]:
+    """
+    Bytes per list page and search response, and cold serialization time per
+    list page, for the full recipes vs view=summary vs fields=id,title,image_url
+    """
+    from app.services.recipe_catalog import RecipeCatalog
+    from app.services.recipe_json import RecipeJSONCache, projection
+    from app.services.recipe_matcher import RecipeMatcher
+
+    catalog = RecipeCatalog.from_recipes(synthetic_catalog(recipes))
+    pages = [list(range(start, min(start + 50, recipes))) for start in range(0, recipes, 50)]
+    pantries = random_pantries(5)
+    matches = [RecipeMatcher.match_recipes(catalog, p, limit=20) for p in pantries]
+    projections = {
+        "full": projection("full"),
+        "summary": projection("summary"),
+        "fields": projection(fields="id,title,image_url"),
+    }
+
+    result: Dict[str, object] = {"recipes": recipes, "page_size": 50, "search_limit": 20}
+    for name, fields in projections.items():
+        cache = RecipeJSONCache(catalog, max_bytes=1 << 40)
+        page_bytes = sum(len(cache.array(page, fields)) for page in pages) / len(pages)
+        search_bytes = sum(len(cache.match_array(m, fields)) for m in matches) / len(matches)
+        # A fresh cache per call, so every page is serialized from the catalog
+        cold_ms = _time_per_call(
+            lambda page: RecipeJSONCache(catalog, max_bytes=1 << 40).array(page, fields),
+            pages[:20], repeat
+        )
+        result[f"{name}_page_bytes"] = round(page_bytes)
+        result[f"{name}_search_bytes"] = round(search_bytes)
+        result[f"{name}_cold_page_ms"] = round(cold_ms, 2)
+    for name in ("summary", "fields"):
+        result[f"{name}_page_reduction"] = round(result["full_page_bytes"] / result[f"{name}_page_bytes"], 1)
+        result[f"{name}_search_reduction"] = round(
+            result["full_search_bytes"] / result[f"{name}_search_bytes"], 1
+        )
+    return result
+
+
+BENCHMARKS = {
+    "bioavailability": bench_bioavailability,
+    "recipe_matching": bench_recipe_matching,
+    "catalog_memory": bench_catalog_memory,
+    "response_bytes": bench_response_bytes,
+}
+# Problem size (meals / recipes) when --size is not given
+DEFAULT_SIZES = {
+    "bioavailability": 500,
+    "recipe_matching": 2000,
+    "catalog_memory": 20000,
+    "response_bytes": 5000,
+}
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark service hot paths")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--size", "--meals", type=int, dest="size",
+                        help="Meals or recipes to run with (default per benchmark)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    size = args.size or DEFAULT_SIZES[args.benchmark]
+    print(json.dumps(BENCHMARKS[args.benchmark](size, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    _main()
@@ -71,6 +71,35 @@ class Settings(BaseSettings):
     ENABLE_SUBSTITUTIONS: bool = True
     ENABLE_AI_SUGGESTIONS: bool = True
     
+    # Nutrient Datasets
+    # Map one read-only numeric artifact so all workers share its pages
+    SHARED_DATASETS: bool = False
+    # Build services in the background at startup instead of on first request
+    WARM_UP_SERVICES: bool = True
+    # Result cache for /nutrition requests (0 disables it)
+    NUTRITION_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    NUTRITION_CACHE_TTL_SECONDS: int = 600
+    # Time budget for one /nutrition/rda-coverage/optimize solve
+    GAP_OPTIMIZER_BUDGET_MS: float = 50.0
+    
+    # Recipe matching: fuzzy scores precomputed for the most used catalog
+    # ingredients, plus an LRU of other (user) terms
+    INGREDIENT_SIMILARITY_CANONICAL_TERMS: int = 256
+    INGREDIENT_SIMILARITY_MAX_TERMS: int = 4096
+    # Recipe matcher backend: "scan" (per-recipe scoring) or "sparse"
+    # (recipe x ingredient matrix); both give the same results
+    RECIPE_MATCHER_BACKEND: str = "scan"
+    # Recipe catalog to serve: JSONL or .parquet of Recipe-shaped records
+    # (empty = the bundled seed recipes)
+    RECIPE_CATALOG_PATH: str = ""
+    # Pre-serialized recipe JSON for /recipes responses (bytes)
+    RECIPE_JSON_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
+    # CPU Task Executor ("thread" or "process")
+    EXECUTOR_KIND: str = "thread"
+    EXECUTOR_MAX_WORKERS: int = 4
+    EXECUTOR_TASK_TIMEOUT_SECONDS: float = 10.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
+import asyncio
 import time
 
 from app.config import settings
@@ -18,6 +19,9 @@ from app.utils.error_handlers import (
     general_exception_handler
 )
 from app.middleware.cors import setup_cors
+from app.services.executor import cpu_executor
+from app.services.recipe_matcher import recipe_matcher
+from app.services.registry import services, gemini_service
 
 # Import routers
 from app.api.v1 import health, ingredients, recipes, favorites, chat, nutrition
@@ -102,6 +106,27 @@ async def root():
     }
 
 
+async def warm_up_services():
+    """Construct registered services off the event loop and log availability"""
+    await services.warm_up()
+    # Recipe ingredient index with its precomputed fuzzy scores (and the
+    # sparse matrix when that backend is selected)
+    if services.is_ready("recipe_catalog"):
+        await asyncio.to_thread(recipe_matcher.prepare, services.get("recipe_catalog"))
+    
+    if services.is_ready("gemini_service") and gemini_service.model:
+        logger.info("✅ Gemini AI service ready")
+    else:
+        logger.warning("⚠️  Gemini AI service not configured")
+    
+    if settings.SPOONACULAR_API_KEY and settings.SPOONACULAR_API_KEY != "your-spoonacular-api-key":
+        logger.info("✅ Spoonacular service ready")
+    else:
+        logger.warning("⚠️  Spoonacular service not configured")
+    
+    logger.info(f"Service load times (ms): {services.load_times()}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
@@ -111,19 +136,10 @@ async def startup_event():
     logger.info(f"Debug mode: {settings.DEBUG}")
     logger.info("=" * 60)
     
-    # Log service availability
-    from app.services.gemini_service import gemini_service
-    from app.services.spoonacular_service import spoonacular_service
-    
-    if gemini_service.model:
-        logger.info("✅ Gemini AI service ready")
-    else:
-        logger.warning("⚠️  Gemini AI service not configured")
-    
-    if spoonacular_service.api_key and spoonacular_service.api_key != "your-spoonacular-api-key":
-        logger.info("✅ Spoonacular service ready")
-    else:
-        logger.warning("⚠️  Spoonacular service not configured")
+    # Build datasets and AI clients in the background so /health answers
+    # immediately and the first nutrition request finds them warm
+    if settings.WARM_UP_SERVICES:
+        app.state.warm_up_task = asyncio.create_task(warm_up_services())
     
     logger.info(f"📚 API Documentation: http://localhost:{settings.PORT}/docs")
     logger.info(f"🏥 Health Check: http://localhost:{settings.PORT}/api/v1/health")
@@ -134,6 +150,7 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("👋 Shutting down Smart Recipe Generator API")
+    cpu_executor.shutdown()
 
 
 if __name__ == "__main__":
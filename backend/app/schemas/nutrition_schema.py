@@ -4,7 +4,7 @@ Nutrition schemas for bioavailability and RDA endpoints
 
 from pydantic import BaseModel, Field
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 
 class CookingMethod(str, Enum):
@@ -23,6 +23,12 @@ class StressLevel(str, Enum):
     high = "high"
 
 
+class DietaryTag(str, Enum):
+    vegetarian = "vegetarian"
+    vegan = "vegan"
+    non_vegetarian = "non-vegetarian"
+
+
 class IngredientInfo(BaseModel):
     name: str
     quantity_g: float = Field(gt=0)
@@ -52,18 +58,106 @@ class BioavailabilityResponse(BaseModel):
     adjustment_factors: Dict[str, object]
 
 
+class MealAnalysisRequest(BioavailabilityRequest):
+    # Meal plus the user profile needed for RDA coverage
+    weight_kg: float = Field(gt=0, le=300)
+    height_cm: float = Field(gt=0, le=250)
+    # Optional filters for the suggested foods
+    dietary_tag: Optional[DietaryTag] = None
+    food_classification: Optional[str] = Field(None, max_length=100)
+
+
+class MealAnalysisResponse(BaseModel):
+    success: bool = True
+    base_nutrients: Dict[str, float]
+    adjusted_nutrients: Dict[str, float]
+    adjustment_factors: Dict[str, object]
+    rda_coverage: Dict[str, str]
+    rda_coverage_pct: Dict[str, Optional[float]]
+    user_profile: Dict[str, object]
+    recommendations: List[Dict[str, object]] = []
+    recommendation_count: int = 0
+    timings_ms: Dict[str, float]  # pipeline stage -> milliseconds
+
+
+class BioavailabilityCompareRequest(BaseModel):
+    # Same as BioavailabilityRequest, evaluated for every CookingMethod
+    ingredients: List[IngredientInfo]
+    stress_level: StressLevel = StressLevel.low
+    age: int = Field(ge=1, le=120)
+    post_workout: bool = False
+
+
+class BioavailabilityCompareResponse(BaseModel):
+    success: bool = True
+    base_nutrients: Dict[str, float]
+    adjusted_by_method: Dict[str, Dict[str, float]]
+    retention_scores: Dict[str, float]
+    best_method: str
+    adjustment_factors: Dict[str, object]
+
+
+class BioavailabilityBatchRequest(BaseModel):
+    # Each item is a BioavailabilityRequest; items are validated one by one
+    # so a single bad meal is reported in its slot instead of failing the batch
+    meals: List[Dict[str, Any]] = Field(min_length=1, max_length=500)
+
+
+class BioavailabilityBatchItem(BaseModel):
+    index: int
+    success: bool = True
+    base_nutrients: Optional[Dict[str, float]] = None
+    adjusted_nutrients: Optional[Dict[str, float]] = None
+    adjustment_factors: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+
+
+class BioavailabilityBatchResponse(BaseModel):
+    success: bool = True
+    results: List[BioavailabilityBatchItem]
+    count: int
+    failed: int = 0
+
+
 class RDACoverageRequest(BaseModel):
     adjusted_nutrients: Dict[str, float]
     age: int = Field(ge=1, le=120)
     weight_kg: float = Field(gt=0, le=300)
     height_cm: float = Field(gt=0, le=250)
+    # Optional filters for the suggested foods
+    dietary_tag: Optional[DietaryTag] = None
+    food_classification: Optional[str] = Field(None, max_length=100)
 
 
 class RDACoverageResponse(BaseModel):
     success: bool = True
     rda_coverage: Dict[str, str]
+    # Same coverage as numbers (percent of RDA); null where there is no RDA
+    rda_coverage_pct: Dict[str, Optional[float]] = {}
     user_profile: Dict[str, object]
     recommendations: List[Dict[str, object]] = []
     recommendation_count: int = 0
 
 
+class RDAGapRequest(RDACoverageRequest):
+    # Lift every nutrient below target_pct of its RDA up to it
+    target_pct: float = Field(50.0, gt=0, le=200)
+    max_foods: int = Field(5, ge=1, le=10)
+    max_portion_g: float = Field(400.0, gt=0, le=1000)
+
+
+class RDAGapResponse(BaseModel):
+    success: bool = True
+    target_pct: float
+    flagged: Dict[str, float]  # nutrient -> coverage before, for those below target
+    additions: List[Dict[str, object]]
+    total_added_g: float
+    projected_coverage: Dict[str, str]
+    projected_coverage_pct: Dict[str, Optional[float]]
+    unmet: List[str] = []
+    complete: bool
+    budget_exhausted: bool = False
+    elapsed_ms: float
+    user_profile: Dict[str, object]
+
+
@@ -48,6 +48,12 @@ class DifficultyLevel(str, Enum):
     HARD = "hard"
 
 
+class RecipeView(str, Enum):
+    """Recipe projection in responses: everything, or the list-card summary"""
+    FULL = "full"
+    SUMMARY = "summary"
+
+
 class RecipeSearchRequest(BaseModel):
     """🍳 Search recipes by ingredients and preferences - Form Interface"""
     
@@ -26,4 +26,7 @@ class HealthCheckResponse(BaseModel):
     timestamp: str
     database_connected: bool
     services: Dict[str, bool]
+    readiness: Dict[str, str] = {}  # service -> pending/loading/ready/failed
+    caches: Dict[str, Dict[str, float]] = {}  # cache -> hit/miss/eviction counters
+    executors: Dict[str, Dict[str, Any]] = {}  # executor -> queue depth, wait/run times
 
@@ -4,34 +4,97 @@ Bioavailability computation service
 
 import os
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 
+from app.config import settings
 from app.schemas.nutrition_schema import IngredientInfo, CookingMethod, StressLevel
 from app.services.nutrient_calculator import nutrient_calculator
+from app.services.nutrient_tables import digestibility_table, retention_table, shared_tables
+from app.services.registry import services
 
 logger = logging.getLogger(__name__)
 
 
 class BioavailabilityEngine:
     def __init__(self, data_dir: str = "data"):
-        self.retention_factors = None
-        self.digestibility_scores = None
-        self._load(data_dir)
+        # cooking method x nutrient type; NaN where the CSV has no factor
+        self.retention_matrix: Optional[np.ndarray] = None
+        self.retention_methods: Dict[str, int] = {}
+        self.retention_types: Dict[str, int] = {}
+        # lowercased food category -> digestibility factor
+        self.digestibility_factors: Optional[Dict[str, float]] = None
+        if settings.SHARED_DATASETS:
+            self._load_shared()
+        else:
+            self._load(data_dir)
+        # Anuvaad column -> retention type position, resolved once
+        self.nutrient_type_index: Dict[str, Optional[int]] = {
+            n: self.retention_types.get(self._nutrient_type(n))
+            for n in nutrient_calculator.nutrient_columns
+        }
+        self._build_factor_vectors()
 
     def _load(self, data_dir: str):
         try:
             rf = os.path.join(data_dir, "retention_factors.csv")
             dg = os.path.join(data_dir, "digestibility_scores.csv")
             if os.path.exists(rf):
-                self.retention_factors = pd.read_csv(rf)
-                logger.info(f"Loaded retention_factors: {self.retention_factors.shape}")
+                self._set_retention(*retention_table(pd.read_csv(rf)))
+                logger.info(f"Loaded retention_factors: {self.retention_matrix.shape}")
             if os.path.exists(dg):
-                self.digestibility_scores = pd.read_csv(dg)
-                logger.info(f"Loaded digestibility_scores: {self.digestibility_scores.shape}")
+                factors, categories = digestibility_table(pd.read_csv(dg))
+                self.digestibility_factors = dict(zip(categories, factors.tolist()))
+                logger.info(f"Loaded digestibility_scores: {len(self.digestibility_factors)} categories")
         except Exception as e:
             logger.error(f"Failed loading nutrition factors: {e}")
 
+    def _load_shared(self):
+        try:
+            tables = shared_tables()
+            if "retention" in tables.arrays:
+                self._set_retention(
+                    tables["retention"],
+                    tables.meta["retention_methods"],
+                    tables.meta["nutrient_types"],
+                )
+            if "digestibility" in tables.arrays:
+                self.digestibility_factors = dict(zip(
+                    tables.meta["digestibility_categories"], tables["digestibility"].tolist()
+                ))
+            logger.info("Mapped retention and digestibility tables")
+        except Exception as e:
+            logger.error(f"Failed mapping nutrition factors: {e}")
+
+    def _set_retention(self, table: np.ndarray, methods: List[str], types: List[str]):
+        self.retention_matrix = table
+        self.retention_methods = {m: i for i, m in enumerate(methods)}
+        self.retention_types = {t: i for i, t in enumerate(types)}
+
+    def _build_factor_vectors(self):
+        """Per-column factor vectors aligned with ``nutrient_calculator.nutrient_columns``"""
+        columns = nutrient_calculator.nutrient_columns
+        self.retention_vectors: Dict[CookingMethod, np.ndarray] = {
+            method: np.array([self._retention(method, n) for n in columns], dtype=np.float64)
+            for method in CookingMethod
+        }
+        self.post_workout_vector = np.array(
+            [self._post_workout_factor(n) for n in columns], dtype=np.float64
+        )
+
+    def factor_vector(self,
+                      ingredients: List[IngredientInfo],
+                      cooking_method: CookingMethod,
+                      stress_level: StressLevel,
+                      age: int,
+                      post_workout: bool) -> np.ndarray:
+        """Combined retention x digestibility x physiological factor for every nutrient column"""
+        physio = self._stress_age_factor(stress_level, age)
+        if post_workout:
+            physio = physio * self.post_workout_vector
+        return self.retention_vectors[cooking_method] * self._digestibility(ingredients) * physio
+
     def compute(self,
                 ingredients: List[IngredientInfo],
                 cooking_method: CookingMethod,
@@ -39,14 +102,17 @@ class BioavailabilityEngine:
                 age: int,
                 post_workout: bool) -> Dict[str, Dict[str, float]]:
         # Use dataset-driven base nutrients
-        base = nutrient_calculator.calculate_nutrients(ingredients)
+        try:
+            rows, grams = nutrient_calculator.resolve_ingredients(ingredients)
+            totals, present = nutrient_calculator.nutrient_totals(rows, grams)
+        except Exception as e:
+            logger.error(f"Error calculating nutrients: {e}")
+            totals = np.zeros(len(nutrient_calculator.nutrient_columns))
+            present = np.zeros(len(totals), dtype=bool)
 
-        adjusted: Dict[str, float] = {}
-        for nutrient, value in base.items():
-            r = self._retention(cooking_method, nutrient)
-            d = self._digestibility(ingredients, nutrient)
-            p = self._physio(stress_level, age, post_workout, nutrient)
-            adjusted[nutrient] = round(value * r * d * p, 2)
+        factors = self.factor_vector(ingredients, cooking_method, stress_level, age, post_workout)
+        base = nutrient_calculator.nutrients_to_dict(totals, present)
+        adjusted = nutrient_calculator.nutrients_to_dict(totals * factors, present)
 
         return {
             "base_nutrients": base,
@@ -59,44 +125,119 @@ class BioavailabilityEngine:
             }
         }
 
+    def compute_batch(self, meals: List[Dict[str, object]]) -> List[Dict[str, Dict[str, float]]]:
+        """
+        Vectorized compute() over many meals, each a dict with compute()'s
+        keyword arguments. Results are returned in input order.
+        """
+        totals, present = nutrient_calculator.batch_totals([m["ingredients"] for m in meals])
+        if not meals:
+            return []
+        factors = np.vstack([self.factor_vector(**m) for m in meals])
+        adjusted = totals * factors
+
+        return [
+            {
+                "base_nutrients": nutrient_calculator.nutrients_to_dict(totals[i], present[i]),
+                "adjusted_nutrients": nutrient_calculator.nutrients_to_dict(adjusted[i], present[i]),
+                "adjustment_factors": {
+                    "cooking_method": m["cooking_method"].value,
+                    "stress_level": m["stress_level"].value,
+                    "age": m["age"],
+                    "post_workout": m["post_workout"],
+                }
+            }
+            for i, m in enumerate(meals)
+        ]
+
+    def compare_methods(self,
+                        ingredients: List[IngredientInfo],
+                        stress_level: StressLevel,
+                        age: int,
+                        post_workout: bool) -> Dict[str, object]:
+        """
+        compute() for every cooking method at once: base nutrients are
+        calculated once and broadcast against the stacked retention vectors
+        """
+        rows, grams = nutrient_calculator.resolve_ingredients(ingredients)
+        totals, present = nutrient_calculator.nutrient_totals(rows, grams)
+
+        methods = list(self.retention_vectors)
+        retention = np.vstack([self.retention_vectors[m] for m in methods])
+        physio = self._stress_age_factor(stress_level, age)
+        if post_workout:
+            physio = physio * self.post_workout_vector
+        adjusted = totals * (retention * self._digestibility(ingredients) * physio)
+
+        # Mean retention over the nutrients the meal actually has, best first
+        scores = retention[:, present].mean(axis=1) if present.any() else np.ones(len(methods))
+        ranking = [methods[i] for i in np.argsort(-scores, kind="stable")]
+
+        return {
+            "base_nutrients": nutrient_calculator.nutrients_to_dict(totals, present),
+            "adjusted_by_method": {
+                m.value: nutrient_calculator.nutrients_to_dict(adjusted[i], present)
+                for i, m in enumerate(methods)
+            },
+            "retention_scores": {m.value: round(float(scores[i]), 3) for i, m in enumerate(methods)},
+            "best_method": ranking[0].value,
+            "adjustment_factors": {
+                "stress_level": stress_level.value,
+                "age": age,
+                "post_workout": post_workout,
+            }
+        }
+
     def _estimate_base(self, ings: List[IngredientInfo]) -> Dict[str, float]:
         # Legacy heuristic (unused); kept for reference
         return {}
 
     def _retention(self, method: CookingMethod, nutrient: str) -> float:
-        if self.retention_factors is None:
+        if self.retention_matrix is None:
+            return 0.85
+        i = self.retention_methods.get(method.value)
+        if nutrient in self.nutrient_type_index:
+            j = self.nutrient_type_index[nutrient]
+        else:
+            j = self.retention_types.get(self._nutrient_type(nutrient))
+        if i is None or j is None:
             return 0.85
-        typ = self._nutrient_type(nutrient)
-        df = self.retention_factors
-        row = df[(df["cooking_method"] == method.value) & (df["nutrient_type"] == typ)]
-        return float(row.iloc[0]["retention_factor"]) if not row.empty else 0.85
+        factor = self.retention_matrix[i, j]
+        return 0.85 if np.isnan(factor) else float(factor)
 
-    def _digestibility(self, ings: List[IngredientInfo], nutrient: str) -> float:
-        if self.digestibility_scores is None:
+    def _digestibility(self, ings: List[IngredientInfo]) -> float:
+        # Quantity-weighted over the meal; the same for every nutrient
+        if self.digestibility_factors is None:
             return 0.8
         total = sum(i.quantity_g for i in ings) or 1.0
+        fallback = self.digestibility_factors.get("unknown", 0.8)
         wsum = 0.0
         for i in ings:
             cat_key = (i.category or "Unknown").strip().lower()
-            row = self.digestibility_scores[self.digestibility_scores["food_category"].str.lower() == cat_key]
-            if row.empty:
-                row = self.digestibility_scores[self.digestibility_scores["food_category"].str.lower() == "unknown"]
-            factor = float(row.iloc[0]["digestibility_factor"]) if not row.empty else 0.8
+            factor = self.digestibility_factors.get(cat_key, fallback)
             wsum += (i.quantity_g / total) * factor
         return wsum
 
-    def _physio(self, stress: StressLevel, age: int, post: bool, nutrient: str) -> float:
+    def _stress_age_factor(self, stress: StressLevel, age: int) -> float:
         f = 1.0
         f *= 0.85 if stress == StressLevel.high else (0.92 if stress == StressLevel.medium else 1.0)
         f *= 1.1 if age < 18 else (0.9 if age > 65 else 1.0)
+        return f
+
+    def _post_workout_factor(self, nutrient: str) -> float:
         nl = nutrient.lower()
+        if "protein" in nl:
+            return 1.15
+        if "carb" in nl:
+            return 1.1
+        if any(x in nl for x in ["mineral", "calcium", "iron", "zinc"]):
+            return 1.05
+        return 1.0
+
+    def _physio(self, stress: StressLevel, age: int, post: bool, nutrient: str) -> float:
+        f = self._stress_age_factor(stress, age)
         if post:
-            if "protein" in nl:
-                f *= 1.15
-            elif "carb" in nl:
-                f *= 1.1
-            elif any(x in nl for x in ["mineral", "calcium", "iron", "zinc"]):
-                f *= 1.05
+            f *= self._post_workout_factor(nutrient)
         return f
 
     def _nutrient_type(self, n: str) -> str:
@@ -114,6 +255,7 @@ class BioavailabilityEngine:
         return "Minerals"
 
 
-bioavailability_engine = BioavailabilityEngine()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+bioavailability_engine = services.proxy("bioavailability_engine")
 
 
@@ -0,0 +1,125 @@
+"""
+Cohort RDA coverage
+Streams RDA coverage for large CSV/JSONL files of (profile, meal) rows.
+Input is read in chunks; every chunk is mapped to RDA rows and divided by
+them as one array operation, and written out before the next is read, so
+memory stays bounded by the chunk size.
+
+Each input row needs ``age``, ``weight_kg`` and ``height_cm`` plus any
+number of nutrient columns named as in the RDA table (``protein_g``,
+``iron_mg``, ...). Other columns (ids, dates) are passed through. Output
+has one ``<nutrient>_pct`` column per nutrient, empty/null without an RDA.
+pandas is imported on first use, so importing this module (the nutrition
+router does) stays cheap.
+
+    python -m app.services.cohort_coverage meals.csv -o coverage.csv
+"""
+
+import argparse
+import io
+import json
+import sys
+from typing import IO, TYPE_CHECKING, Iterator, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from app.services.registry import rda_calculator
+
+
+PROFILE_COLUMNS = ("age", "weight_kg", "height_cm")
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def detect_format(filename: Optional[str], default: str = "csv") -> str:
+    if filename and filename.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def read_chunks(source: IO, fmt: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator["pd.DataFrame"]:
+    import pandas as pd
+
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    elif fmt == "jsonl":
+        yield from pd.read_json(source, lines=True, chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}")
+
+
+def coverage_chunk(chunk: "pd.DataFrame") -> "pd.DataFrame":
+    """Coverage percentages for one chunk of (profile, meal) rows"""
+    import pandas as pd
+
+    missing = [c for c in PROFILE_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing profile columns: {', '.join(missing)}")
+
+    nutrients = [c for c in chunk.columns if c in rda_calculator.nutrient_index]
+    passthrough = [c for c in chunk.columns if c not in nutrients and c not in PROFILE_COLUMNS]
+
+    profile = chunk[list(PROFILE_COLUMNS)].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    valid = ~np.isnan(profile).any(axis=1) & (profile[:, 1] > 0) & (profile[:, 2] > 0)
+    rows = np.full(len(chunk), -1, dtype=np.intp)
+    if valid.any():
+        rows[valid] = rda_calculator.profile_rows(*profile[valid].T)
+
+    values = chunk[nutrients].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    pct = rda_calculator.coverage_array(values, rda_calculator.nutrient_indices(nutrients), rows)
+
+    out = chunk[passthrough].copy()
+    for j, name in enumerate(nutrients):
+        out[f"{name}_pct"] = np.round(pct[:, j], 1)
+    out["error"] = np.where(valid, None, "invalid profile")
+    return out
+
+
+def stream_coverage(source: IO, fmt: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield the output file chunk by chunk (CSV with one header, or JSONL)"""
+    first = True
+    for chunk in read_chunks(source, fmt, chunk_size):
+        out = coverage_chunk(chunk)
+        buffer = io.StringIO()
+        if fmt == "csv":
+            out.to_csv(buffer, index=False, header=first)
+        else:
+            # to_json writes NaN as null; one record per line
+            out.to_json(buffer, orient="records", lines=True)
+            if not buffer.getvalue().endswith("\n"):
+                buffer.write("\n")
+        first = False
+        yield buffer.getvalue()
+
+
+def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Stream RDA coverage for a cohort file")
+    parser.add_argument("input", help="CSV or JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="Input/output format (default: from the file name)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.input)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    sink = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    rows = 0
+    try:
+        for text in stream_coverage(source, fmt, args.chunk_size):
+            sink.write(text)
+            rows += text.count("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(json.dumps({"format": fmt, "lines_written": rows}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    _main()
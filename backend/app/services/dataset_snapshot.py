@@ -0,0 +1,201 @@
+"""
+Dataset snapshot service
+Compiles the Anuvaad workbook and the Food Composition CSV into a single
+versioned, checksummed NumPy archive so worker processes can skip
+pd.read_excel on startup. The sources are only parsed when the snapshot is
+missing, stale or fails its checksum.
+
+Compile ahead of time (e.g. in the build step) with:
+
+    python -m app.services.dataset_snapshot
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PATH = "data/compiled/nutrient_datasets.npz"
+
+ANUVAAD_SOURCES = [
+    "data/Anuvaad_INDB_2024.11_with_bioavailability_columns.xlsx",
+    "data/Anuvaad_INDB_2024.11_with_all_RD_factors.xlsx",
+    "data/Anuvaad_INDB_2024.11_with_Indian_RD_factors.xlsx",
+]
+FOOD_COMPOSITION_SOURCE = "data/Food Composition.csv"
+TEXT_SEPARATOR = "\x00"
+
+READERS: Dict[str, Callable[[str], pd.DataFrame]] = {
+    "anuvaad": pd.read_excel,
+    "food_composition": pd.read_csv,
+}
+
+
+def resolve_sources() -> Dict[str, str]:
+    """Map table name -> source file for the datasets present on disk"""
+    sources: Dict[str, str] = {}
+    for path in ANUVAAD_SOURCES:
+        if os.path.exists(path):
+            sources["anuvaad"] = path
+            break
+    if os.path.exists(FOOD_COMPOSITION_SOURCE):
+        sources["food_composition"] = FOOD_COMPOSITION_SOURCE
+    return sources
+
+
+def source_stamp(path: str) -> Dict[str, object]:
+    # Content hash rather than mtime: deploys and checkouts rewrite mtimes
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"path": path, "size": os.path.getsize(path), "sha256": digest.hexdigest()}
+
+
+def _encode_frame(name: str, df: pd.DataFrame, arrays: Dict[str, np.ndarray]) -> None:
+    arrays[f"{name}.columns"] = np.array([str(c) for c in df.columns])
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if series.dtype.kind in "biuf":
+            arrays[f"{name}.{i}"] = series.to_numpy()
+        else:
+            # Text is stored as one NUL-separated UTF-8 blob: compact and
+            # decoded with a single split, unlike fixed-width unicode arrays
+            nulls = series.isna().to_numpy()
+            texts = ["" if null else str(v) for v, null in zip(series, nulls)]
+            if any(TEXT_SEPARATOR in t for t in texts):
+                raise ValueError(f"Column {col!r} of {name} contains NUL characters")
+            blob = TEXT_SEPARATOR.join(texts).encode("utf-8")
+            arrays[f"{name}.{i}"] = np.frombuffer(blob, dtype=np.uint8)
+            arrays[f"{name}.{i}.nulls"] = nulls
+
+
+def _decode_frame(name: str, archive) -> pd.DataFrame:
+    columns = archive[f"{name}.columns"].tolist()
+    data = {}
+    for i, col in enumerate(columns):
+        values = archive[f"{name}.{i}"]
+        nulls_key = f"{name}.{i}.nulls"
+        if nulls_key in archive:
+            texts = values.tobytes().decode("utf-8").split(TEXT_SEPARATOR)
+            values = np.array(texts, dtype=object)
+            values[archive[nulls_key]] = np.nan
+        data[col] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def _checksum(arrays: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    for key in sorted(arrays):
+        if key == "manifest":
+            continue
+        arr = np.ascontiguousarray(arrays[key])
+        digest.update(key.encode("utf-8"))
+        digest.update(str(arr.dtype).encode("utf-8"))
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(frames: Dict[str, pd.DataFrame],
+                   sources: Dict[str, str],
+                   path: str = SNAPSHOT_PATH) -> str:
+    """Write ``frames`` to ``path`` atomically and return the payload checksum"""
+    arrays: Dict[str, np.ndarray] = {}
+    for name, df in frames.items():
+        _encode_frame(name, df, arrays)
+    checksum = _checksum(arrays)
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "tables": sorted(frames),
+        "sources": {name: source_stamp(src) for name, src in sources.items()},
+        "sha256": checksum,
+    }
+    arrays["manifest"] = np.array(json.dumps(manifest))
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return checksum
+
+
+def read_snapshot(sources: Dict[str, str],
+                  path: str = SNAPSHOT_PATH) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Load the snapshot if it exists, matches SNAPSHOT_VERSION, was compiled
+    from the current ``sources`` and passes its checksum; otherwise None
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+    except Exception as e:
+        logger.warning(f"Unreadable dataset snapshot {path}: {e}")
+        return None
+
+    manifest = json.loads(str(arrays["manifest"])) if "manifest" in arrays else {}
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        logger.info(f"Dataset snapshot version {manifest.get('version')} != {SNAPSHOT_VERSION}")
+        return None
+    expected = {name: source_stamp(src) for name, src in sources.items()}
+    if manifest.get("sources") != expected:
+        logger.info("Dataset snapshot is stale; sources changed since it was compiled")
+        return None
+    if manifest.get("sha256") != _checksum(arrays):
+        logger.warning(f"Dataset snapshot {path} failed its checksum")
+        return None
+
+    return {name: _decode_frame(name, arrays) for name in manifest["tables"]}
+
+
+def load_datasets(path: str = SNAPSHOT_PATH, refresh: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Return the source tables, preferring the compiled snapshot. On a miss
+    the sources are parsed and, when ``refresh`` is set, the snapshot is
+    rewritten for the next process (best effort).
+    """
+    sources = resolve_sources()
+    if not sources:
+        return {}
+
+    frames = read_snapshot(sources, path)
+    if frames is not None:
+        logger.info(f"Loaded dataset snapshot {path}: {sorted(frames)}")
+        return frames
+
+    frames = {name: READERS[name](src) for name, src in sources.items()}
+    for name, df in frames.items():
+        logger.info(f"Parsed {sources[name]}: {df.shape}")
+    if refresh:
+        try:
+            write_snapshot(frames, sources, path)
+            logger.info(f"Wrote dataset snapshot {path}")
+        except Exception as e:
+            logger.warning(f"Could not write dataset snapshot {path}: {e}")
+    return frames
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    found = resolve_sources()
+    parsed = {name: READERS[name](src) for name, src in found.items()}
+    digest = write_snapshot(parsed, found)
+    print(f"Compiled {sorted(parsed)} -> {SNAPSHOT_PATH} (sha256 {digest[:12]})")
@@ -0,0 +1,154 @@
+"""
+CPU Task Executor
+Runs CPU-bound work (nutrition computes, image decode/resize/encode) on a
+thread or process pool so async handlers never block the event loop. Tracks
+queue depth and wait/run times, and bounds every task with a timeout.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.utils.error_handlers import TaskTimeoutError
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple, kwargs: dict) -> Tuple[float, float, Any]:
+    # Runs in the worker; wall-clock start so waits can be measured across processes
+    started = time.time()
+    begin = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return started, time.perf_counter() - begin, result
+
+
+class TaskExecutor:
+    """
+    Pool-backed runner for synchronous functions
+
+    ``kind`` is "thread" (default; NumPy and Pillow release the GIL for their
+    heavy loops) or "process". Process pools need module-level, picklable
+    functions and arguments, and each worker builds its own service singletons.
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, timeout_seconds: float = 10.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown executor kind {kind!r}; expected one of {self.KINDS}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.total_run_s = 0.0
+        self.max_run_s = 0.0
+
+    def _get_pool(self) -> Executor:
+        # Created on first use so importing the app never spawns workers
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="cpu-task"
+                    )
+                logger.info(f"Started {self.kind} executor with {self.max_workers} workers")
+            return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in the pool and await its result
+
+        Raises:
+            TaskTimeoutError: If the task has not finished within the timeout
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        submitted_at = time.time()
+        future = self._get_pool().submit(_timed_call, fn, args, kwargs)
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        # Bookkeeping follows the pool future, so a timed-out task keeps
+        # counting as in flight until its worker actually finishes it
+        future.add_done_callback(lambda f: self._record(f, submitted_at))
+
+        try:
+            _, _, result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or None)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            name = getattr(fn, "__qualname__", repr(fn))
+            logger.warning(f"Task {name} exceeded {timeout}s")
+            raise TaskTimeoutError(name, timeout)
+        return result
+
+    def _record(self, future: Future, submitted_at: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+                return
+            started, run_s, _ = future.result()
+            wait_s = max(0.0, started - submitted_at)
+            self.completed += 1
+            self.total_wait_s += wait_s
+            self.max_wait_s = max(self.max_wait_s, wait_s)
+            self.total_run_s += run_s
+            self.max_run_s = max(self.max_run_s, run_s)
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks submitted but not yet picked up by a worker"""
+        return max(0, self.in_flight - self.max_workers)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_s / done * 1000, 2),
+                "max_wait_ms": round(self.max_wait_s * 1000, 2),
+                "avg_run_ms": round(self.total_run_s / done * 1000, 2),
+                "max_run_ms": round(self.max_run_s * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Global instance for nutrition and image work
+cpu_executor = TaskExecutor(
+    kind=settings.EXECUTOR_KIND,
+    max_workers=settings.EXECUTOR_MAX_WORKERS,
+    timeout_seconds=settings.EXECUTOR_TASK_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,124 @@
+"""
+Food name index
+Resolves ingredient names to Anuvaad rows without rescanning the DataFrame:
+exact-name hash, trigram inverted index for substring lookups and alias
+expansion. Results follow the same first-match order as the pandas scans
+(exact name, then substring, then alias pattern).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+
+# Alias patterns used when an ingredient is not found under its own name
+FOOD_ALIASES: Dict[str, str] = {
+    "rice": "rice|chawal|basmati",
+    "wheat": "wheat|gehun|atta",
+    "lentils": "lentil|dal|toor|moong|masoor",
+    "chickpeas": "chickpea|chana|kabuli",
+    "kidney beans": "kidney|rajma|red bean",
+    "onion": "onion|pyaaz",
+    "tomato": "tomato|tamatar",
+    "potato": "potato|aloo",
+    "chicken": "chicken|murgh",
+    "paneer": "paneer|cottage cheese",
+    "yogurt": "yogurt|curd|dahi",
+    "milk": "milk|doodh",
+    "oil": "oil|tel|ghee|butter",
+    "ginger": "ginger|adrak",
+    "garlic": "garlic|lehsun",
+    "spinach": "spinach|palak",
+    "cauliflower": "cauliflower|gobi|phool gobi",
+}
+
+GRAM_SIZE = 3
+
+# Regex metacharacters other than "|"; patterns without them are plain alternations
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\()]")
+
+
+def alias_pattern(ingredient_name: str) -> str:
+    """Return the alias alternation for an ingredient, or the name itself"""
+    lowered = ingredient_name.lower()
+    for key, pattern in FOOD_ALIASES.items():
+        if key in lowered:
+            return pattern
+    return ingredient_name
+
+
+class FoodNameIndex:
+    """
+    Read-only lookup structure over a list of food names
+
+    Row positions are the positions in the source list, so callers can use
+    them directly with ``DataFrame.iloc`` or any array built in the same order.
+    """
+
+    def __init__(self, names: Iterable[object]):
+        self.names: List[Optional[str]] = [
+            n.lower() if isinstance(n, str) else None for n in names
+        ]
+        self.exact: Dict[str, int] = {}
+        self.grams: Dict[str, List[int]] = {}
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _build(self) -> None:
+        for row, name in enumerate(self.names):
+            if name is None:
+                continue
+            self.exact.setdefault(name, row)
+            for gram in {name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}:
+                # Rows are visited in order, so every posting list stays sorted
+                self.grams.setdefault(gram, []).append(row)
+
+    def find_exact(self, name: str) -> Optional[int]:
+        return self.exact.get(name.lower())
+
+    def find_substring(self, term: str) -> Optional[int]:
+        """First row whose lowercased name contains ``term`` literally"""
+        if len(term) < GRAM_SIZE:
+            return self._scan(lambda n: term in n)
+        postings = None
+        for i in range(len(term) - GRAM_SIZE + 1):
+            rows = self.grams.get(term[i:i + GRAM_SIZE])
+            if rows is None:
+                return None
+            if postings is None or len(rows) < len(postings):
+                postings = rows
+        for row in postings:
+            if term in self.names[row]:
+                return row
+        return None
+
+    def find_pattern(self, pattern: str) -> Optional[int]:
+        """
+        First row whose lowercased name matches ``pattern`` the way
+        ``Series.str.contains(pattern)`` would (regex search)
+        """
+        if _REGEX_META.search(pattern):
+            # Rare: fall back to a regex scan over the pre-lowercased names.
+            # Invalid patterns raise re.error exactly like str.contains does.
+            compiled = re.compile(pattern)
+            return self._scan(lambda n: compiled.search(n) is not None)
+        rows = [self.find_substring(term) for term in pattern.split("|")]
+        rows = [r for r in rows if r is not None]
+        return min(rows) if rows else None
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Exact name, then substring, then alias expansion"""
+        row = self.find_exact(name)
+        if row is not None:
+            return row
+        row = self.find_pattern(name.lower())
+        if row is not None:
+            return row
+        return self.find_pattern(alias_pattern(name))
+
+    def _scan(self, predicate) -> Optional[int]:
+        for row, name in enumerate(self.names):
+            if name is not None and predicate(name):
+                return row
+        return None
@@ -0,0 +1,155 @@
+"""
+RDA gap optimizer
+Suggests a few foods and amounts that lift every flagged nutrient (coverage
+below the target) up to the target. The Anuvaad matrix is scaled by the
+user's RDA row into "percent of RDA per gram"; each greedy round then scores
+every candidate food at every portion (half to two of its stated servings)
+in one array operation and adds the one that closes the most remaining
+deficit. Rounds stop when all gaps are closed, at ``max_foods``, or when the
+time budget runs out. Portions that would take sodium or energy past
+UPPER_LIMITS_PCT are skipped.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.rda_service import format_coverage
+from app.services.registry import nutrient_calculator, nutrient_density_index, rda_calculator
+
+
+# Portions tried for each food, in servings; foods without a stated serving
+# size (mostly spice mixes and raw ingredients) are not suggested
+SERVING_MULTIPLES = np.array([0.5, 1.0, 1.5, 2.0])
+# Additions may not push these past the given percent of RDA (missing from
+# the request = assumed 0), so gaps are not closed with salt or excess energy
+UPPER_LIMITS_PCT: Dict[str, float] = {"sodium_mg": 100.0, "energy_kcal": 100.0}
+# Remaining deficits below this (percent points) count as closed
+TOLERANCE_PCT = 1e-6
+
+
+def close_gaps(nutrients: Dict[str, float],
+               age: int,
+               weight_kg: float,
+               height_cm: float,
+               target_pct: float = 50.0,
+               max_foods: int = 5,
+               max_portion_g: float = 400.0,
+               dietary_tag: Optional[str] = None,
+               food_classification: Optional[str] = None,
+               budget_ms: Optional[float] = None) -> Dict[str, object]:
+    """
+    Greedy food additions for the nutrients below ``target_pct`` of RDA
+
+    Args:
+        nutrients: Current (adjusted) nutrient totals, as sent to /rda-coverage
+        max_portion_g: Largest amount of any single food
+        budget_ms: Time budget for the solve (default
+            settings.GAP_OPTIMIZER_BUDGET_MS); the additions chosen so far
+            are returned when it runs out
+
+    Returns:
+        ``additions`` (food, grams, servings, added coverage per flagged
+        nutrient), coverage before and after, the nutrients still below
+        target, and whether the solve finished within its budget
+    """
+    coverage = rda_calculator.coverage_values(nutrients, age, weight_kg, height_cm)
+    row = rda_calculator.profile_row(age, weight_kg, height_cm)
+    columns = nutrient_density_index.columns
+    # Budget covers the solve, not a cold build of the services above
+    start = time.perf_counter()
+    budget_ms = settings.GAP_OPTIMIZER_BUDGET_MS if budget_ms is None else budget_ms
+    deadline = start + budget_ms / 1000.0
+
+    # Nutrients that have both an RDA value and a nutrient matrix column
+    names: List[str] = []
+    matrix_cols: List[int] = []
+    for name, pct in coverage.items():
+        column = nutrient_density_index.resolve_nutrient(name)
+        if pct is not None and column is not None:
+            names.append(name)
+            matrix_cols.append(columns[column])
+
+    current = np.array([coverage[n] for n in names], dtype=np.float64)
+    flagged = current < target_pct
+    additions: List[Dict[str, object]] = []
+    budget_exhausted = False
+
+    if flagged.any():
+        per_100g = nutrient_density_index.densities["per_100g"]
+        # Values are per 100 g, so value / RDA is percent of RDA per gram
+        per_gram = per_100g[:, matrix_cols] / rda_calculator.matrix[row, rda_calculator.nutrient_indices(names)]
+
+        limits = [n for n in UPPER_LIMITS_PCT if n in columns]
+        limit_per_gram = np.nan_to_num(
+            per_100g[:, [columns[n] for n in limits]]
+            / rda_calculator.matrix[row, rda_calculator.nutrient_indices(limits)]
+        )
+        headroom = np.array([UPPER_LIMITS_PCT[n] - (coverage.get(n) or 0.0) for n in limits])
+
+        serving_g = nutrient_calculator.serving_grams
+        candidates = np.flatnonzero(
+            nutrient_density_index.candidate_mask(dietary_tag, food_classification)
+            & (per_gram[:, flagged] > 0).any(axis=1)
+            & ~np.isnan(serving_g)
+        )
+        gains_per_gram = per_gram[candidates][:, flagged]
+        limits_per_gram = limit_per_gram[candidates]
+        # candidates x portions, in grams
+        portions = serving_g[candidates, None] * SERVING_MULTIPLES
+        allowed = portions <= max_portion_g
+        used = np.zeros(len(candidates), dtype=bool)
+
+        for _ in range(max_foods):
+            deficit = np.maximum(target_pct - current[flagged], 0.0)
+            if deficit.sum() <= TOLERANCE_PCT or not len(candidates):
+                break
+            # Deficit each portion closes, every nutrient capped at its gap
+            closed = np.minimum(gains_per_gram[:, None, :] * portions[:, :, None], deficit).sum(axis=2)
+            feasible = allowed & (limits_per_gram[:, None, :] * portions[:, :, None] <= headroom).all(axis=2)
+            closed = np.where(feasible, closed, -1.0)
+            best = np.where(used, -1.0, closed.max(axis=1))
+            pick = int(np.argmax(best))
+            if best[pick] <= TOLERANCE_PCT:
+                break
+            # Smallest portion that closes as much as the best one
+            portion = int(np.argmax(closed[pick] >= best[pick] - TOLERANCE_PCT))
+            grams = float(portions[pick, portion])
+            used[pick] = True
+
+            food_row = candidates[pick]
+            added = per_gram[food_row] * grams
+            current = current + added
+            headroom = headroom - limit_per_gram[food_row] * grams
+            additions.append({
+                "food": nutrient_density_index.food_names[food_row],
+                "grams": round(grams, 1),
+                "servings": float(SERVING_MULTIPLES[portion]),
+                "serving_unit": nutrient_calculator.serving_units[food_row],
+                "classification": nutrient_density_index.classifications[food_row],
+                "tags": list(nutrient_density_index.tags[food_row]),
+                "added_coverage_pct": {
+                    n: round(float(a), 1) for n, a, f in zip(names, added, flagged) if f and a > 0
+                },
+            })
+            if time.perf_counter() > deadline:
+                budget_exhausted = True
+                break
+
+    projected = dict(coverage)
+    projected.update({n: float(p) for n, p in zip(names, current)})
+    unmet = [n for n, f, p in zip(names, flagged, current) if f and p < target_pct - TOLERANCE_PCT]
+    return {
+        "target_pct": target_pct,
+        "flagged": {n: round(coverage[n], 1) for n, f in zip(names, flagged) if f},
+        "additions": additions,
+        "total_added_g": round(sum(a["grams"] for a in additions), 1),
+        "projected_coverage": format_coverage(projected),
+        "projected_coverage_pct": projected,
+        "unmet": unmet,
+        "complete": not unmet,
+        "budget_exhausted": budget_exhausted,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
@@ -13,6 +13,7 @@ from loguru import logger
 from app.config import settings
 from app.schemas.ingredient_schema import RecognizedIngredient, SubstitutionOption
 from app.utils.error_handlers import IngredientRecognitionError, ExternalAPIError
+from app.services.registry import services
 
 
 class GeminiService:
@@ -341,6 +342,6 @@ Provide a clear, practical answer in 2-3 sentences.
             return "Sorry, I couldn't generate advice at this time."
 
 
-# Global service instance
-gemini_service = GeminiService()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+gemini_service = services.proxy("gemini_service")
 
@@ -0,0 +1,140 @@
+"""
+Ingredient Similarity Cache
+Fuzzy ingredient scores between a catalog's ingredient vocabulary and query
+terms, with the semantics of ``fuzzy_match_ingredients``: 1.0 when equal,
+0.9 when one contains the other, else the SequenceMatcher ratio.
+
+Each query term maps to the vocabulary terms scoring at or above the match
+threshold. Rows for the catalog's most common ingredients are pinned (built
+by ``precompute()`` during warm-up, or on first use); other (user) terms are
+computed on first use and kept in a bounded LRU.
+"""
+
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable
+
+
+def normalize_ingredient(name: str) -> str:
+    """Same normalization as the matcher's exact and fuzzy comparisons"""
+    return name.lower().strip()
+
+
+class IngredientSimilarity:
+    """
+    Thresholded similarity rows for one ingredient vocabulary
+
+    ``matches(term)`` returns {vocabulary term: score} for every term that
+    ``fuzzy_match_ingredients(vocabulary_term, term)`` scores at or above
+    ``threshold`` (0 < threshold <= 1), so match decisions are unchanged.
+    """
+
+    def __init__(self,
+                 vocabulary: Iterable[str],
+                 threshold: float,
+                 canonical: Iterable[str] = (),
+                 max_terms: int = 4096):
+        # Sorted by length so the ratio bound below is a contiguous slice
+        self.terms = sorted({normalize_ingredient(v) for v in vocabulary}, key=lambda t: (len(t), t))
+        self.lengths = [len(t) for t in self.terms]
+        self.threshold = threshold
+        self.max_terms = max_terms
+        self._rows: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ratios_computed = 0
+        self.ratios_pruned = 0
+        # Canonical rows are never evicted; they are built by precompute() or
+        # on first use, so constructing the cache stays cheap
+        self._canonical = {normalize_ingredient(term) for term in canonical}
+        self._pinned: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def matches(self, term: str) -> Dict[str, float]:
+        """Vocabulary terms scoring at least ``threshold`` against ``term`` (read-only)"""
+        key = normalize_ingredient(term)
+        row = self._pinned.get(key)
+        if row is not None:
+            with self._lock:
+                self.hits += 1
+            return row
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                self._rows.move_to_end(key)
+                self.hits += 1
+                return row
+            self.misses += 1
+        row = self._compute(key)
+        with self._lock:
+            if key in self._canonical:
+                self._pinned[key] = row
+                return row
+            self._rows[key] = row
+            while len(self._rows) > self.max_terms:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+        return row
+
+    def precompute(self) -> None:
+        """Build the canonical rows not built yet (run off the request path)"""
+        for key in self._canonical.difference(self._pinned):
+            row = self._compute(key)
+            with self._lock:
+                self._pinned[key] = row
+
+    def _compute(self, target: str) -> Dict[str, float]:
+        row: Dict[str, float] = {}
+        # Containment scores 0.9 (1.0 when equal) whatever the lengths
+        for name in self.terms:
+            if target in name or name in target:
+                row[name] = 1.0 if name == target else 0.9
+
+        # ratio() <= 2 * min(len) / (sum of lens), so only names within this
+        # length window can reach the threshold; the window is widened by one
+        # and real_quick_ratio() applies the exact bound
+        t = self.threshold
+        n = len(target)
+        lo = bisect_left(self.lengths, math.floor(n * t / (2 - t)) - 1)
+        hi = bisect_right(self.lengths, math.ceil(n * (2 - t) / t) + 1)
+        self.ratios_pruned += len(self.terms) - (hi - lo)
+
+        # Same argument order as fuzzy_match_ingredients(name, target); the
+        # target's lookup tables are built once for the whole window
+        matcher = SequenceMatcher(None, "", target)
+        for name in self.terms[lo:hi]:
+            if name in row:
+                continue
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() < t or matcher.quick_ratio() < t:
+                self.ratios_pruned += 1
+                continue
+            self.ratios_computed += 1
+            score = matcher.ratio()
+            if score >= t:
+                row[name] = score
+        return row
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "vocabulary": len(self.terms),
+                "canonical_terms": len(self._canonical),
+                "canonical_rows": len(self._pinned),
+                "cached_terms": len(self._rows),
+                "max_terms": self.max_terms,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "ratios_computed": self.ratios_computed,
+                "ratios_pruned": self.ratios_pruned,
+            }
@@ -22,6 +22,7 @@ except ImportError:
 
 from app.config import settings
 from app.utils.error_handlers import ExternalAPIError
+from app.services.registry import services
 
 
 class ConversationMemory:
@@ -322,5 +323,5 @@ Be friendly and practical. Keep responses concise.
         return list(set(topics))  # Remove duplicates
 
 
-# Global instance
-langchain_service = LangChainChatService()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+langchain_service = services.proxy("langchain_service")
@@ -0,0 +1,83 @@
+"""
+Meal analysis pipeline
+Food resolution, nutrient totals, bioavailability adjustment, RDA coverage
+and recommendations in one pass over NumPy vectors, without the
+dict/JSON round trip between /bioavailability and /rda-coverage.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.schemas.nutrition_schema import CookingMethod, IngredientInfo, StressLevel
+from app.services.rda_service import format_coverage
+from app.services.recommendation_service import generate_recommendations
+from app.services.registry import bioavailability_engine, nutrient_calculator, rda_calculator
+
+
+def analyze_meal(ingredients: List[IngredientInfo],
+                 cooking_method: CookingMethod,
+                 stress_level: StressLevel,
+                 age: int,
+                 post_workout: bool,
+                 weight_kg: float,
+                 height_cm: float,
+                 dietary_tag: Optional[str] = None,
+                 food_classification: Optional[str] = None) -> Dict[str, object]:
+    """
+    Run the whole meal pipeline and time each stage
+
+    Returns:
+        The bioavailability and RDA coverage response fields plus
+        ``timings_ms`` (stage -> milliseconds)
+    """
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = round((now - clock) * 1000, 3)
+        clock = now
+
+    rows, grams = nutrient_calculator.resolve_ingredients(ingredients)
+    lap("resolve_foods")
+
+    totals, present = nutrient_calculator.nutrient_totals(rows, grams)
+    lap("nutrient_totals")
+
+    adjusted = totals * bioavailability_engine.factor_vector(
+        ingredients, cooking_method, stress_level, age, post_workout
+    )
+    lap("bioavailability")
+
+    columns = [nutrient_calculator.nutrient_columns[i] for i in np.flatnonzero(present)]
+    pct = rda_calculator.coverage_array(
+        adjusted[present],
+        rda_calculator.nutrient_indices(columns),
+        rda_calculator.profile_row(age, weight_kg, height_cm),
+    )
+    coverage = {name: (None if p != p else float(p)) for name, p in zip(columns, pct.tolist())}
+    lap("rda_coverage")
+
+    recommendations = generate_recommendations(coverage, dietary_tag, food_classification)
+    lap("recommendations")
+
+    result = {
+        "base_nutrients": nutrient_calculator.nutrients_to_dict(totals, present),
+        "adjusted_nutrients": nutrient_calculator.nutrients_to_dict(adjusted, present),
+        "adjustment_factors": {
+            "cooking_method": cooking_method.value,
+            "stress_level": stress_level.value,
+            "age": age,
+            "post_workout": post_workout,
+        },
+        "rda_coverage": format_coverage(coverage),
+        "rda_coverage_pct": coverage,
+        "recommendations": recommendations,
+        "recommendation_count": len(recommendations),
+    }
+    lap("format")
+    result["timings_ms"] = timings
+    return result
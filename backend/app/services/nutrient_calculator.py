@@ -4,13 +4,18 @@ Paritizes Pre_capstone behavior: loads Anuvaad + Food Composition datasets
 and calculates base nutrients from ingredient names and quantities.
 """
 
-import os
 import logging
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from app.config import settings
 from app.schemas.nutrition_schema import IngredientInfo
+from app.services.dataset_snapshot import load_datasets
+from app.services.food_index import FoodNameIndex, alias_pattern
+from app.services.nutrient_tables import nutrient_columns, nutrient_matrix, serving_sizes, shared_tables
+from app.services.registry import services
 
 logger = logging.getLogger(__name__)
 
@@ -20,127 +25,178 @@ class NutrientCalculator:
         self.anuvaad_data: Optional[pd.DataFrame] = None
         self.food_composition_data: Optional[pd.DataFrame] = None
         self.nutrient_columns: List[str] = []
-        self._load_datasets()
+        # Display names, in nutrient matrix row order
+        self.food_names: List[str] = []
+        # Grams per stated serving (NaN if unknown) and its unit, by matrix row
+        self.serving_grams: Optional[np.ndarray] = None
+        self.serving_units: List[Optional[str]] = []
+        self.food_index: Optional[FoodNameIndex] = None
+        # food x nutrient values (NaN stored as 0.0) and the matching validity mask
+        self.nutrient_matrix: Optional[np.ndarray] = None
+        self.nutrient_mask: Optional[np.ndarray] = None
+        if settings.SHARED_DATASETS:
+            self._load_shared()
+        else:
+            self._load_datasets()
 
     def _load_datasets(self) -> None:
         try:
-            # Prefer Anuvaad with bioavailability cols
-            preferred = "data/Anuvaad_INDB_2024.11_with_bioavailability_columns.xlsx"
-            fallbacks = [
-                "data/Anuvaad_INDB_2024.11_with_all_RD_factors.xlsx",
-                "data/Anuvaad_INDB_2024.11_with_Indian_RD_factors.xlsx",
-            ]
-            if os.path.exists(preferred):
-                self.anuvaad_data = pd.read_excel(preferred)
+            # Compiled snapshot when fresh, otherwise the xlsx/csv sources
+            frames = load_datasets()
+            self.anuvaad_data = frames.get("anuvaad")
+            self.food_composition_data = frames.get("food_composition")
+            if self.anuvaad_data is not None:
                 logger.info(f"Loaded Anuvaad dataset: {self.anuvaad_data.shape}")
-            else:
-                for path in fallbacks:
-                    if os.path.exists(path):
-                        self.anuvaad_data = pd.read_excel(path)
-                        logger.info(f"Loaded Anuvaad dataset from {path}: {self.anuvaad_data.shape}")
-                        break
-
-            food_comp_path = "data/Food Composition.csv"
-            if os.path.exists(food_comp_path):
-                self.food_composition_data = pd.read_csv(food_comp_path)
+            if self.food_composition_data is not None:
                 logger.info(
                     f"Loaded Food Composition dataset: {self.food_composition_data.shape}"
                 )
 
             if self.anuvaad_data is not None:
                 self._identify_nutrient_columns()
+                self._build_nutrient_matrix()
+                self._build_food_index()
             else:
                 logger.error("No Anuvaad dataset found! Nutrient calculation may be empty.")
         except Exception as e:
             logger.error(f"Error loading nutrient datasets: {e}")
 
+    def _load_shared(self) -> None:
+        # Matrix pages come from the shared mapping; only names stay private
+        try:
+            tables = shared_tables()
+            if "anuvaad.values" not in tables.arrays:
+                logger.error("No Anuvaad dataset found! Nutrient calculation may be empty.")
+                return
+            self.nutrient_columns = list(tables.meta["nutrient_columns"])
+            self.nutrient_matrix = tables["anuvaad.values"]
+            self.nutrient_mask = tables["anuvaad.mask"]
+            self.food_names = [n if isinstance(n, str) else "" for n in tables.meta["food_names"]]
+            self.serving_grams = tables["anuvaad.serving_g"]
+            self.serving_units = list(tables.meta["serving_units"])
+            self.food_index = FoodNameIndex(tables.meta["food_names"])
+            logger.info(f"Mapped nutrient matrix: {self.nutrient_matrix.shape}")
+        except Exception as e:
+            logger.error(f"Error mapping shared nutrient tables: {e}")
+
     def _identify_nutrient_columns(self) -> None:
         if self.anuvaad_data is None:
             return
-        exclude = {"food_code", "food_name", "primarysource", "servings_unit"}
-        self.nutrient_columns = [
-            c
-            for c in self.anuvaad_data.columns
-            if c not in exclude and not str(c).startswith("unit_serving_")
-        ]
+        self.nutrient_columns = nutrient_columns(self.anuvaad_data)
         logger.info(f"Identified {len(self.nutrient_columns)} nutrient columns")
 
-    def _alternative_names(self, ingredient_name: str) -> str:
-        alternatives = {
-            "rice": "rice|chawal|basmati",
-            "wheat": "wheat|gehun|atta",
-            "lentils": "lentil|dal|toor|moong|masoor",
-            "chickpeas": "chickpea|chana|kabuli",
-            "kidney beans": "kidney|rajma|red bean",
-            "onion": "onion|pyaaz",
-            "tomato": "tomato|tamatar",
-            "potato": "potato|aloo",
-            "chicken": "chicken|murgh",
-            "paneer": "paneer|cottage cheese",
-            "yogurt": "yogurt|curd|dahi",
-            "milk": "milk|doodh",
-            "oil": "oil|tel|ghee|butter",
-            "ginger": "ginger|adrak",
-            "garlic": "garlic|lehsun",
-            "spinach": "spinach|palak",
-            "cauliflower": "cauliflower|gobi|phool gobi",
-        }
-        for key, patt in alternatives.items():
-            if key in ingredient_name.lower():
-                return patt
-        return ingredient_name
+    def _build_nutrient_matrix(self) -> None:
+        if self.anuvaad_data is None:
+            return
+        self.nutrient_matrix, self.nutrient_mask = nutrient_matrix(
+            self.anuvaad_data, self.nutrient_columns
+        )
+        self.serving_grams, self.serving_units = serving_sizes(self.anuvaad_data, self.nutrient_columns)
+        logger.info(f"Compiled nutrient matrix: {self.nutrient_matrix.shape}")
 
-    def _find_food(self, name: str) -> Optional[pd.Series]:
+    def _build_food_index(self) -> None:
         if self.anuvaad_data is None:
+            return
+        names = self.anuvaad_data["food_name"].tolist()
+        self.food_names = [n if isinstance(n, str) else "" for n in names]
+        self.food_index = FoodNameIndex(names)
+        logger.info(f"Indexed {len(self.food_index)} food names")
+
+    def _alternative_names(self, ingredient_name: str) -> str:
+        return alias_pattern(ingredient_name)
+
+    def _find_food_row(self, name: str) -> Optional[int]:
+        if self.food_index is None:
             return None
         try:
-            df = self.anuvaad_data
-            exact = df[df["food_name"].str.lower() == name.lower()]
-            if not exact.empty:
-                return exact.iloc[0]
-            contains = df[df["food_name"].str.lower().str.contains(name.lower(), na=False)]
-            if not contains.empty:
-                return contains.iloc[0]
-            alt = df[df["food_name"].str.lower().str.contains(self._alternative_names(name), na=False)]
-            if not alt.empty:
-                return alt.iloc[0]
-            logger.warning(f"Food not found: {name}")
-            return None
+            row = self.food_index.resolve(name)
+            if row is None:
+                logger.warning(f"Food not found: {name}")
+            return row
         except Exception as e:
             logger.error(f"Error finding food {name}: {e}")
             return None
 
-    def _calc_for_item(self, food: pd.Series, qty_g: float) -> Dict[str, float]:
-        out: Dict[str, float] = {}
-        try:
-            scale = qty_g / 100.0
-            for col in self.nutrient_columns:
-                if col in food.index and pd.notna(food[col]):
-                    try:
-                        out[col] = float(food[col]) * scale
-                    except (ValueError, TypeError):
-                        continue
-            return out
-        except Exception as e:
-            logger.error(f"Error calculating nutrients for item: {e}")
-            return {}
+    def _find_food(self, name: str) -> Optional[pd.Series]:
+        row = self._find_food_row(name)
+        if row is None:
+            return None
+        if self.anuvaad_data is not None:
+            return self.anuvaad_data.iloc[row]
+        values = np.where(self.nutrient_mask[row], self.nutrient_matrix[row], np.nan)
+        return pd.Series(values, index=self.nutrient_columns, name=row)
+
+    def resolve_ingredients(self, ingredients: List[IngredientInfo]) -> Tuple[np.ndarray, np.ndarray]:
+        """Matrix rows and gram quantities for the ingredients that were found"""
+        rows: List[int] = []
+        grams: List[float] = []
+        for ing in ingredients:
+            row = self._find_food_row(ing.name)
+            if row is None:
+                continue
+            rows.append(row)
+            grams.append(ing.quantity_g)
+        return np.asarray(rows, dtype=np.intp), np.asarray(grams, dtype=np.float64)
+
+    def nutrient_totals(self, rows: np.ndarray, grams: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unrounded totals over ``nutrient_columns`` for the given rows, plus a
+        mask of the columns at least one of the foods has a value for
+        """
+        width = len(self.nutrient_columns)
+        if self.nutrient_matrix is None or len(rows) == 0:
+            return np.zeros(width), np.zeros(width, dtype=bool)
+        scale = grams / 100.0
+        # Row-wise sum keeps the ingredient-order float additions of the old loop
+        totals = (self.nutrient_matrix[rows] * scale[:, None]).sum(axis=0)
+        present = self.nutrient_mask[rows].any(axis=0)
+        return totals, present
+
+    def batch_totals(self, meals: List[List[IngredientInfo]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unrounded totals and presence masks for many meals at once, shaped
+        (meals, nutrient_columns). Each distinct food name is resolved once;
+        every meal's lines are summed in ingredient order (zero padding at
+        the end), so the totals equal nutrient_totals for each meal exactly.
+        """
+        width = len(self.nutrient_columns)
+        if self.nutrient_matrix is None or not meals:
+            return np.zeros((len(meals), width)), np.zeros((len(meals), width), dtype=bool)
+
+        rows = {name: self._find_food_row(name)
+                for name in {ing.name for meal in meals for ing in meal}}
+        lines = [[(rows[ing.name], ing.quantity_g) for ing in meal if rows[ing.name] is not None]
+                 for meal in meals]
+        depth = max(map(len, lines))
+        index = np.zeros((len(meals), depth), dtype=np.intp)
+        grams = np.zeros((len(meals), depth))
+        filled = np.zeros((len(meals), depth), dtype=bool)
+        for m, meal_lines in enumerate(lines):
+            for k, (row, quantity) in enumerate(meal_lines):
+                index[m, k], grams[m, k], filled[m, k] = row, quantity, True
+
+        scale = grams / 100.0
+        totals = (self.nutrient_matrix[index] * scale[:, :, None]).sum(axis=1)
+        present = (self.nutrient_mask[index] & filled[:, :, None]).any(axis=1)
+        return totals, present
+
+    def nutrients_to_dict(self, totals: np.ndarray, present: np.ndarray) -> Dict[str, float]:
+        return {
+            self.nutrient_columns[i]: round(float(totals[i]), 2)
+            for i in np.flatnonzero(present)
+        }
 
     def calculate_nutrients(self, ingredients: List[IngredientInfo]) -> Dict[str, float]:
-        totals: Dict[str, float] = {}
         try:
-            for ing in ingredients:
-                food = self._find_food(ing.name)
-                if food is None:
-                    continue
-                vals = self._calc_for_item(food, ing.quantity_g)
-                for k, v in vals.items():
-                    totals[k] = totals.get(k, 0.0) + v
-            return {k: round(v, 2) for k, v in totals.items()}
+            rows, grams = self.resolve_ingredients(ingredients)
+            totals, present = self.nutrient_totals(rows, grams)
+            return self.nutrients_to_dict(totals, present)
         except Exception as e:
             logger.error(f"Error calculating nutrients: {e}")
             return {}
 
 
-nutrient_calculator = NutrientCalculator()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+nutrient_calculator = services.proxy("nutrient_calculator")
 
 
@@ -0,0 +1,232 @@
+"""
+Nutrient density index
+Top-k foods per nutrient, ranked per 100 g and per 100 kcal, precomputed
+from the Anuvaad nutrient matrix so recommendations can pull the k densest
+sources of a flagged nutrient without scanning the dataset.
+
+Foods carry dietary tags (vegetarian / vegan / non-vegetarian) inferred
+from their names, and a Food Composition classification matched through
+the classification table's food head terms ("Cabbage, raw" -> cabbage).
+"""
+
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_snapshot import FOOD_COMPOSITION_SOURCE
+from app.services.nutrient_calculator import nutrient_calculator
+from app.services.registry import services
+
+logger = logging.getLogger(__name__)
+
+
+BASES = ("per_100g", "per_100kcal")
+DIETARY_TAGS = ("vegetarian", "vegan", "non-vegetarian")
+
+# Foods below this energy density would dominate every per-kcal ranking
+MIN_KCAL_PER_100G = 20.0
+
+# Columns of the Anuvaad matrix that are not nutrients
+NON_NUTRIENT_COLUMNS = {"energy_kj", "retention_factor", "digestibility_factor", "user_modifier"}
+
+# RDA / recommendation style names -> Anuvaad columns
+NUTRIENT_ALIASES: Dict[str, str] = {
+    "fiber_g": "fibre_g",
+    "vitamin_a_ug": "vita_ug",
+    "vitamin_c_mg": "vitc_mg",
+    "vitamin_e_mg": "vite_mg",
+    "vitamin_d_ug": "vitd3_ug",
+    "vitamin_k_ug": "vitk1_ug",
+    "vitamin_b1_mg": "vitb1_mg",
+    "vitamin_b2_mg": "vitb2_mg",
+    "vitamin_b3_mg": "vitb3_mg",
+    "vitamin_b5_mg": "vitb5_mg",
+    "vitamin_b6_mg": "vitb6_mg",
+    "vitamin_b7_ug": "vitb7_ug",
+    "vitamin_b9_ug": "vitb9_ug",
+}
+
+_NON_VEG = re.compile(
+    r"\b(chicken|murgh|mutton|lamb|goat|gosht|keema|kheema|beef|pork|bacon|ham|sausages?|"
+    r"salami|meat|liver|fish|machh?li|prawns?|shrimps?|crabs?|lobster|squid|tuna|salmon|"
+    r"sardines?|turkey|duck|eggs?|anda|omelett?e)\b"
+)
+_ANIMAL = re.compile(
+    r"\b(milk|doodh|paneer|curd|dahi|yogh?urt|ghee|butter|buttermilk|chaas|cheese|cream|"
+    r"lassi|khoa|khoya|kheer|raita|malai|rabri|custard|kulfi|chhena|rasgulla|shrikhand|honey)\b"
+)
+# Plant products named after dairy ones
+_PLANT_LOOKALIKES = re.compile(r"\b(peanut|cocoa|coconut|nut|almond|soy|soya) (butter|milk|cream)\b")
+
+
+def dietary_tags(name: str) -> Tuple[str, ...]:
+    """Tags inferred from a food name (keyword based)"""
+    lowered = name.lower()
+    if _NON_VEG.search(lowered):
+        return ("non-vegetarian",)
+    if _ANIMAL.search(_PLANT_LOOKALIKES.sub(" ", lowered)):
+        return ("vegetarian",)
+    return ("vegetarian", "vegan")
+
+
+def classification_terms(food_composition: pd.DataFrame) -> Dict[str, str]:
+    """Food Composition head term ("Cardamom seed, dried" -> "cardamom seed") -> classification"""
+    terms: Dict[str, str] = {}
+    for name, cls in zip(food_composition["Food Name"], food_composition["Classification Name"]):
+        if isinstance(name, str) and isinstance(cls, str):
+            terms.setdefault(name.split(",")[0].strip().lower(), cls)
+    return terms
+
+
+def classify(names: List[str], terms: Dict[str, str]) -> List[Optional[str]]:
+    """Classification of each name via its longest matching head term"""
+    if not terms:
+        return [None] * len(names)
+    alternation = "|".join(sorted(map(re.escape, terms), key=len, reverse=True))
+    pattern = re.compile(rf"\b({alternation})s?\b")
+    out: List[Optional[str]] = []
+    for name in names:
+        hits = pattern.findall(name.lower())
+        out.append(terms[max(hits, key=len)] if hits else None)
+    return out
+
+
+class NutrientDensityIndex:
+    """
+    Per-nutrient rankings of food rows, best first
+
+    ``rankings[(basis, tag)][column]`` is an int32 array of nutrient matrix
+    rows with a positive value, sorted by density; ``tag`` None is unfiltered.
+    """
+
+    def __init__(self):
+        self.food_names: List[str] = list(nutrient_calculator.food_names)
+        self.columns: Dict[str, int] = {}
+        self.densities: Dict[str, np.ndarray] = {}
+        self.tags: List[Tuple[str, ...]] = [dietary_tags(n) for n in self.food_names]
+        self.classifications: List[Optional[str]] = classify(self.food_names, self._load_terms())
+        # Lowered once for the classification substring filter
+        self._classifications_lower: List[str] = [(c or "").lower() for c in self.classifications]
+        self.rankings: Dict[Tuple[str, Optional[str]], Dict[str, np.ndarray]] = {}
+        self._build()
+
+    def _load_terms(self) -> Dict[str, str]:
+        df = nutrient_calculator.food_composition_data
+        try:
+            if df is None and os.path.exists(FOOD_COMPOSITION_SOURCE):
+                df = pd.read_csv(FOOD_COMPOSITION_SOURCE, usecols=["Food Name", "Classification Name"])
+            return classification_terms(df) if df is not None else {}
+        except Exception as e:
+            logger.error(f"Failed loading food classifications: {e}")
+            return {}
+
+    def _build(self) -> None:
+        matrix = nutrient_calculator.nutrient_matrix
+        if matrix is None:
+            logger.error("No nutrient matrix; nutrient density index is empty")
+            return
+        mask = nutrient_calculator.nutrient_mask
+        all_columns = nutrient_calculator.nutrient_columns
+        self.columns = {c: j for j, c in enumerate(all_columns) if c not in NON_NUTRIENT_COLUMNS}
+
+        values = np.where(mask, matrix, 0.0)
+        energy = values[:, all_columns.index("energy_kcal")] if "energy_kcal" in all_columns else None
+        self.densities["per_100g"] = values
+        if energy is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                per_kcal = values / energy[:, None] * 100.0
+            per_kcal[energy < MIN_KCAL_PER_100G] = 0.0
+            self.densities["per_100kcal"] = per_kcal
+
+        tag_masks = {None: np.ones(len(self.food_names), dtype=bool)}
+        for tag in DIETARY_TAGS:
+            tag_masks[tag] = np.array([tag in t for t in self.tags], dtype=bool)
+
+        for basis, density in self.densities.items():
+            # Stable sort on the negated density: ties keep dataset order
+            order = np.argsort(-density, axis=0, kind="stable")
+            for tag, keep in tag_masks.items():
+                self.rankings[(basis, tag)] = {
+                    c: order[:, j][(density[order[:, j], j] > 0) & keep[order[:, j]]].astype(np.int32)
+                    for c, j in self.columns.items()
+                }
+        logger.info(f"Indexed nutrient density for {len(self.columns)} nutrients")
+
+    def candidate_mask(self, tag: Optional[str] = None, classification: Optional[str] = None) -> np.ndarray:
+        """Boolean mask over food rows passing the dietary tag / classification filters"""
+        keep = np.ones(len(self.food_names), dtype=bool)
+        if tag:
+            keep &= np.fromiter((tag in t for t in self.tags), dtype=bool, count=len(self.tags))
+        if classification:
+            wanted = classification.lower()
+            keep &= np.fromiter((wanted in c for c in self._classifications_lower),
+                                dtype=bool, count=len(self._classifications_lower))
+        return keep
+
+    def resolve_nutrient(self, nutrient: str) -> Optional[str]:
+        key = nutrient.lower()
+        key = NUTRIENT_ALIASES.get(key, key)
+        return key if key in self.columns else None
+
+    def top_foods(self,
+                  nutrient: str,
+                  k: int = 5,
+                  basis: str = "per_100g",
+                  tag: Optional[str] = None,
+                  classification: Optional[str] = None) -> List[Dict[str, object]]:
+        """
+        The ``k`` densest foods for ``nutrient``
+
+        Args:
+            nutrient: Anuvaad column or an RDA-style alias (e.g. vitamin_c_mg)
+            basis: "per_100g" or "per_100kcal"
+            tag: Dietary tag the food must carry
+            classification: Case-insensitive substring of the food's
+                Food Composition classification
+        """
+        column = self.resolve_nutrient(nutrient)
+        ranking = self.rankings.get((basis, tag), {}).get(column) if column else None
+        if ranking is None:
+            return []
+
+        if classification:
+            # Walk the ranking until k foods match
+            wanted = classification.lower()
+            rows = []
+            for r in ranking:
+                if len(rows) == k:
+                    break
+                if wanted in self._classifications_lower[r]:
+                    rows.append(r)
+        else:
+            rows = ranking[:k]
+
+        j = self.columns[column]
+        density = self.densities[basis]
+        return [
+            {
+                "food": self.food_names[r],
+                "value": round(float(density[r, j]), 3),
+                "basis": basis,
+                "nutrient": column,
+                "tags": list(self.tags[r]),
+                "classification": self.classifications[r],
+            }
+            for r in rows
+        ]
+
+
+def _rebuild_on_reload(name: str) -> None:
+    # Rankings are derived from the nutrient matrix
+    if name == "nutrient_calculator" and services.is_ready("nutrient_density_index"):
+        services.reload("nutrient_density_index")
+
+
+services.add_reload_listener(_rebuild_on_reload)
+
+# Global instance, built on first use (or by the startup warm-up) via the registry
+nutrient_density_index = services.proxy("nutrient_density_index")
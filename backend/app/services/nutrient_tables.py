@@ -0,0 +1,480 @@
+"""
+Numeric nutrient tables
+Compiles the numeric parts of the nutrition datasets (Anuvaad nutrient
+matrix, retention factors, digestibility scores and RDA values) into plain
+arrays, and optionally writes them to one read-only binary artifact that
+every worker memory-maps. Mapped pages live in the OS page cache, so N
+workers share a single copy instead of holding N pandas copies. Food names
+(for the food index) and the Food Composition classifications are still
+private to each worker.
+
+Usage:
+
+    python -m app.services.nutrient_tables compile
+    python -m app.services.nutrient_tables report --workers 4
+"""
+
+import argparse
+import csv
+import json
+import logging
+import mmap
+import os
+import tempfile
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_snapshot import load_datasets, resolve_sources, source_stamp
+
+logger = logging.getLogger(__name__)
+
+
+TABLES_VERSION = 2
+TABLES_PATH = "data/compiled/nutrient_tables.bin"
+MAGIC = b"NUTRTBL1"
+ALIGNMENT = 64
+
+RETENTION_SOURCE = "data/retention_factors.csv"
+DIGESTIBILITY_SOURCE = "data/digestibility_scores.csv"
+RDA_SOURCE = "data/rda_values.csv"
+
+# Used by RDACalculator when rda_values.csv is missing
+DEFAULT_RDA: Dict[Tuple[str, str], Dict[str, float]] = {
+    ("19-30_years", "male"): {"protein_g": 56.0, "energy_kcal": 2400.0},
+}
+
+
+# ---------------------------------------------------------------------------
+# Table compilers (shared by the in-process and the mapped modes)
+# ---------------------------------------------------------------------------
+
+def nutrient_columns(df: pd.DataFrame) -> List[str]:
+    exclude = {"food_code", "food_name", "primarysource", "servings_unit"}
+    return [
+        c
+        for c in df.columns
+        if c not in exclude and not str(c).startswith("unit_serving_")
+    ]
+
+
+def nutrient_matrix(df: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """food x nutrient values with NaN stored as 0.0, and the validity mask"""
+    values = df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    mask = ~np.isnan(values)
+    return np.where(mask, values, 0.0), mask
+
+
+def serving_sizes(df: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Grams in one stated serving of each food (NaN where the dataset gives
+    none) and the serving unit names. Derived from the unit_serving_<nutrient>
+    columns as the median ratio to the per-100 g values.
+    """
+    paired = [c for c in columns if f"unit_serving_{c}" in df.columns]
+    if not paired or "servings_unit" not in df.columns:
+        return np.full(len(df), np.nan), [None] * len(df)
+    per_100g = df[paired].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    per_serving = df[[f"unit_serving_{c}" for c in paired]].apply(
+        pd.to_numeric, errors="coerce"
+    ).to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(per_100g > 0, per_serving / per_100g * 100.0, np.nan)
+    with warnings.catch_warnings():
+        # All-NaN rows (no serving data) stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        grams = np.nanmedian(ratio, axis=1)
+    units = [u if isinstance(u, str) else None for u in df["servings_unit"]]
+    return grams, units
+
+
+def retention_table(df: pd.DataFrame) -> Tuple[np.ndarray, List[str], List[str]]:
+    """cooking method x nutrient type retention factors (NaN where undefined)"""
+    methods = list(dict.fromkeys(df["cooking_method"]))
+    types = list(dict.fromkeys(df["nutrient_type"]))
+    table = np.full((len(methods), len(types)), np.nan)
+    m_pos = {m: i for i, m in enumerate(methods)}
+    t_pos = {t: i for i, t in enumerate(types)}
+    # Reverse so the first matching CSV row wins, like row.iloc[0]
+    for method, typ, factor in reversed(list(
+        zip(df["cooking_method"], df["nutrient_type"], df["retention_factor"])
+    )):
+        table[m_pos[method], t_pos[typ]] = float(factor)
+    return table, methods, types
+
+
+def digestibility_table(df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    """Digestibility factor per lowercased food category (first row wins)"""
+    factors: Dict[str, float] = {}
+    for category, factor in zip(df["food_category"], df["digestibility_factor"]):
+        if isinstance(category, str):
+            factors.setdefault(category.lower(), float(factor))
+    return np.array(list(factors.values()), dtype=np.float64), list(factors)
+
+
+def rda_table(path: str = RDA_SOURCE) -> Tuple[np.ndarray, List[Tuple[str, str]], List[str]]:
+    """(age_group, gender) x nutrient RDA values; unparsable cells become 0.0"""
+    rows: Dict[Tuple[str, str], Dict[str, float]] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                key = (row["age_group"], row["gender"])
+                rows[key] = {}
+                for k, v in row.items():
+                    if k in ("age_group", "gender"):
+                        continue
+                    try:
+                        rows[key][k] = float(v)
+                    except Exception:
+                        rows[key][k] = 0.0
+    else:
+        rows = {k: dict(v) for k, v in DEFAULT_RDA.items()}
+
+    columns = list(dict.fromkeys(c for values in rows.values() for c in values))
+    table = np.full((len(rows), len(columns)), np.nan)
+    for i, values in enumerate(rows.values()):
+        for j, col in enumerate(columns):
+            if col in values:
+                table[i, j] = values[col]
+    return table, list(rows), columns
+
+
+# ---------------------------------------------------------------------------
+# Shared memory-mapped artifact
+# ---------------------------------------------------------------------------
+
+_MAPPED: Dict[str, "SharedTables"] = {}
+
+
+class SharedTables:
+    """Read-only arrays backed by one mmap of the tables artifact"""
+
+    def __init__(self, path: str, meta: Dict, arrays: Dict[str, np.ndarray], buffer: mmap.mmap):
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+        self._buffer = buffer
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    @property
+    def mapped_bytes(self) -> int:
+        return len(self._buffer)
+
+    def close(self) -> None:
+        """Unmap the artifact; arrays taken from it must no longer be used"""
+        self.arrays = {}
+        self._buffer.close()
+
+
+def _table_sources() -> Dict[str, str]:
+    sources = {k: v for k, v in resolve_sources().items() if k == "anuvaad"}
+    for name, path in (("retention", RETENTION_SOURCE),
+                       ("digestibility", DIGESTIBILITY_SOURCE),
+                       ("rda", RDA_SOURCE)):
+        if os.path.exists(path):
+            sources[name] = path
+    return sources
+
+
+def build_tables(sources: Dict[str, str]) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Compile every numeric table from its source; returns (meta, arrays)"""
+    meta: Dict = {"version": TABLES_VERSION}
+    arrays: Dict[str, np.ndarray] = {}
+
+    anuvaad = load_datasets().get("anuvaad") if "anuvaad" in sources else None
+    if anuvaad is not None:
+        columns = nutrient_columns(anuvaad)
+        values, mask = nutrient_matrix(anuvaad, columns)
+        arrays["anuvaad.values"] = values
+        arrays["anuvaad.mask"] = mask
+        meta["nutrient_columns"] = columns
+        meta["food_names"] = [n if isinstance(n, str) else None for n in anuvaad["food_name"]]
+        arrays["anuvaad.serving_g"], meta["serving_units"] = serving_sizes(anuvaad, columns)
+
+    if "retention" in sources:
+        table, methods, types = retention_table(pd.read_csv(sources["retention"]))
+        arrays["retention"] = table
+        meta["retention_methods"] = methods
+        meta["nutrient_types"] = types
+
+    if "digestibility" in sources:
+        factors, categories = digestibility_table(pd.read_csv(sources["digestibility"]))
+        arrays["digestibility"] = factors
+        meta["digestibility_categories"] = categories
+
+    table, keys, columns = rda_table(sources.get("rda", RDA_SOURCE))
+    arrays["rda"] = table
+    meta["rda_keys"] = [list(k) for k in keys]
+    meta["rda_columns"] = columns
+    return meta, arrays
+
+
+def write_tables(path: str = TABLES_PATH) -> Dict:
+    """Compile the tables and write them to ``path`` atomically"""
+    sources = _table_sources()
+    meta, arrays = build_tables(sources)
+    meta["sources"] = {name: source_stamp(src) for name, src in sources.items()}
+
+    layout: Dict[str, Dict] = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    meta["arrays"] = layout
+    header = json.dumps(meta).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".bin.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, arr in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(np.ascontiguousarray(arr).tobytes())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    logger.info(f"Wrote nutrient tables {path}: {sorted(arrays)}")
+    return meta
+
+
+def _map_tables(path: str) -> Optional[SharedTables]:
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        buffer.close()
+        return None
+    header_len = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+    header_end = len(MAGIC) + 8 + header_len
+    meta = json.loads(buffer[len(MAGIC) + 8:header_end].decode("utf-8"))
+    data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in meta.get("arrays", {}).items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        arr = np.frombuffer(buffer, dtype=dtype, count=count,
+                            offset=data_start + spec["offset"])
+        arrays[name] = arr.reshape(spec["shape"])
+    return SharedTables(path, meta, arrays, buffer)
+
+
+def shared_tables(path: str = TABLES_PATH) -> SharedTables:
+    """
+    Map the tables artifact, compiling it first when it is missing, from
+    another TABLES_VERSION or built from different source files. Cached so
+    every engine in the process uses the same mapping.
+    """
+    if path not in _MAPPED:
+        _MAPPED[path] = _open_tables(path)
+    return _MAPPED[path]
+
+
+def _open_tables(path: str) -> SharedTables:
+    expected = {name: source_stamp(src) for name, src in _table_sources().items()}
+    tables = _map_tables(path) if os.path.exists(path) else None
+    if tables is not None and (
+        tables.meta.get("version") != TABLES_VERSION
+        or tables.meta.get("sources") != expected
+    ):
+        logger.info(f"Nutrient tables {path} are stale; recompiling")
+        tables.close()
+        tables = None
+    if tables is None:
+        write_tables(path)
+        tables = _map_tables(path)
+    logger.info(f"Mapped nutrient tables {path} ({tables.mapped_bytes} bytes)")
+    return tables
+
+
+# ---------------------------------------------------------------------------
+# Memory report
+# ---------------------------------------------------------------------------
+
+SMAPS_KEYS = ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty")
+# Services built by each worker, in warm-up order
+WORKER_SERVICES = ("nutrient_calculator", "bioavailability_engine", "rda_calculator", "nutrient_density_index")
+
+
+def _smaps_usage(path: str, pid: str = "self") -> Dict[str, int]:
+    """Rss/Pss/Shared/Private kB for a process's mappings of ``path`` (Linux only)"""
+    usage: Dict[str, int] = {}
+    target = os.path.realpath(path)
+    try:
+        with open(f"/proc/{pid}/smaps", "r") as f:
+            inside = False
+            for line in f:
+                fields = line.split()
+                if "-" in fields[0] and len(fields) >= 5:
+                    inside = len(fields) >= 6 and fields[5] == target
+                elif inside and fields[0].endswith(":") and len(fields) >= 2:
+                    key = fields[0][:-1]
+                    if key in SMAPS_KEYS:
+                        usage[key] = usage.get(key, 0) + int(fields[1])
+    except OSError:
+        pass
+    return usage
+
+
+def _process_usage(pid: str = "self") -> Dict[str, int]:
+    """Rss/Pss/Shared/Private kB of a whole process (Linux only)"""
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                fields = line.split()
+                if fields[0].endswith(":") and fields[0][:-1] in SMAPS_KEYS:
+                    usage[fields[0][:-1]] = int(fields[1])
+    except OSError:
+        pass
+    return usage
+
+
+def _traced_bytes(build) -> int:
+    """Bytes still allocated by ``build()`` while its result is alive"""
+    import tracemalloc
+
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def _worker() -> None:
+    """
+    Footprint probe run by memory_report in a fresh interpreter: builds the
+    nutrition services like an API worker, prints the private cost of its
+    food index and classifications, then holds until stdin closes
+    """
+    import sys
+
+    from app.services.food_index import FoodNameIndex
+    from app.services.nutrient_density_index import classify
+    from app.services.registry import services
+
+    for name in WORKER_SERVICES:
+        services.get(name)
+    calculator = services.get("nutrient_calculator")
+    density = services.get("nutrient_density_index")
+    report = {
+        "food_index_bytes": _traced_bytes(lambda: FoodNameIndex(calculator.food_names)),
+        # Includes re-reading the Food Composition CSV, which is not mapped
+        "classification_bytes": _traced_bytes(lambda: classify(density.food_names, density._load_terms())),
+    }
+    print(json.dumps(report), flush=True)
+    sys.stdin.readline()
+
+
+def _measure_workers(workers: int, shared: bool) -> List[Dict[str, int]]:
+    """Start ``workers`` probe processes, measure them while all are alive"""
+    import subprocess
+    import sys
+
+    env = {**os.environ, "SHARED_DATASETS": "true" if shared else "false"}
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "app.services.nutrient_tables", "worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=env, text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        reports = []
+        for proc in procs:
+            line = proc.stdout.readline()
+            while line and not line.startswith("{"):
+                line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError("Footprint worker exited before reporting")
+            reports.append(json.loads(line))
+        # Pss splits shared pages between the live workers
+        for proc, report in zip(procs, reports):
+            report["process_kb"] = _process_usage(str(proc.pid))
+            report["artifact_kb"] = _smaps_usage(TABLES_PATH, str(proc.pid))
+        return reports
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def memory_report(workers: int = 1) -> Dict[str, object]:
+    """
+    Measure ``workers`` concurrent worker processes with and without
+    SHARED_DATASETS and compare their proportional set size (Pss), which
+    counts mapped artifact pages once across the workers. Also lists what
+    the artifact maps and what every worker still builds privately
+    (Linux only; Pss figures are None elsewhere).
+    """
+    tables = shared_tables(TABLES_PATH)
+    # Datasets the services read that the artifact does not map
+    unmapped = sorted(set(resolve_sources()) - set(_table_sources()))
+
+    private = _measure_workers(workers, shared=False)
+    shared = _measure_workers(workers, shared=True)
+    private_pss = [w["process_kb"]["Pss"] for w in private if "Pss" in w["process_kb"]]
+    shared_pss = [w["process_kb"]["Pss"] for w in shared if "Pss" in w["process_kb"]]
+    savings = (
+        round(_mean(private_pss) - _mean(shared_pss), 1)
+        if private_pss and shared_pss else None
+    )
+
+    return {
+        "workers": workers,
+        "mapped_tables_bytes": {name: int(arr.nbytes) for name, arr in tables.arrays.items()},
+        "mapped_bytes_shared": tables.mapped_bytes,
+        "unmapped_datasets": unmapped,
+        "private_bytes_per_worker": {
+            "food_index": round(_mean([w["food_index_bytes"] for w in shared])),
+            "classifications": round(_mean([w["classification_bytes"] for w in shared])),
+        },
+        "private_mode_pss_kb_per_worker": _mean(private_pss),
+        "shared_mode_pss_kb_per_worker": _mean(shared_pss),
+        "shared_mode_artifact_kb_per_worker": {
+            key: _mean([w["artifact_kb"].get(key, 0) for w in shared]) for key in ("Rss", "Pss")
+        },
+        "per_worker_savings_kb": savings,
+        "total_private_mode_pss_kb": sum(private_pss) or None,
+        "total_shared_mode_pss_kb": sum(shared_pss) or None,
+    }
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Compile or inspect the shared nutrient tables")
+    parser.add_argument("command", choices=["compile", "report", "worker"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--path", default=TABLES_PATH,
+                        help="Artifact to compile (the report measures the one workers map)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "compile":
+        meta = write_tables(args.path)
+        print(f"Compiled {sorted(meta['arrays'])} -> {args.path}")
+    elif args.command == "worker":
+        _worker()
+    else:
+        print(json.dumps(memory_report(args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    _main()
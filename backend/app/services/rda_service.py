@@ -2,100 +2,160 @@
 RDA coverage calculator service
 """
 
-import os
-import csv
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.registry import services
+
+
+# Upper age bound (inclusive) of each RDA age group; older ages fall in the last
+AGE_GROUP_BOUNDS = (3, 8, 13, 18, 30, 50, 70)
+AGE_GROUPS = (
+    "1-3_years", "4-8_years", "9-13_years", "14-18_years",
+    "19-30_years", "31-50_years", "51-70_years", "70+_years",
+)
+
+# Nutrient name -> RDA column
+RDA_COLUMN_MAP: Dict[str, str] = {
+    # macros
+    "protein_g": "protein_g",
+    "fat_g": "fat_g",
+    "carb_g": "carb_g",
+    "fiber_g": "fiber_g",
+    "energy_kcal": "energy_kcal",
+    # minerals
+    "calcium_mg": "calcium_mg",
+    "iron_mg": "iron_mg",
+    "zinc_mg": "zinc_mg",
+    "magnesium_mg": "magnesium_mg",
+    "phosphorus_mg": "phosphorus_mg",
+    "potassium_mg": "potassium_mg",
+    "sodium_mg": "sodium_mg",
+    "copper_mg": "copper_mg",
+    "manganese_mg": "manganese_mg",
+    "selenium_ug": "selenium_ug",
+    "chromium_mg": "chromium_mg",
+    "molybdenum_mg": "molybdenum_mg",
+    # vitamins
+    "vitamin_a_ug": "vitamin_a_ug",
+    "vitamin_c_mg": "vitamin_c_mg",
+    "vitamin_d_ug": "vitamin_d_ug",
+    "vitamin_e_mg": "vitamin_e_mg",
+    "vitamin_k_ug": "vitamin_k_ug",
+    "vitamin_b1_mg": "vitamin_b1_mg",
+    "vitamin_b2_mg": "vitamin_b2_mg",
+    "vitamin_b3_mg": "vitamin_b3_mg",
+    "vitamin_b5_mg": "vitamin_b5_mg",
+    "vitamin_b6_mg": "vitamin_b6_mg",
+    "vitamin_b7_ug": "vitamin_b7_ug",
+    "vitamin_b9_ug": "vitamin_b9_ug",
+    "vitamin_b12_ug": "vitamin_b12_ug",
+    # common aliases mapping could be added in caller
+}
 
 
 class RDACalculator:
+    # Row used when the profile's (age group, gender) has no RDA entry
+    FALLBACK_KEY = ("19-30_years", "male")
+
     def __init__(self, csv_path: str = "data/rda_values.csv"):
-        self.data = self._load(csv_path)
-
-    def _load(self, path: str) -> Dict:
-        d: Dict[Tuple[str, str], Dict[str, float]] = {}
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    key = (row["age_group"], row["gender"])
-                    d[key] = {}
-                    for k, v in row.items():
-                        if k in ("age_group", "gender"):
-                            continue
-                        try:
-                            d[key][k] = float(v)
-                        except Exception:
-                            d[key][k] = 0.0
+        # (age_group, gender) x nutrient RDA values, compiled from the CSV or
+        # mapped from the shared artifact; NaN where a value is missing.
+        # nutrient_tables needs pandas, so it is imported on first build
+        from app.services.nutrient_tables import rda_table, shared_tables
+
+        if settings.SHARED_DATASETS:
+            tables = shared_tables()
+            self.matrix = tables["rda"]
+            keys, self.columns = tables.meta["rda_keys"], list(tables.meta["rda_columns"])
         else:
-            d[("19-30_years", "male")] = {"protein_g": 56.0, "energy_kcal": 2400.0}
-        return d
+            self.matrix, keys, self.columns = rda_table(csv_path)
+        self.row_index: Dict[Tuple[str, str], int] = {tuple(k): i for i, k in enumerate(keys)}
+        self.column_index: Dict[str, int] = {c: j for j, c in enumerate(self.columns)}
+        # nutrient name -> RDA column position
+        self.nutrient_index: Dict[str, int] = {
+            n: self.column_index[c] for n, c in RDA_COLUMN_MAP.items() if c in self.column_index
+        }
 
     def _age_group(self, age: int) -> str:
-        if age <= 3: return "1-3_years"
-        if age <= 8: return "4-8_years"
-        if age <= 13: return "9-13_years"
-        if age <= 18: return "14-18_years"
-        if age <= 30: return "19-30_years"
-        if age <= 50: return "31-50_years"
-        if age <= 70: return "51-70_years"
-        return "70+_years"
+        for bound, group in zip(AGE_GROUP_BOUNDS, AGE_GROUPS):
+            if age <= bound:
+                return group
+        return AGE_GROUPS[-1]
 
     def _gender(self, weight: float, height: float) -> str:
         bmi = weight / ((height / 100.0) ** 2)
         return "male" if bmi > 25 else "female"
 
+    def profile_key(self, age: int, weight: float, height: float) -> Tuple[str, str]:
+        """(age group, gender) bracket that selects the RDA row"""
+        return self._age_group(age), self._gender(weight, height)
+
+    def profile_row(self, age: int, weight: float, height: float) -> Optional[int]:
+        """RDA matrix row for a profile, falling back to FALLBACK_KEY"""
+        i = self.row_index.get(self.profile_key(age, weight, height))
+        return self.row_index.get(self.FALLBACK_KEY) if i is None else i
+
+    def nutrient_indices(self, names: List[str]) -> np.ndarray:
+        """RDA column position for each nutrient name, -1 where there is none"""
+        return np.fromiter((self.nutrient_index.get(n, -1) for n in names),
+                           dtype=np.intp, count=len(names))
+
+    def profile_rows(self, ages: np.ndarray, weights: np.ndarray, heights: np.ndarray) -> np.ndarray:
+        """profile_row() for whole arrays of profiles; -1 where no RDA row applies"""
+        groups = np.searchsorted(AGE_GROUP_BOUNDS, np.asarray(ages, dtype=np.float64), side="left")
+        bmi = np.asarray(weights, dtype=np.float64) / ((np.asarray(heights, dtype=np.float64) / 100.0) ** 2)
+        male = bmi > 25
+        fallback = self.row_index.get(self.FALLBACK_KEY, -1)
+        # Only len(AGE_GROUPS) x 2 distinct keys, so resolve them as a small table
+        table = np.array([
+            [self.row_index.get((group, gender), fallback) for gender in ("female", "male")]
+            for group in AGE_GROUPS
+        ], dtype=np.intp)
+        return table[groups, male.astype(np.intp)]
+
+    def coverage_array(self, values: np.ndarray, indices: np.ndarray, row) -> np.ndarray:
+        """
+        Percent of RDA for ``values`` (1-D, or 2-D with meals as rows) whose
+        columns map to RDA ``indices``; NaN where there is no positive RDA.
+        ``row`` is one RDA row for all meals, or an array with one per meal
+        (-1 or None for no row).
+        """
+        if row is None:
+            return np.full(np.shape(values), np.nan)
+        rows = np.asarray(row, dtype=np.intp)
+        rda = self.matrix[np.expand_dims(rows, -1), indices]
+        valid = (np.expand_dims(rows, -1) >= 0) & (indices >= 0) & (rda > 0)
+        rda = np.where(valid, rda, np.nan)
+        return (values / rda) * 100
+
+    def coverage_values(self, nutrients: Dict[str, float], age: int, weight: float,
+                        height: float) -> Dict[str, Optional[float]]:
+        """Numeric coverage percentages; None where the nutrient has no RDA"""
+        names = list(nutrients)
+        pct = self.coverage_array(
+            np.fromiter(nutrients.values(), dtype=np.float64, count=len(names)),
+            self.nutrient_indices(names),
+            self.profile_row(age, weight, height),
+        )
+        return {name: (None if p != p else float(p)) for name, p in zip(names, pct.tolist())}
+
     def coverage(self, nutrients: Dict[str, float], age: int, weight: float, height: float) -> Dict[str, str]:
-        key = (self._age_group(age), self._gender(weight, height))
-        rda = self.data.get(key) or self.data.get(("19-30_years", "male"), {})
-        out: Dict[str, str] = {}
-        for name, value in nutrients.items():
-            rkey = self._map(name)
-            if rkey and rkey in rda and rda[rkey] > 0:
-                out[name] = f"{(value / rda[rkey]) * 100:.1f}%"
-            else:
-                out[name] = "N/A"
-        return out
+        """Coverage formatted for display ("42.0%", or "N/A" without an RDA)"""
+        return format_coverage(self.coverage_values(nutrients, age, weight, height))
 
     def _map(self, n: str) -> str:
-        m = {
-            # macros
-            "protein_g": "protein_g",
-            "fat_g": "fat_g",
-            "carb_g": "carb_g",
-            "fiber_g": "fiber_g",
-            "energy_kcal": "energy_kcal",
-            # minerals
-            "calcium_mg": "calcium_mg",
-            "iron_mg": "iron_mg",
-            "zinc_mg": "zinc_mg",
-            "magnesium_mg": "magnesium_mg",
-            "phosphorus_mg": "phosphorus_mg",
-            "potassium_mg": "potassium_mg",
-            "sodium_mg": "sodium_mg",
-            "copper_mg": "copper_mg",
-            "manganese_mg": "manganese_mg",
-            "selenium_ug": "selenium_ug",
-            "chromium_mg": "chromium_mg",
-            "molybdenum_mg": "molybdenum_mg",
-            # vitamins
-            "vitamin_a_ug": "vitamin_a_ug",
-            "vitamin_c_mg": "vitamin_c_mg",
-            "vitamin_d_ug": "vitamin_d_ug",
-            "vitamin_e_mg": "vitamin_e_mg",
-            "vitamin_k_ug": "vitamin_k_ug",
-            "vitamin_b1_mg": "vitamin_b1_mg",
-            "vitamin_b2_mg": "vitamin_b2_mg",
-            "vitamin_b3_mg": "vitamin_b3_mg",
-            "vitamin_b5_mg": "vitamin_b5_mg",
-            "vitamin_b6_mg": "vitamin_b6_mg",
-            "vitamin_b7_ug": "vitamin_b7_ug",
-            "vitamin_b9_ug": "vitamin_b9_ug",
-            "vitamin_b12_ug": "vitamin_b12_ug",
-            # common aliases mapping could be added in caller
-        }
-        return m.get(n, "")
+        return RDA_COLUMN_MAP.get(n, "")
+
+
+def format_coverage(coverage: Dict[str, Optional[float]]) -> Dict[str, str]:
+    """Presentation form of numeric coverage"""
+    return {name: "N/A" if pct is None else f"{pct:.1f}%" for name, pct in coverage.items()}
 
 
-rda_calculator = RDACalculator()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+rda_calculator = services.proxy("rda_calculator")
 
 
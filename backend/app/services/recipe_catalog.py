@@ -0,0 +1,457 @@
+"""
+Recipe Catalog
+Compact, read-optimized recipe store for large catalogs. Ingredient names,
+units, categories, tags, cuisines and difficulties are interned; numeric
+fields live in numpy arrays; ingredients and tags are stored CSR-style
+(offsets + interned ids). Instructions stay out of line (a byte offset into
+the source JSONL file, or one JSON blob per recipe) and are parsed only when
+a recipe is materialized.
+
+Recipe IDs are content-derived (uuid5 of the recipe's content) unless a
+record brings its own, so they are the same in every worker and across
+restarts; a hash index maps each ID to its catalog position.
+
+``catalog[i]`` is a lightweight RecipeRecord with the fields the matchers
+and filters read; ``catalog.recipe(i)`` builds the full Recipe model, which
+is only done for the recipes a response returns.
+"""
+
+import json
+import math
+from collections import abc
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+from app.models.recipe import Ingredient, NutritionInfo, Recipe, RecipeInstruction
+
+
+NUTRITION_FIELDS = tuple(NutritionInfo.model_fields)
+RECIPE_FIELDS = tuple(Recipe.model_fields)
+NO_TIME = np.datetime64("NaT", "us")
+# Namespace of content-derived recipe IDs; changing it changes every ID
+RECIPE_ID_NAMESPACE = uuid5(NAMESPACE_URL, "smart-recipe-generator/recipes")
+
+
+class _Interner:
+    """Distinct values in first-seen order, each with a small integer id"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.ids: Dict[Any, int] = {}
+
+    def __call__(self, value: Any) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def _optional_float(value: Any) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _timestamp(value: Any) -> np.datetime64:
+    if value is None:
+        return NO_TIME
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def recipe_content_id(record: Dict[str, Any]) -> UUID:
+    """
+    Stable ID for a Recipe-shaped dict: uuid5 over its descriptive content
+    (not its id, timestamps or nutrition), so a model_dump and the JSON of
+    the same recipe give the same ID
+    """
+    content = {
+        "title": record["title"],
+        "description": record.get("description"),
+        "cuisine_type": record.get("cuisine_type"),
+        "difficulty": record.get("difficulty") or "medium",
+        "prep_time": int(record["prep_time"]),
+        "cook_time": int(record["cook_time"]),
+        "servings": int(record.get("servings", 4)),
+        "ingredients": [
+            [i["name"], None if i.get("quantity") is None else float(i["quantity"]), i.get("unit")]
+            for i in record["ingredients"]
+        ],
+        "instructions": [step["instruction"] for step in record.get("instructions") or ()],
+        "dietary_tags": list(record.get("dietary_tags") or ()),
+    }
+    return uuid5(RECIPE_ID_NAMESPACE, json.dumps(content, sort_keys=True, separators=(",", ":")))
+
+
+def _plain(value: Any) -> Any:
+    """Parquet list columns come back as numpy arrays; JSON-like lists instead"""
+    if isinstance(value, np.ndarray):
+        return [_plain(v) for v in value.tolist()]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class RecipeRecord:
+    """Read-only view of one catalog recipe (no Recipe model is built)"""
+
+    __slots__ = ("_catalog", "position")
+
+    def __init__(self, catalog: "RecipeCatalog", position: int):
+        self._catalog = catalog
+        self.position = position
+
+    @property
+    def id(self) -> UUID:
+        return self._catalog.recipe_id(self.position)
+
+    @property
+    def title(self) -> str:
+        return self._catalog.titles[self.position]
+
+    @property
+    def cuisine_type(self) -> Optional[str]:
+        return self._catalog.cuisines.values[self._catalog.cuisine_ids[self.position]]
+
+    @property
+    def difficulty(self) -> str:
+        return self._catalog.difficulties.values[self._catalog.difficulty_ids[self.position]]
+
+    @property
+    def prep_time(self) -> int:
+        return int(self._catalog.prep_times[self.position])
+
+    @property
+    def cook_time(self) -> int:
+        return int(self._catalog.cook_times[self.position])
+
+    @property
+    def total_time(self) -> int:
+        return self.prep_time + self.cook_time
+
+    @property
+    def ingredient_names(self) -> List[str]:
+        return self._catalog.ingredient_names(self.position)
+
+    @property
+    def dietary_tags(self) -> List[str]:
+        return self._catalog.dietary_tags(self.position)
+
+    def to_recipe(self) -> Recipe:
+        return self._catalog.recipe(self.position)
+
+
+def as_recipe(item: Union[Recipe, RecipeRecord]) -> Recipe:
+    """The Recipe model for a catalog list entry or catalog record"""
+    return item if isinstance(item, Recipe) else item.to_recipe()
+
+
+class RecipeCatalog(abc.Sequence):
+    """
+    Compact recipe catalog
+
+    Built from Recipe-shaped dicts (as produced by ``Recipe.model_dump``).
+    Records without an id get ``recipe_content_id``; identical recipes get
+    that ID salted with their occurrence number. A repeated explicit id is
+    kept, but lookups return its first recipe.
+    When ``path`` is given the records come from that JSONL file and carry
+    an ``_offset`` key; their instructions are re-read from the file on
+    demand, so the file must not change while the catalog is in use.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], path: Optional[str] = None):
+        self.path = path
+        self.cuisines = _Interner()
+        self.difficulties = _Interner()
+        self.names = _Interner()
+        self.units = _Interner()
+        self.categories = _Interner()
+        self.tags = _Interner()
+
+        self.titles: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+        self.image_urls: List[Optional[str]] = []
+        ids: List[bytes] = []
+        # Hash index: 16-byte recipe ID -> catalog position
+        self._positions: Dict[bytes, int] = {}
+        cuisine_ids: List[int] = []
+        difficulty_ids: List[int] = []
+        prep_times: List[int] = []
+        cook_times: List[int] = []
+        servings: List[int] = []
+        ingredient_offsets = [0]
+        name_ids: List[int] = []
+        unit_ids: List[int] = []
+        category_ids: List[int] = []
+        quantities: List[float] = []
+        critical: List[bool] = []
+        tag_offsets = [0]
+        tag_ids: List[int] = []
+        nutrition: List[List[float]] = []
+        has_nutrition: List[bool] = []
+        created: List[np.datetime64] = []
+        updated: List[np.datetime64] = []
+        # Out-of-line instructions: JSONL byte offsets or JSON blobs
+        self._instruction_offsets: List[int] = []
+        self._instruction_blobs: List[bytes] = []
+
+        for record in records:
+            recipe_id = record.get("id")
+            if recipe_id is None:
+                recipe_id = base = recipe_content_id(record)
+                copy = 1
+                while recipe_id.bytes in self._positions:
+                    recipe_id = uuid5(base, str(copy))
+                    copy += 1
+            elif isinstance(recipe_id, str):
+                recipe_id = UUID(recipe_id)
+            self._positions.setdefault(recipe_id.bytes, len(ids))
+            ids.append(recipe_id.bytes)
+            self.titles.append(record["title"])
+            self.descriptions.append(record.get("description"))
+            self.image_urls.append(record.get("image_url"))
+            cuisine_ids.append(self.cuisines(record.get("cuisine_type")))
+            difficulty_ids.append(self.difficulties(record.get("difficulty") or "medium"))
+            prep_times.append(int(record["prep_time"]))
+            cook_times.append(int(record["cook_time"]))
+            servings.append(int(record.get("servings", 4)))
+
+            for ingredient in record["ingredients"]:
+                name_ids.append(self.names(ingredient["name"]))
+                unit_ids.append(self.units(ingredient.get("unit")))
+                category_ids.append(self.categories(ingredient.get("category")))
+                quantities.append(_optional_float(ingredient.get("quantity")))
+                critical.append(bool(ingredient.get("is_critical", False)))
+            ingredient_offsets.append(len(name_ids))
+            tag_ids.extend(self.tags(tag) for tag in record.get("dietary_tags") or ())
+            tag_offsets.append(len(tag_ids))
+
+            values = record.get("nutrition")
+            has_nutrition.append(values is not None)
+            nutrition.append([_optional_float((values or {}).get(f)) for f in NUTRITION_FIELDS])
+            created.append(_timestamp(record.get("created_at")))
+            updated.append(_timestamp(record.get("updated_at")))
+
+            if path is not None:
+                self._instruction_offsets.append(record["_offset"])
+            else:
+                self._instruction_blobs.append(json.dumps(record["instructions"], default=str).encode())
+
+        self.ids = np.frombuffer(b"".join(ids), dtype=np.uint8).reshape(-1, 16)
+        self.cuisine_ids = np.array(cuisine_ids, dtype=np.int32)
+        self.difficulty_ids = np.array(difficulty_ids, dtype=np.int32)
+        self.prep_times = np.array(prep_times, dtype=np.int32)
+        self.cook_times = np.array(cook_times, dtype=np.int32)
+        self.servings = np.array(servings, dtype=np.int32)
+        self.ingredient_offsets = np.array(ingredient_offsets, dtype=np.int64)
+        self.name_ids = np.array(name_ids, dtype=np.int32)
+        self.unit_ids = np.array(unit_ids, dtype=np.int32)
+        self.category_ids = np.array(category_ids, dtype=np.int32)
+        self.quantities = np.array(quantities, dtype=np.float64)
+        self.critical = np.array(critical, dtype=bool)
+        self.tag_offsets = np.array(tag_offsets, dtype=np.int64)
+        self.tag_ids = np.array(tag_ids, dtype=np.int32)
+        self.nutrition = np.array(nutrition, dtype=np.float64).reshape(-1, len(NUTRITION_FIELDS))
+        self.has_nutrition = np.array(has_nutrition, dtype=bool)
+        self.created_at = np.array(created, dtype="datetime64[us]")
+        self.updated_at = np.array(updated, dtype="datetime64[us]")
+        self._instruction_offsets = np.array(self._instruction_offsets, dtype=np.int64)
+
+    # --- Loaders -----------------------------------------------------------
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe]) -> "RecipeCatalog":
+        """Catalog holding the same data as validated Recipe models"""
+        return cls(recipe.model_dump() for recipe in recipes)
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "RecipeCatalog":
+        """Bulk load one Recipe-shaped JSON object per line"""
+
+        def records() -> Iterator[Dict[str, Any]]:
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        record["_offset"] = offset
+                        yield record
+                    offset += len(line)
+
+        catalog = cls(records(), path=path)
+        logger.info(f"📚 Loaded {len(catalog)} recipes from {path}")
+        return catalog
+
+    @classmethod
+    def from_parquet(cls, path: str) -> "RecipeCatalog":
+        """
+        Bulk load a Parquet file with Recipe-shaped columns (nested
+        ingredients/instructions/nutrition); needs pyarrow or fastparquet
+        """
+        import pandas as pd
+
+        try:
+            frame = pd.read_parquet(path)
+        except ImportError as e:
+            raise ImportError(f"Reading {path} needs a Parquet engine (pyarrow): {e}") from e
+        records = ({k: _plain(v) for k, v in row.items()} for row in frame.to_dict("records"))
+        catalog = cls(records)
+        logger.info(f"📚 Loaded {len(catalog)} recipes from {path}")
+        return catalog
+
+    # --- Sequence of RecipeRecord ------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [RecipeRecord(self, i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return RecipeRecord(self, position)
+
+    def __iter__(self) -> Iterator[RecipeRecord]:
+        return (RecipeRecord(self, i) for i in range(len(self)))
+
+    # --- Field access ------------------------------------------------------
+
+    def recipe_id(self, position: int) -> UUID:
+        return UUID(bytes=self.ids[position].tobytes())
+
+    def position_of(self, recipe_id: Union[UUID, str]) -> Optional[int]:
+        """Catalog position of a recipe ID (UUID or its string), None if unknown or malformed"""
+        if not isinstance(recipe_id, UUID):
+            try:
+                recipe_id = UUID(str(recipe_id))
+            except ValueError:
+                return None
+        return self._positions.get(recipe_id.bytes)
+
+    def get(self, recipe_id: Union[UUID, str]) -> Optional[Recipe]:
+        """Recipe for an ID, or None"""
+        position = self.position_of(recipe_id)
+        return None if position is None else self.recipe(position)
+
+    def get_many(self, recipe_ids: Iterable[Union[UUID, str]]) -> List[Recipe]:
+        """Recipes for the known IDs, in the given order (unknown IDs are skipped)"""
+        positions = (self.position_of(recipe_id) for recipe_id in recipe_ids)
+        return self.recipes(p for p in positions if p is not None)
+
+    def ingredient_names(self, position: int) -> List[str]:
+        names = self.names.values
+        lo, hi = self.ingredient_offsets[position], self.ingredient_offsets[position + 1]
+        return [names[j] for j in self.name_ids[lo:hi].tolist()]
+
+    def dietary_tags(self, position: int) -> List[str]:
+        tags = self.tags.values
+        lo, hi = self.tag_offsets[position], self.tag_offsets[position + 1]
+        return [tags[j] for j in self.tag_ids[lo:hi].tolist()]
+
+    def instructions(self, position: int) -> List[Dict[str, Any]]:
+        """Instruction dicts, parsed from their out-of-line storage"""
+        if self.path is None:
+            return json.loads(self._instruction_blobs[position])
+        with open(self.path, "rb") as f:
+            f.seek(int(self._instruction_offsets[position]))
+            return json.loads(f.readline())["instructions"]
+
+    def nutrition_info(self, position: int) -> Optional[NutritionInfo]:
+        if not self.has_nutrition[position]:
+            return None
+        values = {
+            field: None if math.isnan(v) else v
+            for field, v in zip(NUTRITION_FIELDS, self.nutrition[position].tolist())
+        }
+        if values["calories"] is not None:
+            values["calories"] = int(values["calories"])
+        return NutritionInfo(**values)
+
+    def ingredients(self, position: int) -> List[Ingredient]:
+        lo, hi = self.ingredient_offsets[position], self.ingredient_offsets[position + 1]
+        return [
+            Ingredient(
+                name=self.names.values[name],
+                quantity=None if math.isnan(quantity) else quantity,
+                unit=self.units.values[unit],
+                is_critical=is_critical,
+                category=self.categories.values[category],
+            )
+            for name, quantity, unit, is_critical, category in zip(
+                self.name_ids[lo:hi].tolist(),
+                self.quantities[lo:hi].tolist(),
+                self.unit_ids[lo:hi].tolist(),
+                self.critical[lo:hi].tolist(),
+                self.category_ids[lo:hi].tolist(),
+            )
+        ]
+
+    def _timestamp(self, values: np.ndarray, position: int) -> Optional[datetime]:
+        value = values[position]
+        return None if np.isnat(value) else value.item()
+
+    def field_values(self, position: int, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Recipe field values for one position, in model field order, building
+        only ``fields`` (all when None); nested values are models
+        """
+        wanted = RECIPE_FIELDS if fields is None else [f for f in RECIPE_FIELDS if f in fields]
+        return {field: self._field_getters[field](self, position) for field in wanted}
+
+    _field_getters = {
+        "id": lambda c, i: c.recipe_id(i),
+        "title": lambda c, i: c.titles[i],
+        "description": lambda c, i: c.descriptions[i],
+        "cuisine_type": lambda c, i: c.cuisines.values[c.cuisine_ids[i]],
+        "difficulty": lambda c, i: c.difficulties.values[c.difficulty_ids[i]],
+        "prep_time": lambda c, i: int(c.prep_times[i]),
+        "cook_time": lambda c, i: int(c.cook_times[i]),
+        "servings": lambda c, i: int(c.servings[i]),
+        "image_url": lambda c, i: c.image_urls[i],
+        "ingredients": lambda c, i: c.ingredients(i),
+        "instructions": lambda c, i: [RecipeInstruction(**step) for step in c.instructions(i)],
+        "dietary_tags": lambda c, i: c.dietary_tags(i),
+        "nutrition": lambda c, i: c.nutrition_info(i),
+        "created_at": lambda c, i: c._timestamp(c.created_at, i),
+        "updated_at": lambda c, i: c._timestamp(c.updated_at, i),
+    }
+
+    def recipe(self, position: int) -> Recipe:
+        """Materialize the full Recipe model for one catalog position"""
+        return Recipe(**self.field_values(position))
+
+    def recipes(self, positions: Iterable[int]) -> List[Recipe]:
+        return [self.recipe(int(i)) for i in positions]
+
+
+def write_jsonl(recipes: Iterable[Recipe], path: str) -> int:
+    """Write recipes as catalog JSONL (one model_dump per line); returns the count"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for recipe in recipes:
+            f.write(recipe.model_dump_json())
+            f.write("\n")
+            count += 1
+    return count
+
+
+def load_catalog() -> RecipeCatalog:
+    """Catalog from settings.RECIPE_CATALOG_PATH (JSONL or .parquet), else the seed recipes"""
+    path = settings.RECIPE_CATALOG_PATH
+    if not path:
+        from data.seed_recipes import SEED_RECIPES
+        return RecipeCatalog.from_recipes(SEED_RECIPES)
+    if path.endswith(".parquet"):
+        return RecipeCatalog.from_parquet(path)
+    return RecipeCatalog.from_jsonl(path)
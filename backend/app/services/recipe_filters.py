@@ -0,0 +1,89 @@
+"""
+Recipe Filter Index
+Per-attribute bitmaps (numpy boolean masks over catalog positions) for
+dietary tags, cuisine and difficulty, plus total times in sorted order, so
+any combination of search/list filters is a few bitwise ANDs instead of
+per-recipe checks.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.models.recipe import Recipe
+
+
+class RecipeFilterIndex:
+    """
+    Filter bitmaps for one catalog list
+
+    Keys are compared the way the matcher and list endpoint always have:
+    tags and cuisines case-insensitively, difficulty against the lowered
+    filter value.
+    """
+
+    def __init__(self, recipes: Sequence[Recipe]):
+        self.size = len(recipes)
+        tags: Dict[str, list] = {}
+        cuisines: Dict[str, list] = {}
+        difficulties: Dict[str, list] = {}
+        for position, recipe in enumerate(recipes):
+            for tag in {t.lower() for t in recipe.dietary_tags}:
+                tags.setdefault(tag, []).append(position)
+            if recipe.cuisine_type:
+                cuisines.setdefault(recipe.cuisine_type.lower(), []).append(position)
+            difficulties.setdefault(recipe.difficulty, []).append(position)
+
+        self.tags = {k: self._bitmap(v) for k, v in tags.items()}
+        self.cuisines = {k: self._bitmap(v) for k, v in cuisines.items()}
+        self.difficulties = {k: self._bitmap(v) for k, v in difficulties.items()}
+        total_times = np.array([r.total_time for r in recipes], dtype=np.int64)
+        self.time_order = np.argsort(total_times, kind="stable")
+        self.sorted_times = total_times[self.time_order]
+
+    def _bitmap(self, positions: Iterable[int]) -> np.ndarray:
+        bitmap = np.zeros(self.size, dtype=bool)
+        bitmap[list(positions)] = True
+        return bitmap
+
+    def _lookup(self, bitmaps: Dict[str, np.ndarray], key: str) -> np.ndarray:
+        bitmap = bitmaps.get(key)
+        return bitmap if bitmap is not None else np.zeros(self.size, dtype=bool)
+
+    def mask(self,
+             cuisine: Optional[str] = None,
+             difficulty: Optional[str] = None,
+             all_tags: Iterable[str] = (),
+             any_tags: Iterable[str] = (),
+             max_total_time: Optional[int] = None) -> np.ndarray:
+        """
+        Recipes passing every given filter (empty/None filters are skipped)
+
+        Args:
+            all_tags: Dietary restrictions; a recipe needs every one
+            any_tags: Tags of which a recipe needs at least one
+            max_total_time: Prep plus cook time limit in minutes
+        """
+        keep = np.ones(self.size, dtype=bool)
+        if cuisine:
+            keep &= self._lookup(self.cuisines, cuisine.lower())
+        if difficulty:
+            keep &= self._lookup(self.difficulties, difficulty.lower())
+        for tag in all_tags:
+            keep &= self._lookup(self.tags, tag.lower().strip())
+        any_tags = list(any_tags)
+        if any_tags:
+            either = np.zeros(self.size, dtype=bool)
+            for tag in any_tags:
+                either |= self._lookup(self.tags, tag.lower().strip())
+            keep &= either
+        if max_total_time:
+            within = self._bitmap(
+                self.time_order[:np.searchsorted(self.sorted_times, max_total_time, side="right")]
+            )
+            keep &= within
+        return keep
+
+    def positions(self, **filters) -> np.ndarray:
+        """Ascending catalog positions of the recipes passing ``mask(**filters)``"""
+        return np.flatnonzero(self.mask(**filters))
@@ -0,0 +1,62 @@
+"""
+Recipe Ingredient Index
+Inverted index from normalized ingredient name to the recipes that use it,
+so matching only scores recipes sharing at least one ingredient with the
+user instead of fuzzy-matching the whole catalog.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from app.models.recipe import Recipe
+from app.services.ingredient_similarity import IngredientSimilarity, normalize_ingredient
+
+
+class RecipeIngredientIndex:
+    """
+    Ingredient -> recipe positions for one catalog list
+
+    Fuzzy variants come from an IngredientSimilarity cache over the distinct
+    ingredient names (far fewer than recipe x ingredient pairs), with the
+    rows of the ``canonical_terms`` most used ingredients pinned.
+    """
+
+    def __init__(self,
+                 recipes: Sequence[Recipe],
+                 threshold: float = 0.7,
+                 canonical_terms: int = 256,
+                 max_cached_terms: int = 4096):
+        self.size = len(recipes)
+        self.postings: Dict[str, List[int]] = {}
+        for position, recipe in enumerate(recipes):
+            for name in recipe.ingredient_names:
+                positions = self.postings.setdefault(normalize_ingredient(name), [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        common = sorted(self.postings, key=lambda name: len(self.postings[name]), reverse=True)
+        self.similarity = IngredientSimilarity(
+            self.postings, threshold, common[:canonical_terms], max_cached_terms
+        )
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def matching_terms(self, user_ingredients: List[str]) -> Dict[str, Tuple[float, str]]:
+        """
+        Indexed name -> (best score, user ingredient) over the user's
+        ingredients, for names scoring at or above the threshold. Ties keep
+        the first user ingredient, as find_best_ingredient_match does.
+        """
+        best: Dict[str, Tuple[float, str]] = {}
+        for ingredient in user_ingredients:
+            for name, score in self.similarity.matches(ingredient).items():
+                if name not in best or score > best[name][0]:
+                    best[name] = (score, ingredient)
+        return best
+
+    def candidates(self, terms: Dict[str, Tuple[float, str]]) -> List[int]:
+        """Catalog positions (ascending) of recipes using any of ``terms``"""
+        positions = set()
+        for name in terms:
+            positions.update(self.postings[name])
+        return sorted(positions)
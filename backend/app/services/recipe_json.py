@@ -0,0 +1,174 @@
+"""
+Recipe JSON Cache
+JSON bytes of catalog recipes, encoded once per record and projection (the
+full recipe, the summary used by list views, or a ``fields=`` selection)
+with pydantic-core's serializer, each with a strong ETag. Only the projected
+fields are built from the catalog. The recipe routes splice these bytes
+into their responses instead of re-validating and re-serializing the same
+immutable recipes on every request.
+
+A cache belongs to one catalog instance; reloading the recipe_catalog
+service drops it.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from pydantic_core import to_json
+
+from app.config import settings
+from app.models.recipe import RecipeMatch
+from app.services.recipe_catalog import RECIPE_FIELDS, RecipeCatalog, RecipeRecord
+from app.services.registry import services
+from app.utils.error_handlers import ValidationError
+
+
+# Fields of the summary projection (list cards: title, image, times, tags)
+SUMMARY_FIELDS = frozenset({
+    "id", "title", "cuisine_type", "difficulty", "prep_time", "cook_time",
+    "servings", "image_url", "dietary_tags",
+})
+# Recipe fields per view; None = every field
+VIEWS = {"full": None, "summary": SUMMARY_FIELDS}
+
+
+def projection(view: str = "full", fields: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """
+    Recipe fields to serialize: the comma-separated ``fields`` when given
+    (overriding ``view``), else the view's fields (None = all)
+    """
+    if not fields:
+        return VIEWS[view]
+    requested = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = sorted(requested.difference(RECIPE_FIELDS))
+    if not requested:
+        raise ValidationError(f"No recipe fields in {fields!r}")
+    if unknown:
+        raise ValidationError(
+            f"Unknown recipe fields: {', '.join(unknown)}",
+            details={"allowed_fields": list(RECIPE_FIELDS)}
+        )
+    return requested
+
+
+def strong_etag(body: bytes) -> str:
+    """Quoted strong entity tag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class RecipeJSONCache:
+    """LRU of (catalog position, projection) -> (JSON bytes, ETag), bounded by bytes"""
+
+    def __init__(self, catalog: RecipeCatalog, max_bytes: int):
+        self.catalog = catalog
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[int, Optional[FrozenSet[str]]], Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, position: int, fields: Optional[FrozenSet[str]] = None) -> Tuple[bytes, str]:
+        """JSON bytes and ETag of one catalog recipe's ``fields`` (all when None)"""
+        key = (position, fields)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = to_json(self.catalog.field_values(position, fields))
+        entry = (body, strong_etag(body))
+        if len(body) <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = entry
+                    self.bytes += len(body)
+                while self.bytes > self.max_bytes:
+                    _, (dropped, _) = self._entries.popitem(last=False)
+                    self.bytes -= len(dropped)
+                    self.evictions += 1
+        return entry
+
+    def records(self, positions: Iterable[int], fields: Optional[FrozenSet[str]] = None) -> List[bytes]:
+        return [self.record(int(p), fields)[0] for p in positions]
+
+    def array(self, positions: Iterable[int], fields: Optional[FrozenSet[str]] = None) -> bytes:
+        """JSON array of the recipes at ``positions``"""
+        return b"[" + b",".join(self.records(positions, fields)) + b"]"
+
+    def match_array(self, matches: Iterable[RecipeMatch], fields: Optional[FrozenSet[str]] = None) -> bytes:
+        """
+        JSON array of search matches, each embedding its recipe's projection;
+        matches may carry catalog records (match_recipes with recipe_fields)
+        """
+        items = []
+        for match in matches:
+            if isinstance(match.recipe, RecipeRecord) and match.recipe._catalog is self.catalog:
+                position = match.recipe.position
+            else:
+                position = self.catalog.position_of(match.recipe.id)
+            if position is not None:
+                recipe = self.record(position, fields)[0]
+            else:
+                recipe = match.recipe.model_dump_json(include=fields).encode()
+            # '{"match_percentage":...}' with the recipe spliced in first
+            rest = match.model_dump_json(exclude={"recipe"}).encode()
+            items.append(b'{"recipe":' + recipe + b"," + rest[1:])
+        return b"[" + b",".join(items) + b"]"
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[RecipeJSONCache] = None
+_cache_lock = threading.Lock()
+
+
+def json_cache() -> RecipeJSONCache:
+    """Cache for the current recipe catalog (a new one after the catalog changes)"""
+    global _cache
+    catalog = services.get("recipe_catalog")
+    with _cache_lock:
+        if _cache is None or _cache.catalog is not catalog:
+            _cache = RecipeJSONCache(catalog, settings.RECIPE_JSON_CACHE_MAX_BYTES)
+        return _cache
+
+
+def cache_stats() -> Dict[str, float]:
+    """Stats of the current cache (empty before the first recipe response)"""
+    return _cache.stats() if _cache is not None else {}
+
+
+def _invalidate_on_reload(name: str) -> None:
+    global _cache
+    if name == "recipe_catalog":
+        with _cache_lock:
+            _cache = None
+
+
+services.add_reload_listener(_invalidate_on_reload)
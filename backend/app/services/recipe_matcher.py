@@ -4,10 +4,17 @@ Smart algorithm to match recipes with available ingredients
 This is the SECRET SAUCE that makes the app intelligent! 🧠
 """
 
-from typing import List, Dict, Tuple
+import heapq
+from operator import itemgetter
+from typing import AbstractSet, List, Dict, Optional, Tuple
 from loguru import logger
 
+from app.config import settings
 from app.models.recipe import Recipe, RecipeMatch
+from app.services.ingredient_similarity import normalize_ingredient
+from app.services.recipe_catalog import as_recipe
+from app.services.recipe_filters import RecipeFilterIndex
+from app.services.recipe_index import RecipeIngredientIndex
 from app.utils.helpers import (
     fuzzy_match_ingredients,
     find_best_ingredient_match,
@@ -37,6 +44,69 @@ class RecipeMatcher:
     WEIGHT_CRITICAL_PENALTY = 20.0
     WEIGHT_PREFERENCE_BOOST = 10.0
     
+    # Missing ingredients containing these (main protein, base) are critical
+    CRITICAL_KEYWORDS = (
+        "chicken", "beef", "pork", "fish", "tofu",
+        "flour", "rice", "pasta", "bread"
+    )
+    
+    # (catalog list, its ingredient index); rebuilt when a different list is matched
+    _index_cache: Optional[Tuple[List[Recipe], RecipeIngredientIndex]] = None
+    # (catalog list, its filter bitmaps), reused the same way
+    _filter_cache: Optional[Tuple[List[Recipe], RecipeFilterIndex]] = None
+    
+    @classmethod
+    def index_for(cls, recipes: List[Recipe]) -> RecipeIngredientIndex:
+        """
+        Ingredient index for a catalog list
+        
+        Catalog lists are treated as immutable: the index is reused while the
+        same list object (of the same length) is passed in.
+        """
+        cached = cls._index_cache
+        if cached is None or cached[0] is not recipes or cached[1].size != len(recipes):
+            cached = (recipes, RecipeIngredientIndex(
+                recipes,
+                threshold=cls.FUZZY_MATCH_THRESHOLD,
+                canonical_terms=settings.INGREDIENT_SIMILARITY_CANONICAL_TERMS,
+                max_cached_terms=settings.INGREDIENT_SIMILARITY_MAX_TERMS,
+            ))
+            cls._index_cache = cached
+            logger.info(f"📇 Indexed {len(cached[1])} ingredients across {len(recipes)} recipes")
+        return cached[1]
+    
+    @staticmethod
+    def filters_for(recipes: List[Recipe]) -> RecipeFilterIndex:
+        """Filter bitmaps for a catalog list (shared by every matcher backend)"""
+        cached = RecipeMatcher._filter_cache
+        if cached is None or cached[0] is not recipes or cached[1].size != len(recipes):
+            cached = (recipes, RecipeFilterIndex(recipes))
+            RecipeMatcher._filter_cache = cached
+        return cached[1]
+    
+    @classmethod
+    def prepare(cls, recipes: List[Recipe]) -> None:
+        """Build the per-catalog structures ahead of the first search"""
+        cls.filters_for(recipes)
+        cls.index_for(recipes).similarity.precompute()
+    
+    @classmethod
+    def cache_stats(cls) -> Dict[str, float]:
+        """Ingredient similarity cache stats for the indexed catalog (empty before the first search)"""
+        cached = cls._index_cache
+        return cached[1].similarity.stats() if cached else {}
+    
+    @classmethod
+    def _scores_every_recipe(cls, dietary_restrictions: Optional[List[str]]) -> bool:
+        """
+        Whether recipes without a matching ingredient can still reach
+        MIN_MATCH_PERCENTAGE (the dietary boost alone does with restrictions),
+        so the ingredient index cannot narrow the candidates
+        """
+        return cls.MIN_MATCH_PERCENTAGE <= 0 or bool(
+            dietary_restrictions and cls.WEIGHT_PREFERENCE_BOOST >= cls.MIN_MATCH_PERCENTAGE
+        )
+    
     @classmethod
     def match_recipes(
         cls,
@@ -44,7 +114,11 @@ class RecipeMatcher:
         user_ingredients: List[str],
         dietary_restrictions: List[str] = None,
         max_cook_time: int = None,
-        difficulty: str = None
+        difficulty: str = None,
+        cuisine_type: str = None,
+        use_index: bool = True,
+        limit: Optional[int] = None,
+        recipe_fields: Optional[AbstractSet[str]] = None
     ) -> List[RecipeMatch]:
         """
         Match recipes against user ingredients and preferences
@@ -55,63 +129,209 @@ class RecipeMatcher:
             dietary_restrictions: User's dietary restrictions
             max_cook_time: Maximum cooking time in minutes
             difficulty: Preferred difficulty level
+            cuisine_type: Only recipes of this cuisine
+            use_index: Score only candidates from the ingredient index, using
+                its cached fuzzy scores (same results as scoring every recipe
+                with per-pair fuzzy matching)
+            limit: Return only the best ``limit`` matches (all when None)
+            recipe_fields: Recipe fields the caller will serialize (e.g. a
+                summary projection); when given, matches keep the catalog
+                entry instead of a full Recipe model (see _new_match)
             
         Returns:
             List of RecipeMatch objects, sorted by match score
         """
         logger.info(f"🔍 Matching {len(recipes)} recipes against {len(user_ingredients)} ingredients")
         
-        matched_recipes = []
+        # Cuisine, dietary, cook time and difficulty filters as one bitmap
+        allowed = cls.filters_for(recipes).mask(
+            cuisine=cuisine_type,
+            difficulty=difficulty,
+            all_tags=dietary_restrictions or (),
+            max_total_time=max_cook_time
+        )
+        candidates = allowed.nonzero()[0].tolist()
+        terms = None
+        if use_index:
+            # Without a matching ingredient a recipe scores 0%, so only
+            # recipes using one of the matching terms can qualify
+            index = cls.index_for(recipes)
+            terms = index.matching_terms(user_ingredients)
+            if not cls._scores_every_recipe(dietary_restrictions):
+                candidates = [i for i in index.candidates(terms) if allowed[i]]
+        user_terms = {normalize_ingredient(u) for u in user_ingredients}
+        # Every candidate passed the dietary filter, so all get the boost
+        compliant = bool(dietary_restrictions)
+        scored = []
         
-        for recipe in recipes:
-            # Pre-filter by dietary restrictions
-            if dietary_restrictions:
-                if not cls._check_dietary_compliance(recipe, dietary_restrictions):
-                    continue
-            
-            # Pre-filter by cook time
-            if max_cook_time and recipe.total_time > max_cook_time:
-                continue
-            
-            # Pre-filter by difficulty
-            if difficulty and recipe.difficulty != difficulty.lower():
-                continue
-            
-            # Calculate match score
-            match_result = cls._calculate_recipe_match(
-                recipe,
-                user_ingredients,
-                dietary_restrictions or []
-            )
+        for position in candidates:
+            recipe = recipes[position]
+            # Score only; matched/missing lists are built for returned recipes
+            match_percentage = cls._match_score(recipe, user_ingredients, compliant, user_terms, terms)
             
             # Only include recipes with minimum match percentage
-            if match_result["match_percentage"] >= cls.MIN_MATCH_PERCENTAGE:
-                recipe_match = RecipeMatch(
-                    recipe=recipe,
-                    match_percentage=match_result["match_percentage"],
-                    matched_ingredients=match_result["matched"],
-                    missing_ingredients=match_result["missing"],
-                    can_make_with_substitutions=match_result["can_substitute"]
-                )
-                matched_recipes.append(recipe_match)
+            if match_percentage >= cls.MIN_MATCH_PERCENTAGE:
+                scored.append((match_percentage, recipe))
         
-        # Sort by match percentage (highest first)
-        matched_recipes.sort(key=lambda x: x.match_percentage, reverse=True)
+        matched_recipes = [
+            cls._explain_match(
+                recipe, user_ingredients, dietary_restrictions or [], terms, compliant, recipe_fields
+            )
+            for _, recipe in cls._top_scores(scored, limit)
+        ]
         
-        logger.info(f"✅ Found {len(matched_recipes)} matching recipes")
+        logger.info(f"✅ Found {len(scored)} matching recipes, returning {len(matched_recipes)}")
         
         return matched_recipes
     
+    @staticmethod
+    def _top_scores(scored: List[Tuple[float, object]], limit: Optional[int]) -> List[Tuple[float, object]]:
+        """
+        (score, item) pairs by score, highest first, ties in input order;
+        the best ``limit`` are kept with a bounded heap
+        """
+        if limit is None or limit >= len(scored):
+            return sorted(scored, key=itemgetter(0), reverse=True)
+        return heapq.nlargest(limit, scored, key=itemgetter(0))
+    
+    @classmethod
+    def _explain_match(
+        cls,
+        recipe: Recipe,
+        user_ingredients: List[str],
+        dietary_restrictions: List[str],
+        terms: Optional[Dict[str, Tuple[float, str]]] = None,
+        compliant: Optional[bool] = None,
+        recipe_fields: Optional[AbstractSet[str]] = None
+    ) -> RecipeMatch:
+        """RecipeMatch with matched/missing ingredients for a returned recipe"""
+        match_result = cls._calculate_recipe_match(
+            recipe, user_ingredients, dietary_restrictions, terms, compliant
+        )
+        return cls._new_match(
+            recipe,
+            recipe_fields,
+            match_percentage=match_result["match_percentage"],
+            matched_ingredients=match_result["matched"],
+            missing_ingredients=match_result["missing"],
+            can_make_with_substitutions=match_result["can_substitute"]
+        )
+    
+    @staticmethod
+    def _new_match(recipe, recipe_fields: Optional[AbstractSet[str]], **values) -> RecipeMatch:
+        """
+        RecipeMatch for a catalog entry. With ``recipe_fields`` the entry
+        (e.g. a RecipeRecord) is kept unvalidated, so no full Recipe is
+        built; the recipe JSON cache serializes just those fields.
+        """
+        if recipe_fields is None:
+            return RecipeMatch(recipe=as_recipe(recipe), **values)
+        return RecipeMatch.model_construct(recipe=recipe, **values)
+    
+    @classmethod
+    def _match_ingredient(
+        cls,
+        recipe_ing: str,
+        user_ingredients: List[str],
+        user_terms: set,
+        terms: Optional[Dict[str, Tuple[float, str]]]
+    ) -> Tuple[bool, Optional[str], float]:
+        """
+        (exact match, best fuzzy user ingredient or None, its score) for one
+        recipe ingredient; the fuzzy lookup runs only without an exact match
+        """
+        key = normalize_ingredient(recipe_ing)
+        if key in user_terms:
+            return True, None, 1.0
+        if terms is not None:
+            score, fuzzy_match = terms.get(key, (0.0, None))
+        else:
+            fuzzy_match, score = find_best_ingredient_match(
+                recipe_ing,
+                user_ingredients,
+                threshold=cls.FUZZY_MATCH_THRESHOLD
+            )
+        return False, fuzzy_match, score
+    
+    @classmethod
+    def _combine_score(
+        cls,
+        exact_matches: int,
+        fuzzy_count: int,
+        total: int,
+        critical_missing: bool,
+        compliant: bool
+    ) -> float:
+        """Unrounded match percentage from ingredient counts"""
+        # Weighted score
+        score = (
+            exact_matches * cls.WEIGHT_EXACT_MATCH +
+            fuzzy_count * cls.WEIGHT_FUZZY_MATCH
+        )
+        
+        match_percentage = (score / total) * 100
+        
+        if critical_missing:
+            # Apply penalty for missing critical ingredients
+            match_percentage = max(0, match_percentage - cls.WEIGHT_CRITICAL_PENALTY)
+        
+        # Dietary compliance boost
+        if compliant:
+            match_percentage = min(100, match_percentage + cls.WEIGHT_PREFERENCE_BOOST)
+        
+        return match_percentage
+    
+    @classmethod
+    def _match_score(
+        cls,
+        recipe: Recipe,
+        user_ingredients: List[str],
+        compliant: bool,
+        user_terms: set,
+        terms: Optional[Dict[str, Tuple[float, str]]] = None
+    ) -> float:
+        """
+        Rounded match percentage, as _calculate_recipe_match computes it for
+        a recipe already known to be (non-)compliant
+        """
+        recipe_ingredients = recipe.ingredient_names
+        if not recipe_ingredients:
+            return 0.0
+        
+        exact_matches = fuzzy_count = 0
+        critical_missing = False
+        for recipe_ing in recipe_ingredients:
+            exact, fuzzy_match, _ = cls._match_ingredient(recipe_ing, user_ingredients, user_terms, terms)
+            if exact:
+                exact_matches += 1
+            elif fuzzy_match:
+                fuzzy_count += 1
+            elif not critical_missing:
+                critical_missing = cls._check_critical_ingredients(recipe, [recipe_ing])
+        
+        return round(cls._combine_score(
+            exact_matches, fuzzy_count, len(recipe_ingredients), critical_missing, compliant
+        ), 1)
+    
     @classmethod
     def _calculate_recipe_match(
         cls,
         recipe: Recipe,
         user_ingredients: List[str],
-        dietary_restrictions: List[str]
+        dietary_restrictions: List[str],
+        terms: Optional[Dict[str, Tuple[float, str]]] = None,
+        compliant: Optional[bool] = None
     ) -> Dict:
         """
         Calculate detailed match score for a recipe
         
+        Args:
+            terms: Ingredient name -> (best fuzzy score, user ingredient) for
+                the names matching a user ingredient, from the ingredient
+                index; replaces per-pair fuzzy matching when given
+            compliant: Dietary compliance when already known (e.g. from the
+                filter bitmaps); checked against the recipe's tags if None
+        
         Returns:
             Dict with match_percentage, matched, missing, and can_substitute
         """
@@ -128,50 +348,33 @@ class RecipeMatcher:
         matched_ingredients = []
         missing_ingredients = []
         fuzzy_matched = []
+        user_terms = {normalize_ingredient(u) for u in user_ingredients}
         
-        # Check each recipe ingredient
+        # Check each recipe ingredient (exact match first, then fuzzy)
         for recipe_ing in recipe_ingredients:
-            # Try exact match first
-            exact_match = cls._find_exact_match(recipe_ing, user_ingredients)
+            exact_match, fuzzy_match, score = cls._match_ingredient(
+                recipe_ing, user_ingredients, user_terms, terms
+            )
             
             if exact_match:
                 matched_ingredients.append(recipe_ing)
+            elif fuzzy_match:
+                matched_ingredients.append(recipe_ing)
+                fuzzy_matched.append((recipe_ing, fuzzy_match, score))
             else:
-                # Try fuzzy match
-                fuzzy_match, score = find_best_ingredient_match(
-                    recipe_ing,
-                    user_ingredients,
-                    threshold=cls.FUZZY_MATCH_THRESHOLD
-                )
-                
-                if fuzzy_match:
-                    matched_ingredients.append(recipe_ing)
-                    fuzzy_matched.append((recipe_ing, fuzzy_match, score))
-                else:
-                    missing_ingredients.append(recipe_ing)
-        
-        # Calculate base match percentage
-        exact_matches = len(matched_ingredients) - len(fuzzy_matched)
-        fuzzy_count = len(fuzzy_matched)
-        
-        # Weighted score
-        score = (
-            exact_matches * cls.WEIGHT_EXACT_MATCH +
-            fuzzy_count * cls.WEIGHT_FUZZY_MATCH
-        )
-        
-        match_percentage = (score / len(recipe_ingredients)) * 100
+                missing_ingredients.append(recipe_ing)
         
         # Check for critical missing ingredients
         critical_missing = cls._check_critical_ingredients(recipe, missing_ingredients)
-        if critical_missing:
-            # Apply penalty for missing critical ingredients
-            match_percentage = max(0, match_percentage - cls.WEIGHT_CRITICAL_PENALTY)
-        
-        # Dietary compliance boost
-        if dietary_restrictions:
-            if cls._check_dietary_compliance(recipe, dietary_restrictions):
-                match_percentage = min(100, match_percentage + cls.WEIGHT_PREFERENCE_BOOST)
+        if compliant is None:
+            compliant = bool(dietary_restrictions) and cls._check_dietary_compliance(recipe, dietary_restrictions)
+        match_percentage = cls._combine_score(
+            len(matched_ingredients) - len(fuzzy_matched),
+            len(fuzzy_matched),
+            len(recipe_ingredients),
+            critical_missing,
+            compliant
+        )
         
         # Determine if can be made with substitutions
         can_substitute = (
@@ -199,14 +402,9 @@ class RecipeMatcher:
         Check if any critical ingredients are missing
         Critical = main protein, base ingredients
         """
-        critical_keywords = [
-            "chicken", "beef", "pork", "fish", "tofu",
-            "flour", "rice", "pasta", "bread"
-        ]
-        
         for missing_ing in missing:
             ing_lower = missing_ing.lower()
-            if any(keyword in ing_lower for keyword in critical_keywords):
+            if any(keyword in ing_lower for keyword in RecipeMatcher.CRITICAL_KEYWORDS):
                 return True
         
         return False
@@ -285,6 +483,17 @@ class RecipeMatcher:
         return matches
 
 
+def get_recipe_matcher(backend: Optional[str] = None) -> RecipeMatcher:
+    """Matcher for ``backend`` ("scan" or "sparse"; default settings.RECIPE_MATCHER_BACKEND)"""
+    backend = (backend or settings.RECIPE_MATCHER_BACKEND).lower()
+    if backend == "sparse":
+        from app.services.recipe_matrix import SparseRecipeMatcher
+        return SparseRecipeMatcher()
+    if backend != "scan":
+        raise ValueError(f"Unknown recipe matcher backend: {backend}")
+    return RecipeMatcher()
+
+
 # Global matcher instance
-recipe_matcher = RecipeMatcher()
+recipe_matcher = get_recipe_matcher()
 
@@ -0,0 +1,166 @@
+"""
+Sparse Recipe Matrix Matcher
+Alternative RecipeMatcher backend. The catalog is encoded once as a sparse
+recipes x ingredient-name matrix (one (recipe, name) entry per ingredient
+line) and a critical-ingredient mask over names; filters come from the
+shared RecipeFilterIndex bitmaps. A pantry becomes a weight per name (exact 1.0, fuzzy
+0.8, else 0), so match percentage, critical penalty and dietary boost for
+every recipe come from a few array reductions instead of a Python loop.
+
+Select it with RECIPE_MATCHER_BACKEND=sparse; results are identical to
+RecipeMatcher's.
+"""
+
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.models.recipe import Recipe, RecipeMatch
+from app.services.ingredient_similarity import normalize_ingredient
+from app.services.recipe_index import RecipeIngredientIndex
+from app.services.recipe_matcher import RecipeMatcher
+
+
+class RecipeMatrix:
+    """Array encoding of one catalog list for SparseRecipeMatcher"""
+
+    def __init__(self, recipes: List[Recipe], index: RecipeIngredientIndex):
+        self.size = len(recipes)
+        self.index = index
+        # Columns are the index's normalized ingredient names
+        self.term_ids: Dict[str, int] = {name: j for j, name in enumerate(index.postings)}
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, recipe in enumerate(recipes):
+            for name in recipe.ingredient_names:
+                rows.append(i)
+                cols.append(self.term_ids[normalize_ingredient(name)])
+
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.cols = np.asarray(cols, dtype=np.intp)
+        self.counts = np.bincount(self.rows, minlength=self.size)
+        self.critical = np.array(
+            [any(k in name for k in RecipeMatcher.CRITICAL_KEYWORDS) for name in self.term_ids],
+            dtype=bool,
+        )
+
+    def _per_recipe(self, entries: np.ndarray) -> np.ndarray:
+        """Count of True entries per recipe"""
+        return np.bincount(self.rows, weights=entries, minlength=self.size)
+
+    def pantry_weights(self, user_ingredients: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact and fuzzy match masks over the ingredient names"""
+        exact = np.zeros(len(self.term_ids), dtype=bool)
+        fuzzy = np.zeros(len(self.term_ids), dtype=bool)
+        for ingredient in user_ingredients:
+            j = self.term_ids.get(normalize_ingredient(ingredient))
+            if j is not None:
+                exact[j] = True
+        for name, (_, ingredient) in self.index.matching_terms(user_ingredients).items():
+            # find_best_ingredient_match's winner must be a non-empty string
+            if ingredient:
+                fuzzy[self.term_ids[name]] = True
+        return exact, fuzzy & ~exact
+
+
+class SparseRecipeMatcher(RecipeMatcher):
+    """RecipeMatcher scoring whole catalogs with sparse array operations"""
+
+    # (catalog list, its matrix); rebuilt when a different list is matched
+    _matrix_cache: Optional[Tuple[List[Recipe], RecipeMatrix]] = None
+
+    @classmethod
+    def matrix_for(cls, recipes: List[Recipe]) -> RecipeMatrix:
+        """Matrix for a catalog list, reused like RecipeMatcher.index_for"""
+        cached = cls._matrix_cache
+        if cached is None or cached[0] is not recipes or cached[1].size != len(recipes):
+            cached = (recipes, RecipeMatrix(recipes, RecipeMatcher.index_for(recipes)))
+            cls._matrix_cache = cached
+            logger.info(f"🧮 Encoded {len(recipes)} recipes x {len(cached[1].term_ids)} ingredients")
+        return cached[1]
+
+    @classmethod
+    def prepare(cls, recipes: List[Recipe]) -> None:
+        cls.filters_for(recipes)
+        cls.matrix_for(recipes)
+
+    @classmethod
+    def match_recipes(
+        cls,
+        recipes: List[Recipe],
+        user_ingredients: List[str],
+        dietary_restrictions: List[str] = None,
+        max_cook_time: int = None,
+        difficulty: str = None,
+        cuisine_type: str = None,
+        use_index: bool = True,
+        limit: Optional[int] = None,
+        recipe_fields: Optional[AbstractSet[str]] = None
+    ) -> List[RecipeMatch]:
+        """
+        Same contract as RecipeMatcher.match_recipes (``use_index`` is
+        accepted for compatibility; the matrix always covers the catalog)
+        """
+        logger.info(f"🔍 Matching {len(recipes)} recipes against {len(user_ingredients)} ingredients (sparse)")
+        matrix = cls.matrix_for(recipes)
+        keep = cls.filters_for(recipes).mask(
+            cuisine=cuisine_type,
+            difficulty=difficulty,
+            all_tags=dietary_restrictions or (),
+            max_total_time=max_cook_time
+        )
+        exact, fuzzy = matrix.pantry_weights(user_ingredients)
+
+        # Per ingredient line, then per recipe; counts stay integers so the
+        # arithmetic below matches RecipeMatcher's float operations exactly
+        line_exact = exact[matrix.cols]
+        line_fuzzy = fuzzy[matrix.cols]
+        line_missing = ~(line_exact | line_fuzzy)
+        exact_count = matrix._per_recipe(line_exact)
+        fuzzy_count = matrix._per_recipe(line_fuzzy)
+        missing_count = matrix._per_recipe(line_missing)
+        critical_missing = matrix._per_recipe(line_missing & matrix.critical[matrix.cols]) > 0
+
+        has_lines = matrix.counts > 0
+        score = exact_count * cls.WEIGHT_EXACT_MATCH + fuzzy_count * cls.WEIGHT_FUZZY_MATCH
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = score / matrix.counts * 100
+        percentage = np.where(
+            critical_missing, np.maximum(0, percentage - cls.WEIGHT_CRITICAL_PENALTY), percentage
+        )
+        if dietary_restrictions:
+            # Every recipe left by the pre-filter is compliant
+            percentage = np.minimum(100, percentage + cls.WEIGHT_PREFERENCE_BOOST)
+        # Recipes without ingredients score 0 with no penalty or boost
+        percentage = np.where(has_lines, percentage, 0.0)
+        can_substitute = (missing_count <= 2) & ~critical_missing & (percentage >= 60) & has_lines
+
+        # Rounding to one decimal moves a value by at most 0.05
+        rows = np.flatnonzero(keep & (percentage >= cls.MIN_MATCH_PERCENTAGE - 0.1))
+        scored = []
+        for i in rows.tolist():
+            rounded = round(float(percentage[i]), 1)
+            if rounded >= cls.MIN_MATCH_PERCENTAGE:
+                scored.append((rounded, i))
+
+        # Matched/missing lists only for the recipes returned
+        matched_recipes = []
+        for rounded, i in cls._top_scores(scored, limit):
+            recipe = recipes[i]
+            matched, missing = [], []
+            for name in recipe.ingredient_names:
+                j = matrix.term_ids[normalize_ingredient(name)]
+                (matched if exact[j] or fuzzy[j] else missing).append(name)
+            matched_recipes.append(cls._new_match(
+                recipe,
+                recipe_fields,
+                match_percentage=rounded,
+                matched_ingredients=matched,
+                missing_ingredients=missing,
+                can_make_with_substitutions=bool(can_substitute[i])
+            ))
+
+        logger.info(f"✅ Found {len(scored)} matching recipes, returning {len(matched_recipes)}")
+        return matched_recipes
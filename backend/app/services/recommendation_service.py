@@ -1,48 +1,17 @@
 """
 Simple recommendation engine for low RDA coverage nutrients
+Food suggestions come from the nutrient density index (densest Anuvaad
+foods per 100 g and per 100 kcal for each nutrient).
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from app.services.registry import nutrient_density_index
 
-FOOD_SOURCES: Dict[str, Dict[str, List[str]]] = {
-    "protein_g": {
-        "high": ["Chicken breast", "Eggs", "Paneer", "Fish", "Greek yogurt"],
-        "medium": ["Lentils", "Chickpeas", "Tofu", "Peas"],
-    },
-    "iron_mg": {
-        "high": ["Liver", "Clams", "Pumpkin seeds", "Spinach (with Vitamin C)"],
-        "medium": ["Chickpeas", "Kidney beans", "Jaggery"],
-    },
-    "calcium_mg": {
-        "high": ["Milk", "Paneer", "Curd", "Ragi (finger millet)"],
-        "medium": ["Almonds", "Sesame seeds", "Tofu (calcium set)"],
-    },
-    "vitamin_c_mg": {
-        "high": ["Amla", "Guava", "Bell peppers", "Citrus fruits"],
-        "medium": ["Tomato", "Strawberries", "Broccoli"],
-    },
-    "zinc_mg": {
-        "high": ["Oysters", "Beef", "Pumpkin seeds"],
-        "medium": ["Cashews", "Chickpeas", "Yogurt"],
-    },
-    "fiber_g": {
-        "high": ["Oats", "Chia seeds", "Flaxseed", "Pear", "Apple (with skin)"],
-        "medium": ["Whole wheat roti", "Vegetables", "Beans"],
-    },
-    "carb_g": {
-        "high": ["Rice", "Roti", "Poha", "Idli", "Banana"],
-        "medium": ["Quinoa", "Oats", "Sweet potato"],
-    },
-    "fat_g": {
-        "high": ["Nuts", "Seeds", "Ghee", "Cold-pressed oils"],
-        "medium": ["Avocado", "Paneer", "Whole milk"],
-    },
-    "vitamin_a_ug": {
-        "high": ["Carrots", "Sweet potato", "Spinach", "Liver"],
-        "medium": ["Pumpkin", "Mango"],
-    },
-}
+
+# Suggestions per flagged nutrient: "high" foods lead the per-100 g ranking,
+# "medium" the next ones down
+SUGGESTIONS_PER_LEVEL = 3
 
 
 def _map_alias(name: str) -> str:
@@ -61,28 +30,45 @@ def _map_alias(name: str) -> str:
     return aliases.get(name.lower(), name)
 
 
-def generate_recommendations(rda_coverage: Dict[str, str]) -> List[Dict[str, object]]:
-    """Create suggestions for nutrients with coverage < 50%"""
+def generate_recommendations(rda_coverage: Dict[str, Optional[float]],
+                             dietary_tag: Optional[str] = None,
+                             classification: Optional[str] = None) -> List[Dict[str, object]]:
+    """
+    Create suggestions for nutrients with coverage < 50%
+
+    Args:
+        rda_coverage: Numeric percent of RDA per nutrient (None = no RDA),
+            as returned by RDACalculator.coverage_values
+        dietary_tag: Only suggest foods with this tag (vegetarian, vegan,
+            non-vegetarian)
+        classification: Only suggest foods whose Food Composition
+            classification contains this text
+    """
     flagged: List[Dict[str, object]] = []
-    for name, pct_str in rda_coverage.items():
-        if pct_str == "N/A":
+    for name, pct in rda_coverage.items():
+        if pct is None:
             continue
-        try:
-            pct = float(pct_str.replace("%", ""))
-        except Exception:
+        # Threshold and order use the displayed (one-decimal) percentage
+        shown = round(pct, 1)
+        if shown >= 50.0:
             continue
-        if pct < 50.0:
-            key = name if name in FOOD_SOURCES else _map_alias(name)
-            foods = FOOD_SOURCES.get(key, {})
-            flagged.append({
-                "nutrient": name,
-                "coverage": pct_str,
-                "suggestions": {
-                    "high": foods.get("high", [])[:3],
-                    "medium": foods.get("medium", [])[:3],
-                }
-            })
-    flagged.sort(key=lambda x: float(x["coverage"].replace("%", "")) if x["coverage"] != "N/A" else 999)
+        key = _map_alias(name)
+        by_weight = nutrient_density_index.top_foods(
+            key, 2 * SUGGESTIONS_PER_LEVEL, "per_100g", dietary_tag, classification
+        )
+        by_energy = nutrient_density_index.top_foods(
+            key, SUGGESTIONS_PER_LEVEL, "per_100kcal", dietary_tag, classification
+        )
+        flagged.append({
+            "nutrient": name,
+            "coverage": f"{shown:.1f}%",
+            "coverage_pct": shown,
+            "suggestions": {
+                "high": [f["food"] for f in by_weight[:SUGGESTIONS_PER_LEVEL]],
+                "medium": [f["food"] for f in by_weight[SUGGESTIONS_PER_LEVEL:]],
+                "per_100kcal": [f["food"] for f in by_energy],
+            },
+            "top_foods": by_weight[:SUGGESTIONS_PER_LEVEL] + by_energy,
+        })
+    flagged.sort(key=lambda x: x["coverage_pct"])
     return flagged
-
-
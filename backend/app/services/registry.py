@@ -0,0 +1,159 @@
+"""
+Service Registry
+Lazily constructs the heavy service singletons (datasets, AI clients) on
+first use or from a background warm-up task, so importing the app does not
+pull in pandas, google.generativeai or langchain.
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+class ServiceRegistry:
+    """Registry of named, lazily built service instances"""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._instances: Dict[str, Any] = {}
+        self._states: Dict[str, str] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._proxies: Dict[str, "LazyService"] = {}
+        self._reload_listeners: List[Callable[[str], None]] = []
+
+    def register(self, name: str, target: str) -> None:
+        """
+        Register a service
+
+        Args:
+            name: Service name
+            target: "module.path:ClassName" (or factory) called with no arguments
+        """
+        self._targets[name] = target
+        self._states[name] = self.PENDING
+        self._locks[name] = threading.RLock()
+
+    def get(self, name: str) -> Any:
+        """Return the service instance, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            # Another thread may have finished the build while we waited
+            if name in self._instances:
+                return self._instances[name]
+
+            self._states[name] = self.LOADING
+            try:
+                return self._build(name)
+            except Exception:
+                self._states[name] = self.FAILED
+                raise
+
+    def reload(self, name: str) -> Any:
+        """
+        Rebuild a service (e.g. after its datasets changed) and notify the
+        reload listeners. The previous instance stays in place if the rebuild fails.
+        """
+        with self._locks[name]:
+            instance = self._build(name)
+        for listener in list(self._reload_listeners):
+            listener(name)
+        return instance
+
+    def add_reload_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(name)`` after every successful reload"""
+        self._reload_listeners.append(listener)
+
+    def _build(self, name: str) -> Any:
+        start = time.perf_counter()
+        module_path, attr = self._targets[name].split(":")
+        factory = getattr(importlib.import_module(module_path), attr)
+        instance = factory()
+        self._load_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+        self._instances[name] = instance
+        self._states[name] = self.READY
+        logger.info(f"Service {name} ready in {self._load_ms[name]} ms")
+        return instance
+
+    def proxy(self, name: str) -> "LazyService":
+        """Module-level stand-in that builds the service on attribute access"""
+        if name not in self._proxies:
+            self._proxies[name] = LazyService(self, name)
+        return self._proxies[name]
+
+    def is_ready(self, name: str) -> bool:
+        return self._states.get(name) == self.READY
+
+    def status(self) -> Dict[str, str]:
+        return dict(self._states)
+
+    def load_times(self) -> Dict[str, float]:
+        return dict(self._load_ms)
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None) -> None:
+        """Build services in a worker thread, one at a time, without blocking the loop"""
+        for name in list(names or self._targets):
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.error(f"Service {name} failed to warm up: {e}")
+
+
+class LazyService:
+    """Forwards attribute access to the registry-built instance"""
+
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __repr__(self) -> str:
+        return f"<LazyService {self._name} ({self._registry.status().get(self._name)})>"
+
+
+def call_service(name: str, method: str, *args: Any, **kwargs: Any) -> Any:
+    """
+    Call ``services.get(name).method(...)``; a picklable entry point for
+    running service methods on a process-pool worker
+    """
+    return getattr(services.get(name), method)(*args, **kwargs)
+
+
+# Global registry; warm-up builds services in this order
+services = ServiceRegistry()
+services.register("nutrient_calculator", "app.services.nutrient_calculator:NutrientCalculator")
+services.register("bioavailability_engine", "app.services.bioavailability_service:BioavailabilityEngine")
+services.register("rda_calculator", "app.services.rda_service:RDACalculator")
+services.register("nutrient_density_index", "app.services.nutrient_density_index:NutrientDensityIndex")
+services.register("recipe_catalog", "app.services.recipe_catalog:load_catalog")
+services.register("gemini_service", "app.services.gemini_service:GeminiService")
+services.register("spoonacular_service", "app.services.spoonacular_service:SpoonacularService")
+services.register("langchain_service", "app.services.langchain_service:LangChainChatService")
+
+nutrient_calculator = services.proxy("nutrient_calculator")
+bioavailability_engine = services.proxy("bioavailability_engine")
+rda_calculator = services.proxy("rda_calculator")
+nutrient_density_index = services.proxy("nutrient_density_index")
+recipe_catalog = services.proxy("recipe_catalog")
+gemini_service = services.proxy("gemini_service")
+spoonacular_service = services.proxy("spoonacular_service")
+langchain_service = services.proxy("langchain_service")
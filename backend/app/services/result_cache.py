@@ -0,0 +1,165 @@
+"""
+Result cache for the nutrition endpoints
+In-process LRU cache with a time-to-live and a byte budget, keyed by a
+canonical hash of the request so equivalent requests (ingredient order,
+category spelling, quantity noise) share one entry. Entries are dropped
+whenever a dataset-backed service is reloaded.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.schemas.nutrition_schema import IngredientInfo
+from app.services.registry import services
+
+
+# Quantities within 0.1 g of each other are treated as the same meal
+QUANTITY_DECIMALS = 1
+
+# Reloading any of these means cached results may be stale
+DATASET_SERVICES = ("nutrient_calculator", "bioavailability_engine", "rda_calculator")
+
+
+def canonical_ingredients(ingredients: Iterable[IngredientInfo]) -> List[Tuple[str, float, str]]:
+    """
+    Order-independent form of an ingredient list. Names keep their spacing
+    because lookups match on substrings; categories are matched trimmed and
+    case-insensitively, so they are normalised the same way here.
+    """
+    return sorted(
+        (ing.name.lower(), round(ing.quantity_g, QUANTITY_DECIMALS), (ing.category or "").strip().lower())
+        for ing in ingredients
+    )
+
+
+def canonical_key(kind: str, **fields: Any) -> str:
+    """sha256 over the sorted, compact JSON encoding of ``fields``"""
+    payload = json.dumps([kind, fields], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU + TTL cache bounded by the JSON-encoded size of its values
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped by invalidate() so results computed before it are not stored
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, value = entry
+            if self._clock() >= expires:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, size, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return compute()
+        generation = self._generation
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, generation)
+        return value
+
+    async def get_or_run(self, key: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_compute() for results produced by a coroutine (e.g. an executor task)"""
+        if not self.enabled:
+            return await run()
+        generation = self._generation
+        value = self.get(key)
+        if value is None:
+            value = await run()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.invalidations += 1
+            self._generation += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+
+# Global instance shared by the /nutrition endpoints
+nutrition_cache = ResultCache(
+    max_bytes=settings.NUTRITION_CACHE_MAX_BYTES,
+    ttl_seconds=settings.NUTRITION_CACHE_TTL_SECONDS,
+)
+
+
+def _invalidate_on_reload(name: str) -> None:
+    if name in DATASET_SERVICES:
+        nutrition_cache.invalidate()
+
+
+services.add_reload_listener(_invalidate_on_reload)
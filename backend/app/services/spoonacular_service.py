@@ -10,6 +10,7 @@ from loguru import logger
 from app.config import settings
 from app.models.recipe import Recipe, Ingredient, RecipeInstruction, NutritionInfo
 from app.utils.error_handlers import ExternalAPIError, RecipeNotFoundError
+from app.services.registry import services
 
 
 class SpoonacularService:
@@ -234,6 +235,6 @@ class SpoonacularService:
         )
 
 
-# Global service instance
-spoonacular_service = SpoonacularService()
+# Global instance, built on first use (or by the startup warm-up) via the registry
+spoonacular_service = services.proxy("spoonacular_service")
 
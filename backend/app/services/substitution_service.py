@@ -6,7 +6,7 @@ Handles ingredient substitutions and alternatives
 from typing import List, Dict
 from loguru import logger
 
-from app.services.gemini_service import gemini_service
+from app.services.registry import gemini_service
 from app.schemas.ingredient_schema import SubstitutionOption
 
 
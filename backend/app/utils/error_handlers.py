@@ -68,6 +68,17 @@ class ExternalAPIError(AppException):
         )
 
 
+class TaskTimeoutError(AppException):
+    """Raised when offloaded work does not finish within its timeout"""
+    
+    def __init__(self, task: str, timeout_seconds: float):
+        super().__init__(
+            message=f"{task} did not finish within {timeout_seconds}s",
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            details={"task": task, "timeout_seconds": timeout_seconds}
+        )
+
+
 class ValidationError(AppException):
     """Raised when input validation fails"""
     
@@ -3,13 +3,14 @@ Seed Recipe Database
 30 diverse recipes across different cuisines and dietary preferences
 """
 
+from datetime import datetime
+
 from app.models.recipe import Recipe, Ingredient, RecipeInstruction, NutritionInfo
-from uuid import uuid4
+from app.services.recipe_catalog import recipe_content_id
 
 SEED_RECIPES = [
     # Recipe 1: Classic Spaghetti Carbonara
     Recipe(
-        id=uuid4(),
         title="Classic Spaghetti Carbonara",
         description="Authentic Italian pasta with creamy egg sauce and crispy pancetta",
         cuisine_type="Italian",
@@ -39,7 +40,6 @@ SEED_RECIPES = [
     
     # Recipe 2: Chicken Tikka Masala
     Recipe(
-        id=uuid4(),
         title="Chicken Tikka Masala",
         description="Creamy Indian curry with tender chicken in spiced tomato sauce",
         cuisine_type="Indian",
@@ -71,7 +71,6 @@ SEED_RECIPES = [
     
     # Recipe 3: Vegetarian Buddha Bowl
     Recipe(
-        id=uuid4(),
         title="Vegetarian Buddha Bowl",
         description="Nutritious bowl with quinoa, roasted vegetables, and tahini dressing",
         cuisine_type="Mediterranean",
@@ -102,7 +101,6 @@ SEED_RECIPES = [
     
     # Recipe 4: Beef Tacos
     Recipe(
-        id=uuid4(),
         title="Beef Tacos",
         description="Mexican-style tacos with seasoned ground beef and fresh toppings",
         cuisine_type="Mexican",
@@ -133,7 +131,6 @@ SEED_RECIPES = [
     
     # Recipe 5: Salmon Teriyaki
     Recipe(
-        id=uuid4(),
         title="Salmon Teriyaki",
         description="Glazed salmon with sweet and savory Japanese teriyaki sauce",
         cuisine_type="Japanese",
@@ -163,7 +160,6 @@ SEED_RECIPES = [
     
     # Recipe 6: Mushroom Risotto
     Recipe(
-        id=uuid4(),
         title="Mushroom Risotto",
         description="Creamy Italian rice dish with wild mushrooms and parmesan",
         cuisine_type="Italian",
@@ -195,7 +191,6 @@ SEED_RECIPES = [
     
     # Recipe 7: Greek Salad
     Recipe(
-        id=uuid4(),
         title="Traditional Greek Salad",
         description="Fresh Mediterranean salad with feta cheese and olives",
         cuisine_type="Greek",
@@ -227,7 +222,6 @@ SEED_RECIPES = [
     
     # Recipe 8: Thai Green Curry
     Recipe(
-        id=uuid4(),
         title="Thai Green Curry",
         description="Aromatic curry with coconut milk and fresh vegetables",
         cuisine_type="Thai",
@@ -258,7 +252,6 @@ SEED_RECIPES = [
     
     # Recipe 9: Quinoa Stuffed Bell Peppers
     Recipe(
-        id=uuid4(),
         title="Quinoa Stuffed Bell Peppers",
         description="Colorful peppers filled with quinoa, black beans, and vegetables",
         cuisine_type="American",
@@ -289,7 +282,6 @@ SEED_RECIPES = [
     
     # Recipe 10: Pad Thai
     Recipe(
-        id=uuid4(),
         title="Pad Thai",
         description="Classic Thai stir-fried noodles with shrimp and peanuts",
         cuisine_type="Thai",
@@ -320,7 +312,6 @@ SEED_RECIPES = [
     
     # Recipe 11: Lentil Soup
     Recipe(
-        id=uuid4(),
         title="Hearty Lentil Soup",
         description="Nutritious vegetarian soup with red lentils and vegetables",
         cuisine_type="Mediterranean",
@@ -351,7 +342,6 @@ SEED_RECIPES = [
     
     # Recipe 12: Margherita Pizza
     Recipe(
-        id=uuid4(),
         title="Margherita Pizza",
         description="Classic Italian pizza with tomato, mozzarella, and basil",
         cuisine_type="Italian",
@@ -382,7 +372,6 @@ SEED_RECIPES = [
     
     # Recipe 13: Chicken Caesar Salad
     Recipe(
-        id=uuid4(),
         title="Chicken Caesar Salad",
         description="Classic salad with grilled chicken, romaine, and creamy dressing",
         cuisine_type="American",
@@ -412,7 +401,6 @@ SEED_RECIPES = [
     
     # Recipe 14: Vegetable Stir Fry
     Recipe(
-        id=uuid4(),
         title="Vegetable Stir Fry",
         description="Quick and healthy stir-fried mixed vegetables with soy sauce",
         cuisine_type="Chinese",
@@ -444,7 +432,6 @@ SEED_RECIPES = [
     
     # Recipe 15: Baked Cod with Lemon
     Recipe(
-        id=uuid4(),
         title="Baked Cod with Lemon",
         description="Light and flaky cod fillet with fresh lemon and herbs",
         cuisine_type="Mediterranean",
@@ -474,7 +461,6 @@ SEED_RECIPES = [
     
     # Recipe 16: Black Bean Burgers
     Recipe(
-        id=uuid4(),
         title="Black Bean Burgers",
         description="Hearty vegetarian burgers made with black beans and spices",
         cuisine_type="American",
@@ -505,7 +491,6 @@ SEED_RECIPES = [
     
     # Recipe 17: Shrimp Scampi
     Recipe(
-        id=uuid4(),
         title="Shrimp Scampi",
         description="Garlicky shrimp in white wine butter sauce over pasta",
         cuisine_type="Italian",
@@ -536,7 +521,6 @@ SEED_RECIPES = [
     
     # Recipe 18: Chickpea Curry
     Recipe(
-        id=uuid4(),
         title="Chickpea Curry",
         description="Flavorful vegan curry with chickpeas in tomato-coconut sauce",
         cuisine_type="Indian",
@@ -568,7 +552,6 @@ SEED_RECIPES = [
     
     # Recipe 19: Beef Stir Fry
     Recipe(
-        id=uuid4(),
         title="Beef and Broccoli Stir Fry",
         description="Tender beef with crisp broccoli in savory Asian sauce",
         cuisine_type="Chinese",
@@ -599,7 +582,6 @@ SEED_RECIPES = [
     
     # Recipe 20: Caprese Salad
     Recipe(
-        id=uuid4(),
         title="Caprese Salad",
         description="Simple Italian salad with tomatoes, mozzarella, and basil",
         cuisine_type="Italian",
@@ -629,7 +611,6 @@ SEED_RECIPES = [
     
     # Recipe 21: Pork Chops with Apples
     Recipe(
-        id=uuid4(),
         title="Pork Chops with Apples",
         description="Pan-seared pork chops with caramelized apples and onions",
         cuisine_type="American",
@@ -659,7 +640,6 @@ SEED_RECIPES = [
     
     # Recipe 22: Veggie Fajitas
     Recipe(
-        id=uuid4(),
         title="Vegetable Fajitas",
         description="Sizzling bell peppers and onions with warm tortillas",
         cuisine_type="Mexican",
@@ -690,7 +670,6 @@ SEED_RECIPES = [
     
     # Recipe 23: Tuna Poke Bowl
     Recipe(
-        id=uuid4(),
         title="Tuna Poke Bowl",
         description="Hawaiian-style fresh tuna bowl with rice and vegetables",
         cuisine_type="Hawaiian",
@@ -721,7 +700,6 @@ SEED_RECIPES = [
     
     # Recipe 24: Eggplant Parmesan
     Recipe(
-        id=uuid4(),
         title="Eggplant Parmesan",
         description="Breaded eggplant slices baked with marinara and cheese",
         cuisine_type="Italian",
@@ -751,7 +729,6 @@ SEED_RECIPES = [
     
     # Recipe 25: Chicken Quesadillas
     Recipe(
-        id=uuid4(),
         title="Chicken Quesadillas",
         description="Crispy tortillas filled with chicken and melted cheese",
         cuisine_type="Mexican",
@@ -781,7 +758,6 @@ SEED_RECIPES = [
     
     # Recipe 26: Minestrone Soup
     Recipe(
-        id=uuid4(),
         title="Minestrone Soup",
         description="Hearty Italian vegetable soup with pasta and beans",
         cuisine_type="Italian",
@@ -812,7 +788,6 @@ SEED_RECIPES = [
     
     # Recipe 27: Honey Garlic Chicken
     Recipe(
-        id=uuid4(),
         title="Honey Garlic Chicken",
         description="Sweet and savory chicken thighs with sticky honey garlic glaze",
         cuisine_type="American",
@@ -842,7 +817,6 @@ SEED_RECIPES = [
     
     # Recipe 28: Ratatouille
     Recipe(
-        id=uuid4(),
         title="Ratatouille",
         description="Classic French vegetable stew with eggplant, zucchini, and tomatoes",
         cuisine_type="French",
@@ -874,7 +848,6 @@ SEED_RECIPES = [
     
     # Recipe 29: Sushi Rolls
     Recipe(
-        id=uuid4(),
         title="California Sushi Rolls",
         description="Fresh sushi rolls with crab, avocado, and cucumber",
         cuisine_type="Japanese",
@@ -905,7 +878,6 @@ SEED_RECIPES = [
     
     # Recipe 30: Shakshuka
     Recipe(
-        id=uuid4(),
         title="Shakshuka",
         description="Middle Eastern poached eggs in spicy tomato sauce",
         cuisine_type="Middle Eastern",
@@ -937,7 +909,6 @@ SEED_RECIPES = [
     
     # Recipe 31: Paneer Butter Masala
     Recipe(
-        id=uuid4(),
         title="Paneer Butter Masala",
         description="Creamy tomato-based curry with soft paneer cubes finished with butter",
         cuisine_type="Indian",
@@ -969,7 +940,6 @@ SEED_RECIPES = [
 
     # Recipe 32: Dal Makhani
     Recipe(
-        id=uuid4(),
         title="Dal Makhani",
         description="Slow-cooked black lentils and kidney beans finished with butter and cream",
         cuisine_type="Indian",
@@ -1000,7 +970,6 @@ SEED_RECIPES = [
 
     # Recipe 33: Palak Paneer
     Recipe(
-        id=uuid4(),
         title="Palak Paneer",
         description="Paneer simmered in a smooth spinach gravy with spices",
         cuisine_type="Indian",
@@ -1030,7 +999,6 @@ SEED_RECIPES = [
 
     # Recipe 34: Chole Masala
     Recipe(
-        id=uuid4(),
         title="Chole Masala",
         description="Punjabi-style spicy chickpea curry",
         cuisine_type="Indian",
@@ -1060,7 +1028,6 @@ SEED_RECIPES = [
 
     # Recipe 35: Aloo Gobi
     Recipe(
-        id=uuid4(),
         title="Aloo Gobi",
         description="Dry stir-fry of cauliflower and potatoes with spices",
         cuisine_type="Indian",
@@ -1089,7 +1056,6 @@ SEED_RECIPES = [
 
     # Recipe 36: Bhindi Masala
     Recipe(
-        id=uuid4(),
         title="Bhindi Masala",
         description="Okra stir-fried with onions, tomatoes, and spices",
         cuisine_type="Indian",
@@ -1118,7 +1084,6 @@ SEED_RECIPES = [
 
     # Recipe 37: Baingan Bharta
     Recipe(
-        id=uuid4(),
         title="Baingan Bharta",
         description="Smoky roasted eggplant mash cooked with onions and tomatoes",
         cuisine_type="Indian",
@@ -1147,7 +1112,6 @@ SEED_RECIPES = [
 
     # Recipe 38: Rogan Josh
     Recipe(
-        id=uuid4(),
         title="Rogan Josh",
         description="Kashmiri-style aromatic lamb curry with yogurt and spices",
         cuisine_type="Indian",
@@ -1176,7 +1140,6 @@ SEED_RECIPES = [
 
     # Recipe 39: Chicken Chettinad
     Recipe(
-        id=uuid4(),
         title="Chicken Chettinad",
         description="Spicy South Indian chicken curry with roasted spices",
         cuisine_type="Indian",
@@ -1205,7 +1168,6 @@ SEED_RECIPES = [
 
     # Recipe 40: Goan Fish Curry
     Recipe(
-        id=uuid4(),
         title="Goan Fish Curry",
         description="Tangy coconut-based fish curry with tamarind and spices",
         cuisine_type="Indian",
@@ -1234,7 +1196,6 @@ SEED_RECIPES = [
 
     # Recipe 41: Vegetable Biryani
     Recipe(
-        id=uuid4(),
         title="Vegetable Biryani",
         description="Layered basmati rice with spiced mixed vegetables and fried onions",
         cuisine_type="Indian",
@@ -1263,7 +1224,6 @@ SEED_RECIPES = [
 
     # Recipe 42: Rajma Masala
     Recipe(
-        id=uuid4(),
         title="Rajma Masala",
         description="North Indian kidney bean curry with onion-tomato gravy",
         cuisine_type="Indian",
@@ -1291,7 +1251,6 @@ SEED_RECIPES = [
 
     # Recipe 43: Kadai Paneer
     Recipe(
-        id=uuid4(),
         title="Kadai Paneer",
         description="Stir-fried paneer with bell peppers in a roasted spice gravy",
         cuisine_type="Indian",
@@ -1320,7 +1279,6 @@ SEED_RECIPES = [
 
     # Recipe 44: Malai Kofta
     Recipe(
-        id=uuid4(),
         title="Malai Kofta",
         description="Fried paneer-potato dumplings in a rich creamy gravy",
         cuisine_type="Indian",
@@ -1349,7 +1307,6 @@ SEED_RECIPES = [
 
     # Recipe 45: Laal Maas
     Recipe(
-        id=uuid4(),
         title="Laal Maas",
         description="Rajasthani hot mutton curry with mathania chilies",
         cuisine_type="Indian",
@@ -1377,7 +1334,6 @@ SEED_RECIPES = [
 
     # Recipe 46: Kerala Fish Moilee
     Recipe(
-        id=uuid4(),
         title="Kerala Fish Moilee",
         description="Mild coconut milk fish stew with ginger and green chilies",
         cuisine_type="Indian",
@@ -1406,7 +1362,6 @@ SEED_RECIPES = [
 
     # Recipe 47: Paneer Tikka
     Recipe(
-        id=uuid4(),
         title="Paneer Tikka",
         description="Marinated paneer and peppers skewered and roasted",
         cuisine_type="Indian",
@@ -1435,7 +1390,6 @@ SEED_RECIPES = [
 
     # Recipe 48: Egg Curry
     Recipe(
-        id=uuid4(),
         title="Egg Curry",
         description="Boiled eggs simmered in onion-tomato gravy",
         cuisine_type="Indian",
@@ -1464,7 +1418,6 @@ SEED_RECIPES = [
 
     # Recipe 49: Pindi Chole
     Recipe(
-        id=uuid4(),
         title="Pindi Chole",
         description="Dry-style chickpea curry from Rawalpindi with robust spices",
         cuisine_type="Indian",
@@ -1492,7 +1445,6 @@ SEED_RECIPES = [
 
     # Recipe 50: Veg Pulao
     Recipe(
-        id=uuid4(),
         title="Veg Pulao",
         description="Fragrant basmati rice cooked with mixed vegetables and whole spices",
         cuisine_type="Indian",
@@ -1520,3 +1472,11 @@ SEED_RECIPES = [
     ),
 ]
 
+# When the seed set was published; fixed so records don't take import-time timestamps
+SEED_TIMESTAMP = datetime(2024, 1, 1)
+
+# Stable, content-derived IDs and fixed timestamps: the same records in every
+# worker and across restarts
+for _recipe in SEED_RECIPES:
+    _recipe.id = recipe_content_id(_recipe.model_dump())
+    _recipe.created_at = _recipe.updated_at = SEED_TIMESTAMP
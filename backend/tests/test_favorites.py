@@ -2,6 +2,8 @@
 Tests for favorites and ratings endpoints
 """
 
+from data.seed_recipes import SEED_RECIPES
+
 
 def test_add_favorite(client):
     """Test adding a recipe to favorites"""
@@ -42,6 +44,17 @@ def test_get_user_favorites(client):
     assert isinstance(data["favorites"], list)
 
 
+def test_favorites_hydrate_catalog_recipes(client):
+    """Favorited catalog IDs come back as recipes, in favorite order"""
+    for recipe_id in [str(SEED_RECIPES[4].id), "recipe-unknown", str(SEED_RECIPES[1].id)]:
+        client.post("/api/v1/favorites/", json={"recipe_id": recipe_id, "user_id": "user-hydrate"})
+    
+    data = client.get("/api/v1/favorites/user-hydrate").json()
+    
+    assert data["total"] == 3
+    assert [r["title"] for r in data["recipes"]] == [SEED_RECIPES[4].title, SEED_RECIPES[1].title]
+
+
 def test_remove_favorite(client):
     """Test removing a recipe from favorites"""
     # First add
@@ -28,3 +28,41 @@ def test_root_endpoint(client):
     assert "status" in data
     assert data["status"] == "running"
 
+
+def test_health_reports_service_readiness(client):
+    """Health check lists every registered service with its load state"""
+    from app.services.registry import services
+
+    response = client.get("/api/v1/health")
+    readiness = response.json()["readiness"]
+
+    assert set(readiness) == set(services.status())
+    assert all(state in ("pending", "loading", "ready", "failed") for state in readiness.values())
+
+
+def test_registry_builds_services_lazily_once():
+    """Services are constructed on first attribute access and then reused"""
+    from app.services.registry import ServiceRegistry
+
+    registry = ServiceRegistry()
+    registry.register("counter", "collections:Counter")
+    proxy = registry.proxy("counter")
+
+    assert registry.status() == {"counter": "pending"}
+    proxy.update("aab")
+    assert registry.is_ready("counter")
+    assert registry.get("counter") == {"a": 2, "b": 1}
+    assert registry.proxy("counter") is proxy
+
+
+def test_app_import_does_not_load_pandas():
+    """Importing the app leaves pandas to the first dataset build"""
+    import subprocess
+    import sys
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('pandas' in sys.modules)"],
+        capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
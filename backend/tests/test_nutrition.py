@@ -0,0 +1,495 @@
+"""
+Tests for nutrition endpoints and nutrient services
+"""
+
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.schemas.nutrition_schema import CookingMethod, IngredientInfo, StressLevel
+from app.services import dataset_snapshot, nutrient_tables
+from app.services.bioavailability_service import bioavailability_engine
+from app.services.executor import TaskExecutor
+from app.services.food_index import FoodNameIndex
+from app.services.nutrient_calculator import nutrient_calculator
+from app.services.nutrient_density_index import dietary_tags, nutrient_density_index
+from app.services.rda_service import rda_calculator
+from app.services.registry import services
+from app.services.result_cache import ResultCache, nutrition_cache
+from app.utils.error_handlers import TaskTimeoutError
+
+
+SAMPLE_MEAL = {
+    "ingredients": [
+        {"name": "rice", "quantity_g": 150, "category": "Grains"},
+        {"name": "dal", "quantity_g": 100, "category": "Legumes"},
+        {"name": "spinach", "quantity_g": 80, "category": "Vegetables"},
+    ],
+    "cooking_method": "Boiled",
+    "stress_level": "medium",
+    "age": 30,
+    "post_workout": False,
+}
+
+
+def test_compute_bioavailability(client):
+    """Test bioavailability computation for a simple meal"""
+    response = client.post("/api/v1/nutrition/bioavailability", json=SAMPLE_MEAL)
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["success"] is True
+    assert data["base_nutrients"]
+    assert set(data["adjusted_nutrients"]) == set(data["base_nutrients"])
+    assert data["adjustment_factors"]["cooking_method"] == "Boiled"
+
+
+def test_batch_bioavailability_matches_single_requests(client):
+    """Batch results come back in order, equal to single calls, with per-item errors"""
+    second = {**SAMPLE_MEAL, "cooking_method": "Fried", "post_workout": True}
+    invalid = {**SAMPLE_MEAL, "age": 0}
+    response = client.post(
+        "/api/v1/nutrition/bioavailability/batch",
+        json={"meals": [SAMPLE_MEAL, invalid, second]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert data["failed"] == 1
+    assert [item["index"] for item in data["results"]] == [0, 1, 2]
+    assert data["results"][1]["success"] is False
+    assert "age" in data["results"][1]["error"]
+
+    for item, meal in ((data["results"][0], SAMPLE_MEAL), (data["results"][2], second)):
+        single = client.post("/api/v1/nutrition/bioavailability", json=meal).json()
+        assert item["base_nutrients"] == single["base_nutrients"]
+        assert item["adjusted_nutrients"] == single["adjusted_nutrients"]
+
+
+def test_batch_totals_equal_per_meal_totals():
+    """Batch totals are bit-identical to nutrient_totals, repeated foods included"""
+    from app.benchmarks import random_meals
+
+    meals = [meal["ingredients"] for meal in random_meals(200)]
+    meals += [meals[0] + meals[1] + meals[0], [], meals[2] * 3]
+    totals, present = nutrient_calculator.batch_totals(meals)
+
+    for m, meal in enumerate(meals):
+        expected, expected_present = nutrient_calculator.nutrient_totals(
+            *nutrient_calculator.resolve_ingredients(meal)
+        )
+        assert np.array_equal(totals[m], expected)
+        assert np.array_equal(present[m], expected_present)
+
+
+def test_compare_cooking_methods_matches_single_requests(client):
+    """Compare mode returns every method, each equal to a single compute"""
+    meal = {k: v for k, v in SAMPLE_MEAL.items() if k != "cooking_method"}
+    response = client.post("/api/v1/nutrition/bioavailability/compare", json=meal)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["adjusted_by_method"]) == {m.value for m in CookingMethod}
+    assert data["best_method"] == max(data["retention_scores"], key=data["retention_scores"].get)
+
+    for method in ("Raw", "Fried"):
+        single = client.post(
+            "/api/v1/nutrition/bioavailability", json={**meal, "cooking_method": method}
+        ).json()
+        assert data["base_nutrients"] == single["base_nutrients"]
+        assert data["adjusted_by_method"][method] == single["adjusted_nutrients"]
+
+
+def test_food_index_first_match_order():
+    """Exact names win, then the first substring match, then aliases"""
+    index = FoodNameIndex(["Rice flakes", "Plain rice", "Moong dal", None, "Chawal kheer"])
+
+    assert index.resolve("plain RICE") == 1
+    assert index.resolve("rice") == 0
+    assert index.resolve("moong") == 2
+    assert index.resolve("brown basmati") is None
+    assert index.resolve("boiled rice grains") == 0
+    assert index.resolve("xyz") is None
+
+
+def test_food_index_matches_dataframe_scan():
+    """Index lookups return the same rows as the pandas string scans"""
+    # Names in matrix row order; works with or without SHARED_DATASETS
+    lowered = pd.Series(nutrient_calculator.food_names).str.lower()
+
+    for name in ["rice", "Paneer", "chicken breast", "tea", "lentils", "kidney beans"]:
+        expected = None
+        for pattern in (name.lower(), nutrient_calculator._alternative_names(name)):
+            hits = lowered.index[lowered.str.contains(pattern, na=False)]
+            if len(hits):
+                expected = hits[0]
+                break
+        exact = lowered.index[lowered == name.lower()]
+        if len(exact):
+            expected = exact[0]
+
+        assert nutrient_calculator._find_food_row(name) == expected
+
+
+def test_calculate_nutrients_matches_dataset_rows():
+    """Meal totals are the per-100 g row values scaled by quantity and summed"""
+    meal = [
+        IngredientInfo(name="rice", quantity_g=150, category="Grains"),
+        IngredientInfo(name="paneer", quantity_g=50, category="Dairy"),
+    ]
+    totals = nutrient_calculator.calculate_nutrients(meal)
+
+    expected = {}
+    for ing in meal:
+        food = nutrient_calculator._find_food(ing.name)
+        for col in nutrient_calculator.nutrient_columns:
+            if food[col] == food[col]:  # skip NaN
+                expected[col] = expected.get(col, 0.0) + float(food[col]) * (ing.quantity_g / 100.0)
+
+    assert totals == {k: round(v, 2) for k, v in expected.items()}
+
+
+def test_dataset_snapshot_round_trip(tmp_path):
+    """Snapshots reload identical frames and go stale when a source changes"""
+    source = tmp_path / "foods.csv"
+    source.write_text("food_name,protein_g,note\nRice,2.7,\nDal,9.0,cooked\n")
+    frame = pd.read_csv(source)
+    sources = {"food_composition": str(source)}
+    path = str(tmp_path / "snapshot.npz")
+
+    dataset_snapshot.write_snapshot({"food_composition": frame}, sources, path)
+    loaded = dataset_snapshot.read_snapshot(sources, path)
+    pd.testing.assert_frame_equal(loaded["food_composition"], frame)
+
+    source.write_text("food_name,protein_g,note\nRice,2.7,\n")
+    assert dataset_snapshot.read_snapshot(sources, path) is None
+
+
+def test_shared_tables_map_the_compiled_matrix(tmp_path):
+    """The mapped artifact holds the same read-only nutrient matrix"""
+    path = str(tmp_path / "tables.bin")
+    nutrient_tables.write_tables(path)
+    tables = nutrient_tables.shared_tables(path)
+
+    assert tables.meta["nutrient_columns"] == nutrient_calculator.nutrient_columns
+    assert np.array_equal(tables["anuvaad.values"], nutrient_calculator.nutrient_matrix)
+    assert np.array_equal(tables["anuvaad.mask"], nutrient_calculator.nutrient_mask)
+    assert not tables["anuvaad.values"].flags.writeable
+
+
+def test_stale_shared_tables_are_unmapped(tmp_path, monkeypatch):
+    """Recompiling a stale artifact closes the old mapping first"""
+    path = str(tmp_path / "tables.bin")
+    nutrient_tables.write_tables(path)
+    mapped = []
+    map_tables = nutrient_tables._map_tables
+
+    def record_mapping(p):
+        mapped.append(map_tables(p))
+        return mapped[-1]
+
+    monkeypatch.setattr(nutrient_tables, "_map_tables", record_mapping)
+    monkeypatch.setattr(nutrient_tables, "TABLES_VERSION", nutrient_tables.TABLES_VERSION + 1)
+
+    tables = nutrient_tables._open_tables(path)
+
+    assert len(mapped) == 2 and mapped[0]._buffer.closed
+    assert tables is mapped[1] and tables.meta["version"] == nutrient_tables.TABLES_VERSION
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps")
+def test_memory_report_measures_worker_processes():
+    """The report lists only mapped tables and measures Pss of real workers"""
+    report = nutrient_tables.memory_report(workers=1)
+
+    assert set(report["mapped_tables_bytes"]) == set(nutrient_tables.shared_tables().arrays)
+    assert "food_composition" in report["unmapped_datasets"]
+    assert report["private_bytes_per_worker"]["food_index"] > 0
+    assert report["private_mode_pss_kb_per_worker"] > 0 and report["shared_mode_pss_kb_per_worker"] > 0
+    assert report["per_worker_savings_kb"] == round(
+        report["private_mode_pss_kb_per_worker"] - report["shared_mode_pss_kb_per_worker"], 1
+    )
+
+
+def test_shared_datasets_mode_matches_private_mode(monkeypatch):
+    """With SHARED_DATASETS the services map the artifact and compute the same results"""
+    from app.config import settings
+
+    meal = [
+        IngredientInfo(name="rice", quantity_g=150, category="Grains"),
+        IngredientInfo(name="paneer", quantity_g=50, category="Dairy"),
+        IngredientInfo(name="spinach", quantity_g=80, category="Vegetables"),
+    ]
+    args = (meal, CookingMethod.boiling, StressLevel.medium, 30, False)
+    private = bioavailability_engine.compute(*args)
+    private_coverage = rda_calculator.coverage_values(private["adjusted_nutrients"], 30, 62, 168)
+    names = ("nutrient_calculator", "bioavailability_engine", "rda_calculator")
+
+    monkeypatch.setattr(settings, "SHARED_DATASETS", True)
+    try:
+        for name in names:
+            services.reload(name)
+        assert nutrient_calculator.anuvaad_data is None
+        assert not nutrient_calculator.nutrient_matrix.flags.writeable
+        assert bioavailability_engine.compute(*args) == private
+        assert rda_calculator.coverage_values(private["adjusted_nutrients"], 30, 62, 168) == private_coverage
+        assert nutrient_calculator._find_food("paneer") is not None
+    finally:
+        monkeypatch.undo()
+        for name in names:
+            services.reload(name)
+    assert nutrient_calculator.anuvaad_data is not None
+
+
+def test_bioavailability_factor_lookups_match_csv():
+    """Precomputed retention and digestibility lookups agree with the CSV rows"""
+
+    retention = pd.read_csv("data/retention_factors.csv")
+    for row in retention.drop_duplicates(["cooking_method", "nutrient_type"]).itertuples():
+        i = bioavailability_engine.retention_methods[row.cooking_method]
+        j = bioavailability_engine.retention_types[row.nutrient_type]
+        assert bioavailability_engine.retention_matrix[i, j] == row.retention_factor
+
+    assert bioavailability_engine._retention(CookingMethod.raw, "protein_g") == 1.0
+    assert bioavailability_engine._retention(CookingMethod.raw, "unheard_of") == 1.0
+
+    meal = [
+        IngredientInfo(name="rice", quantity_g=150, category="Grains"),
+        IngredientInfo(name="mystery", quantity_g=50, category="Nonexistent"),
+    ]
+    factors = bioavailability_engine.digestibility_factors
+    expected = 0.75 * factors["grains"] + 0.25 * factors.get("unknown", 0.8)
+    assert bioavailability_engine._digestibility(meal) == expected
+
+
+def test_vectorized_bioavailability_matches_per_nutrient_factors():
+    """compute() applies the same per-nutrient factors as the scalar helpers"""
+
+    meal = [IngredientInfo(**ing) for ing in SAMPLE_MEAL["ingredients"]]
+    result = bioavailability_engine.compute(meal, CookingMethod.frying, StressLevel.high, 70, True)
+
+    for nutrient, value in result["base_nutrients"].items():
+        expected = (value
+                    * bioavailability_engine._retention(CookingMethod.frying, nutrient)
+                    * bioavailability_engine._digestibility(meal)
+                    * bioavailability_engine._physio(StressLevel.high, 70, True, nutrient))
+        assert abs(result["adjusted_nutrients"][nutrient] - expected) <= 0.011
+
+
+def test_result_cache_lru_ttl_and_byte_bound():
+    """Entries expire after the TTL and the oldest go first past the byte budget"""
+    now = [0.0]
+    cache = ResultCache(max_bytes=40, ttl_seconds=10, clock=lambda: now[0])
+
+    cache.set("a", {"x": 1.0})  # 9 bytes of JSON
+    cache.set("b", {"x": 2.0})
+    cache.set("c", {"x": 3.0})
+    assert cache.get("a") == {"x": 1.0}
+    cache.set("d", {"x": 4.0})
+    cache.set("e", {"x": 5.0})  # over 40 bytes: "b" is the least recently used
+
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.bytes <= 40
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_result_cache_canonical_keys_and_reload_invalidation(client):
+    """Reordered, re-cased meals hit the same entry; a dataset reload clears it"""
+    reordered = {
+        **SAMPLE_MEAL,
+        "ingredients": [
+            {**ing, "category": ing["category"].upper() + " "}
+            for ing in reversed(SAMPLE_MEAL["ingredients"])
+        ],
+    }
+    nutrition_cache.invalidate()
+    first = client.post("/api/v1/nutrition/bioavailability", json=SAMPLE_MEAL).json()
+    hits = nutrition_cache.hits
+    second = client.post("/api/v1/nutrition/bioavailability", json=reordered).json()
+
+    assert nutrition_cache.hits == hits + 1
+    assert second == first
+
+    services.reload("rda_calculator")
+    assert nutrition_cache.stats()["entries"] == 0
+
+
+def test_executor_times_out_slow_tasks_and_reports_metrics():
+    """Slow tasks raise TaskTimeoutError; finished tasks feed the wait/run metrics"""
+    executor = TaskExecutor("thread", max_workers=1, timeout_seconds=5)
+
+    async def scenario():
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(TaskTimeoutError):
+            await executor.run(time.sleep, 0.3, timeout=0.05)
+        assert executor.queue_depth == 0 and executor.in_flight == 1
+        await asyncio.sleep(0.4)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats["timeouts"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["max_run_ms"] >= 300
+
+
+def test_rda_coverage_is_numeric_with_optional_formatting(client):
+    """Coverage is computed as numbers; strings are only the display form"""
+    nutrients = {"protein_g": 28.0, "iron_mg": 2.0, "mystery_x": 5.0}
+    response = client.post("/api/v1/nutrition/rda-coverage", json={
+        "adjusted_nutrients": nutrients, "age": 30, "weight_kg": 60, "height_cm": 170,
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rda_coverage_pct"]["mystery_x"] is None
+    assert data["rda_coverage"]["mystery_x"] == "N/A"
+    pct = data["rda_coverage_pct"]["protein_g"]
+    assert data["rda_coverage"]["protein_g"] == f"{pct:.1f}%"
+
+    coverages = [r["coverage_pct"] for r in data["recommendations"]]
+    assert coverages == sorted(coverages) and all(c < 50 for c in coverages)
+
+    # Rows of a 2-D batch match the per-meal dict API
+    row = rda_calculator.profile_row(30, 60, 170)
+    names = list(nutrients)
+    batch = rda_calculator.coverage_array(
+        np.array([list(nutrients.values()), [56.0, 0.0, 1.0]]),
+        rda_calculator.nutrient_indices(names),
+        row,
+    )
+    assert batch[0, 0] == pct
+    assert np.isnan(batch[1, 2])
+
+
+def test_nutrient_density_index_ranks_and_filters(client):
+    """Top foods come from the nutrient matrix, densest first, honouring filters"""
+    iron = nutrient_calculator.nutrient_columns.index("iron_mg")
+    values = np.where(nutrient_calculator.nutrient_mask[:, iron], nutrient_calculator.nutrient_matrix[:, iron], 0)
+    top = nutrient_density_index.top_foods("iron_mg", k=5)
+    assert [f["value"] for f in top] == sorted((f["value"] for f in top), reverse=True)
+    assert top[0]["value"] == round(float(values.max()), 3)
+
+    vegan = nutrient_density_index.top_foods("protein_g", k=5, basis="per_100kcal", tag="vegan")
+    assert len(vegan) == 5 and all("vegan" in f["tags"] for f in vegan)
+    # Classification filter keeps the ranking order of the matching foods
+    ranked = nutrient_density_index.top_foods("iron_mg", k=len(nutrient_density_index.food_names))
+    cereals = [f for f in ranked if "cereal" in (f["classification"] or "").lower()][:3]
+    assert nutrient_density_index.top_foods("iron_mg", k=3, classification="Cereal") == cereals
+    assert dietary_tags("Paneer tikka") == ("vegetarian",)
+    assert dietary_tags("Peanut butter toast") == ("vegetarian", "vegan")
+    assert dietary_tags("Egg curry") == ("non-vegetarian",)
+    # RDA-style names resolve to Anuvaad columns
+    assert nutrient_density_index.top_foods("vitamin_c_mg", k=1)[0]["nutrient"] == "vitc_mg"
+
+    response = client.post("/api/v1/nutrition/rda-coverage", json={
+        "adjusted_nutrients": {"fiber_g": 1.0, "vitamin_b1_mg": 0.1},
+        "age": 30, "weight_kg": 60, "height_cm": 170, "dietary_tag": "vegan",
+    })
+    assert response.status_code == 200
+    recs = response.json()["recommendations"]
+    assert {r["nutrient"] for r in recs} == {"fiber_g", "vitamin_b1_mg"}
+    for rec in recs:
+        assert len(rec["suggestions"]["high"]) == 3
+        assert all("vegan" in f["tags"] for f in rec["top_foods"])
+
+
+def test_rda_gap_optimizer_closes_flagged_gaps(client):
+    """Suggested additions lift every flagged nutrient to the target, within limits"""
+    nutrients = {"protein_g": 20.0, "iron_mg": 2.0, "calcium_mg": 150.0, "fiber_g": 3.0,
+                 "energy_kcal": 600.0, "sodium_mg": 400.0}
+    response = client.post("/api/v1/nutrition/rda-coverage/optimize", json={
+        "adjusted_nutrients": nutrients, "age": 30, "weight_kg": 60, "height_cm": 170,
+        "target_pct": 60, "max_foods": 4,
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["flagged"]) == set(nutrients)
+    assert data["complete"] and not data["unmet"] and not data["budget_exhausted"]
+    assert 1 <= len(data["additions"]) <= 4
+    assert all(0 < a["grams"] <= 400 for a in data["additions"])
+    projected = data["projected_coverage_pct"]
+    assert all(projected[n] >= 60 - 1e-6 for n in nutrients)
+    assert projected["sodium_mg"] <= 100 and projected["energy_kcal"] <= 100
+
+    # Projection equals /rda-coverage of the meal plus the additions
+    rows = [nutrient_calculator.food_names.index(a["food"]) for a in data["additions"]]
+    grams = np.array([a["grams"] for a in data["additions"]])
+    iron = nutrient_calculator.nutrient_columns.index("iron_mg")
+    added_iron = float(nutrient_calculator.nutrient_matrix[rows, iron] @ grams / 100)
+    check = rda_calculator.coverage_values({"iron_mg": 2.0 + added_iron}, 30, 60, 170)
+    assert abs(check["iron_mg"] - projected["iron_mg"]) < 0.1
+
+
+def test_analyze_matches_the_two_step_flow(client):
+    """One /analyze call equals /bioavailability followed by /rda-coverage"""
+    profile = {"weight_kg": 62, "height_cm": 168}
+    response = client.post("/api/v1/nutrition/analyze", json={**SAMPLE_MEAL, **profile})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {"resolve_foods", "bioavailability", "rda_coverage", "total"} <= set(data["timings_ms"])
+
+    bio = client.post("/api/v1/nutrition/bioavailability", json=SAMPLE_MEAL).json()
+    assert data["adjusted_nutrients"] == bio["adjusted_nutrients"]
+
+    coverage = client.post("/api/v1/nutrition/rda-coverage", json={
+        "adjusted_nutrients": bio["adjusted_nutrients"], "age": SAMPLE_MEAL["age"], **profile,
+    }).json()
+    assert data["rda_coverage"].keys() == coverage["rda_coverage"].keys()
+    # /analyze covers the unrounded adjusted values; the two-step flow sees
+    # them rounded to 2 decimals, which only matters for tiny amounts
+    for name, pct in coverage["rda_coverage_pct"].items():
+        if pct is None:
+            assert data["rda_coverage_pct"][name] is None
+        elif bio["adjusted_nutrients"][name] >= 1:
+            assert abs(data["rda_coverage_pct"][name] - pct) <= pct * 0.01
+
+    def flagged(recs):
+        return {r["nutrient"] for r in recs if bio["adjusted_nutrients"][r["nutrient"]] >= 1}
+
+    assert flagged(data["recommendations"]) == flagged(coverage["recommendations"])
+
+
+def test_cohort_coverage_streams_chunked_csv(client):
+    """Each streamed row matches the per-meal coverage; bad profiles are flagged"""
+    rows = [
+        {"user_id": f"u{i}", "age": 20 + i, "weight_kg": 55 + i, "height_cm": 165,
+         "protein_g": 10.0 * i, "iron_mg": 1.5 * i}
+        for i in range(250)
+    ]
+    rows[3]["age"] = ""
+    frame = pd.DataFrame(rows)
+    response = client.post(
+        "/api/v1/nutrition/rda-coverage/cohort?chunk_size=100",
+        files={"file": ("cohort.csv", frame.to_csv(index=False), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    out = pd.read_csv(io.StringIO(response.text))
+    assert list(out["user_id"]) == [r["user_id"] for r in rows]
+    assert out.loc[3, "error"] == "invalid profile"
+
+    for i in (0, 1, 120, 249):
+        expected = rda_calculator.coverage_values(
+            {"protein_g": rows[i]["protein_g"], "iron_mg": rows[i]["iron_mg"]},
+            rows[i]["age"], rows[i]["weight_kg"], rows[i]["height_cm"],
+        )
+        assert out.loc[i, "protein_g_pct"] == pytest.approx(expected["protein_g"], abs=0.051)
+        assert out.loc[i, "iron_mg_pct"] == pytest.approx(expected["iron_mg"], abs=0.051)
@@ -2,8 +2,25 @@
 Tests for recipe endpoints
 """
 
+import json
+
 import pytest
 
+from app.benchmarks import synthetic_catalog
+from app.services.ingredient_similarity import IngredientSimilarity
+from app.services.recipe_catalog import RecipeCatalog, recipe_content_id, write_jsonl
+from app.services.recipe_filters import RecipeFilterIndex
+from app.services.recipe_matcher import RecipeMatcher, get_recipe_matcher
+from app.services.recipe_matrix import SparseRecipeMatcher
+from app.utils.helpers import fuzzy_match_ingredients
+from data.seed_recipes import SEED_RECIPES
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """Seed recipes plus a synthetic tail, one list so its index is reused"""
+    return SEED_RECIPES + synthetic_catalog(300)
+
 
 def test_search_recipes(client, sample_ingredients):
     """Test recipe search endpoint"""
@@ -44,6 +61,158 @@ def test_search_recipes_with_dietary_restrictions(client, sample_ingredients):
         assert "vegetarian" in recipe_match["recipe"]["dietary_tags"]
 
 
+@pytest.mark.parametrize("pantry, restrictions", [
+    (["chicken", "tomato", "onion", "garlic", "rice"], None),
+    (["tomatoes", "chiken breast", "olive oil"], None),
+    (["oil", "salt"], None),
+    (["tofu"], ["vegan"]),
+    (["zzz"], None),
+])
+def test_ingredient_index_matches_full_scan(catalog, pantry, restrictions):
+    """Index candidates and cached fuzzy scores give exactly the full-scan results"""
+
+    def signature(use_index):
+        matches = RecipeMatcher.match_recipes(
+            catalog, pantry, dietary_restrictions=restrictions, use_index=use_index
+        )
+        return [(m.recipe.title, m.match_percentage, m.matched_ingredients, m.missing_ingredients)
+                for m in matches]
+
+    assert signature(use_index=True) == signature(use_index=False)
+    if not restrictions:
+        index = RecipeMatcher.index_for(catalog)
+        assert len(index.candidates(index.matching_terms(pantry))) < len(catalog)
+
+
+@pytest.mark.parametrize("pantry, filters", [
+    (["chicken", "tomato", "onion", "garlic", "rice"], {}),
+    (["tomatoes", "chiken breast", "olive oil", ""], {}),
+    (["pasta", "garlic", "olive oil"], {"cuisine_type": "italian", "max_cook_time": 30}),
+    (["tofu", "soy sauce"], {"dietary_restrictions": ["Vegan "]}),
+    (["eggs", "butter", "flour"], {"dietary_restrictions": ["vegetarian", "gluten-free"]}),
+    (["onion"], {"difficulty": "Easy"}),
+    (["zzz"], {}),
+])
+def test_sparse_matcher_matches_scan(catalog, pantry, filters):
+    """The sparse matrix backend returns exactly the scan matcher's results (seed + synthetic)"""
+
+    def signature(matches):
+        return [(m.recipe.title, m.match_percentage, m.matched_ingredients,
+                 m.missing_ingredients, m.can_make_with_substitutions) for m in matches]
+
+    expected = RecipeMatcher.match_recipes(catalog, pantry, use_index=False, **filters)
+    actual = SparseRecipeMatcher.match_recipes(catalog, pantry, **filters)
+    assert signature(actual) == signature(expected)
+    assert isinstance(get_recipe_matcher("sparse"), SparseRecipeMatcher)
+
+
+@pytest.mark.parametrize("matcher", [RecipeMatcher, SparseRecipeMatcher])
+def test_match_limit_keeps_top_results(catalog, matcher):
+    """limit returns the same leading matches, ties in catalog order, as slicing the full list"""
+    pantry = ["chicken", "garlic", "onion", "olive oil", "salt", "tomato"]
+    full = matcher.match_recipes(catalog, pantry)
+    assert len(full) > 10
+    for limit in (1, 10, len(full) + 5):
+        top = matcher.match_recipes(catalog, pantry, limit=limit)
+        assert [(m.recipe.title, m.match_percentage, m.missing_ingredients) for m in top] == \
+            [(m.recipe.title, m.match_percentage, m.missing_ingredients) for m in full[:limit]]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"cuisine": "ITALIAN", "difficulty": "Easy"},
+    {"all_tags": ["Vegetarian ", "gluten-free"], "max_total_time": 40},
+    {"any_tags": ["vegan", "keto"], "max_total_time": 25},
+    {"cuisine": "klingon"},
+])
+def test_filter_bitmaps_match_per_recipe_checks(catalog, filters):
+    """Bitmap filters select exactly the recipes the per-recipe checks do"""
+    cuisine = filters.get("cuisine")
+    difficulty = filters.get("difficulty")
+    max_time = filters.get("max_total_time")
+    expected = [
+        i for i, r in enumerate(catalog)
+        if (not cuisine or (r.cuisine_type or "").lower() == cuisine.lower())
+        and (not difficulty or r.difficulty == difficulty.lower())
+        and RecipeMatcher._check_dietary_compliance(r, filters.get("all_tags", []))
+        and (not filters.get("any_tags")
+             or any(t in [d.lower() for d in r.dietary_tags] for t in filters["any_tags"]))
+        and (not max_time or r.total_time <= max_time)
+    ]
+    assert RecipeFilterIndex(catalog).positions(**filters).tolist() == expected
+
+
+def test_catalog_round_trips_recipes(tmp_path):
+    """Compact catalogs (in memory and bulk-loaded JSONL) materialize the same Recipe models"""
+    path = tmp_path / "catalog.jsonl"
+    write_jsonl(SEED_RECIPES, str(path))
+    for catalog in (RecipeCatalog.from_recipes(SEED_RECIPES), RecipeCatalog.from_jsonl(str(path))):
+        assert len(catalog) == len(SEED_RECIPES)
+        assert catalog.recipes(range(len(catalog))) == SEED_RECIPES
+        assert catalog[3].ingredient_names == SEED_RECIPES[3].ingredient_names
+        assert catalog.position_of(SEED_RECIPES[7].id) == 7
+
+
+def test_catalog_ids_are_content_derived(tmp_path):
+    """Records without ids get the same IDs on every load; lookups use the hash index"""
+    path = tmp_path / "catalog.jsonl"
+    path.write_text("".join(
+        json.dumps(r.model_dump(mode="json", exclude={"id"})) + "\n"
+        for r in SEED_RECIPES[:5] + SEED_RECIPES[:1]
+    ))
+    first, second = RecipeCatalog.from_jsonl(str(path)), RecipeCatalog.from_jsonl(str(path))
+    ids = [record.id for record in first]
+    assert ids == [record.id for record in second]
+    assert ids[:5] == [r.id for r in SEED_RECIPES[:5]] == [recipe_content_id(r.model_dump()) for r in SEED_RECIPES[:5]]
+    # An identical copy gets its own ID
+    assert len(set(ids)) == 6
+    assert [r.title for r in first.get_many([ids[3], "not-an-id", str(ids[5]), ids[0]])] == \
+        [SEED_RECIPES[3].title, SEED_RECIPES[0].title, SEED_RECIPES[0].title]
+    assert first.get(ids[2]).title == SEED_RECIPES[2].title
+
+
+@pytest.mark.parametrize("matcher", [RecipeMatcher, SparseRecipeMatcher])
+def test_matching_a_catalog_matches_the_model_list(matcher):
+    """Matching the compact catalog gives the Recipe-list results"""
+    compact = RecipeCatalog.from_recipes(SEED_RECIPES)
+    pantry = ["chicken", "garlic", "rice", "tomatoes"]
+    for filters in ({}, {"dietary_restrictions": ["vegetarian"], "limit": 5}):
+        expected = matcher.match_recipes(SEED_RECIPES, pantry, **filters)
+        actual = matcher.match_recipes(compact, pantry, **filters)
+        assert [m.model_dump() for m in actual] == [m.model_dump() for m in expected]
+
+
+def test_similarity_cache_agrees_with_fuzzy_match(catalog):
+    """Cached rows hold exactly the pairs fuzzy_match_ingredients scores >= threshold"""
+    vocabulary = sorted({i.name for r in catalog for i in r.ingredients})
+    similarity = IngredientSimilarity(vocabulary, 0.7, canonical=vocabulary[:5], max_terms=2)
+    for term in ["Tomatoes ", "chiken", "oil", "garlic", "parmesan", "zzz"]:
+        expected = {
+            v.lower().strip(): fuzzy_match_ingredients(v, term)
+            for v in vocabulary if fuzzy_match_ingredients(v, term) >= 0.7
+        }
+        assert similarity.matches(term) == expected
+    stats = similarity.stats()
+    assert stats["cached_terms"] == 2 and stats["evictions"] == 4
+    assert stats["ratios_pruned"] > stats["ratios_computed"]
+
+
+def test_similarity_canonical_rows_are_built_off_the_constructor(catalog):
+    """Canonical rows are pinned on first use or by precompute(), not in __init__"""
+    vocabulary = sorted({i.name for r in catalog for i in r.ingredients})
+    similarity = IngredientSimilarity(vocabulary, 0.7, canonical=vocabulary[:5], max_terms=2)
+    assert similarity.stats()["canonical_rows"] == 0
+    assert similarity.stats()["ratios_computed"] == 0
+
+    first = similarity.matches(vocabulary[0])
+    assert similarity.stats()["canonical_rows"] == 1
+    assert similarity.stats()["cached_terms"] == 0
+    similarity.precompute()
+    stats = similarity.stats()
+    assert stats["canonical_terms"] == stats["canonical_rows"] == 5
+    assert similarity.matches(vocabulary[0]) is first
+
+
 def test_search_recipes_invalid_ingredients(client):
     """Test recipe search with empty ingredients"""
     response = client.post(
@@ -70,6 +239,74 @@ def test_list_recipes(client):
     assert len(data["recipes"]) > 0
 
 
+def test_recipe_responses_carry_etags(client):
+    """Pre-serialized detail/list responses have strong ETags and honour If-None-Match"""
+    from app.services import recipe_json
+    from app.services.registry import services
+    
+    detail = client.get("/api/v1/recipes/2")
+    etag = detail.headers["etag"]
+    assert detail.json()["recipe"]["title"] == SEED_RECIPES[2].title
+    assert not etag.startswith("W/")
+    assert client.get(f"/api/v1/recipes/{SEED_RECIPES[2].id}", headers={"If-None-Match": etag}).status_code == 304
+    
+    listing = client.get("/api/v1/recipes/?view=summary&page_size=3")
+    cards = listing.json()["recipes"]
+    assert len(cards) == 3 and "instructions" not in cards[0] and "title" in cards[0]
+    assert client.get("/api/v1/recipes/?view=summary&page_size=3",
+                      headers={"If-None-Match": listing.headers["etag"]}).status_code == 304
+    assert client.get("/api/v1/recipes/?page_size=3",
+                      headers={"If-None-Match": listing.headers["etag"]}).status_code == 200
+    
+    # A reloaded catalog starts a new cache
+    cache = recipe_json.json_cache()
+    services.reload("recipe_catalog")
+    assert recipe_json.json_cache() is not cache
+    assert client.get("/api/v1/recipes/2", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_recipe_etags_are_stable_across_processes():
+    """Separate workers (or a restart) serve the same bytes, so ETags match"""
+    import subprocess
+    import sys
+
+    probe = (
+        "from fastapi.testclient import TestClient; from app.main import app; c = TestClient(app); "
+        "print(c.get('/api/v1/recipes/0').headers['etag'], c.get('/api/v1/recipes/').headers['etag'])"
+    )
+
+    def etags():
+        result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        return result.stdout.strip().splitlines()[-1]
+
+    assert etags() == etags()
+
+
+def test_recipe_fields_projection(client, sample_ingredients, monkeypatch):
+    """fields= / view=summary trim recipes on list, nutrition filter and search"""
+    listing = client.get("/api/v1/recipes/?fields=title,id&page_size=4").json()
+    assert [list(r) for r in listing["recipes"]] == [["id", "title"]] * 4
+
+    nutrition = client.get("/api/v1/recipes/filter/by-nutrition?max_calories=500&fields=title").json()
+    full = client.get("/api/v1/recipes/filter/by-nutrition?max_calories=500").json()
+    assert nutrition["recipes"] == [{"title": r["title"]} for r in full["recipes"]]
+    assert nutrition["total_found"] == full["total_found"]
+
+    search = {"ingredients": sample_ingredients, "limit": 5}
+    matches = client.post("/api/v1/recipes/search", json=search).json()
+    # A projected search never materializes full Recipe models
+    monkeypatch.setattr(RecipeCatalog, "recipe", lambda self, position: pytest.fail("materialized"))
+    summaries = client.post("/api/v1/recipes/search?view=summary", json=search).json()
+    assert summaries["query_info"] == matches["query_info"]
+    for match, summary in zip(matches["recipes"], summaries["recipes"]):
+        assert "instructions" not in summary["recipe"]
+        assert summary["recipe"] == {k: match["recipe"][k] for k in summary["recipe"]}
+        assert {**summary, "recipe": None} == {**match, "recipe": None}
+
+    assert client.get("/api/v1/recipes/?fields=title,secret").status_code == 400
+    assert client.get("/api/v1/recipes/0?fields=,").status_code == 400
+
+
 def test_list_recipes_with_pagination(client):
     """Test recipe pagination"""
     response = client.get("/api/v1/recipes/?page=1&page_size=5")